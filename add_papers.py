@@ -1,10 +1,17 @@
 """Script to add more papers to the RAG pipeline."""
+import argparse
+import os
+import queue
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional
 sys.path.insert(0, str(Path(__file__).parent))
 
-from ingestion.paper_fetcher import fetch_papers_by_topic
+from ingestion.paper_fetcher import iter_papers_by_topic
 from ingestion.ingest_pipeline import ingest_pdf_from_url
+from ingestion.pdf_loader import load_pdf_from_url
 from config.settings import settings
 from utils.logger import get_logger
 
@@ -15,44 +22,76 @@ settings.embedding_provider = "sentence-transformers"
 settings.llm_provider = "simple"
 
 
-def add_papers_by_topic(topic: str, num_papers: int = 5):
-    """Add papers on a specific topic."""
+def add_papers_by_topic(topic: str, num_papers: int = 5, workers: Optional[int] = None):
+    """
+    Add papers on a specific topic.
+    
+    Runs as a pipeline: a producer thread streams papers from the search APIs
+    and submits each PDF download/extraction to a process pool as soon as it
+    arrives, while this thread ingests finished downloads. Chunking,
+    embedding and the ChromaDB upsert stay in this process so only one
+    writer touches the persistent collection.
+    """
     print(f"\n📚 Fetching {num_papers} papers on: '{topic}'")
     print("=" * 70)
     
-    papers = fetch_papers_by_topic(topic, max_papers=num_papers)
+    workers = max(1, min(workers or os.cpu_count() or 1, num_papers))
+    print(f"\nStarting ingestion with {workers} workers as papers are found...\n")
     
-    if not papers:
-        print("❌ No papers found with PDFs")
-        return
-    
-    print(f"\n✅ Found {len(papers)} papers. Starting ingestion...\n")
+    # (paper, future) pairs; None marks the end of the stream
+    pending = queue.Queue()
     
     successful = 0
     failed = 0
     
-    for i, paper in enumerate(papers, 1):
-        print(f"\n[{i}/{len(papers)}] Processing: {paper['title'][:60]}...")
-        print(f"   Source: {paper.get('source', 'unknown')}")
-        print(f"   Authors: {paper.get('authors_string', 'Unknown')[:50]}...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def produce():
+            try:
+                for paper in iter_papers_by_topic(topic, max_papers=num_papers):
+                    pending.put((paper, executor.submit(load_pdf_from_url, paper["pdf_url"])))
+            except Exception as e:
+                logger.error(f"Paper search failed: {e}")
+            finally:
+                pending.put(None)
+        
+        producer = threading.Thread(target=produce, name="paper-fetcher", daemon=True)
+        producer.start()
         
-        try:
-            paper_id = ingest_pdf_from_url(
-                pdf_url=paper["pdf_url"],
-                paper_id=paper["paper_id"],
-                metadata={
-                    "title": paper.get("title", ""),
-                    "authors": paper.get("authors_string", ""),
-                    "abstract": paper.get("abstract", ""),
-                    "year": paper.get("year"),
-                    "source": paper.get("source", "api"),
-                }
-            )
-            print(f"   ✅ Successfully ingested! (ID: {paper_id[:20]}...)")
-            successful += 1
-        except Exception as e:
-            print(f"   ❌ Failed: {e}")
-            failed += 1
+        i = 0
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            paper, future = item
+            i += 1
+            print(f"\n[{i}] Processing: {paper['title'][:60]}...")
+            print(f"   Source: {paper.get('source', 'unknown')}")
+            print(f"   Authors: {paper.get('authors_string', 'Unknown')[:50]}...")
+            
+            try:
+                paper_id = ingest_pdf_from_url(
+                    pdf_url=paper["pdf_url"],
+                    paper_id=paper["paper_id"],
+                    metadata={
+                        "title": paper.get("title", ""),
+                        "authors": paper.get("authors_string", ""),
+                        "abstract": paper.get("abstract", ""),
+                        "year": paper.get("year"),
+                        "source": paper.get("source", "api"),
+                    },
+                    text=future.result()
+                )
+                print(f"   ✅ Successfully ingested! (ID: {paper_id[:20]}...)")
+                successful += 1
+            except Exception as e:
+                print(f"   ❌ Failed: {e}")
+                failed += 1
+        
+        producer.join()
+    
+    if i == 0:
+        print("❌ No papers found with PDFs")
+        return
     
     print("\n" + "=" * 70)
     print(f"📊 Summary: {successful} successful, {failed} failed")
@@ -75,6 +114,15 @@ def add_paper_from_url(pdf_url: str, paper_id: str = None):
 
 def main():
     """Interactive paper addition."""
+    parser = argparse.ArgumentParser(description="Add papers to the RAG pipeline")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes for PDF download/extraction (default: CPU count)"
+    )
+    args = parser.parse_args()
+    
     print("=" * 70)
     print("ScholarX - Add Papers to RAG Pipeline")
     print("=" * 70)
@@ -94,7 +142,7 @@ def main():
         num = input("Number of papers to fetch (default 5): ").strip()
         num_papers = int(num) if num.isdigit() else 5
         
-        add_papers_by_topic(topic, num_papers)
+        add_papers_by_topic(topic, num_papers, workers=args.workers)
     
     elif choice == "2":
         url = input("\nEnter PDF URL: ").strip()
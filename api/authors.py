@@ -1,11 +1,33 @@
 """Author graph and author-related features."""
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, FrozenSet
+import heapq
+from collections import Counter, defaultdict
+from itertools import combinations
 from config.chroma_client import get_collection
+from utils.chroma_cache import get_all_metadata
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Co-authors kept per author in the network returned by get_author_stats
+MAX_CO_AUTHORS = 10
+
+
+def parse_authors(metadata: Dict) -> FrozenSet[str]:
+    """
+    Parse a metadata "authors" string into normalized author names.
+    
+    Args:
+        metadata: Chunk or paper metadata with a comma-separated "authors" field
+        
+    Returns:
+        Frozenset of lowercased, stripped author names
+    """
+    authors_str = metadata.get("authors") or ""
+    return frozenset(
+        name for name in (a.strip().lower() for a in authors_str.split(",")) if name
+    )
+
 
 def get_author_stats() -> Dict:
     """
@@ -24,37 +46,48 @@ def get_author_stats() -> Dict:
             "co_author_network": {}
         }
     
-    all_data = collection.get(limit=count)
+    all_data = get_all_metadata(collection)
     
-    # Collect author information
-    author_papers = defaultdict(set)  # author -> set of paper_ids
-    author_chunks = defaultdict(int)  # author -> chunk count
-    co_authors = defaultdict(set)  # author -> set of co-authors
+    # First pass: parse each paper's author string once and count its chunks
+    paper_authors = {}  # paper_id -> list of authors
+    paper_chunk_counts = Counter()  # paper_id -> chunk count
     
     for metadata in all_data.get("metadatas", []):
-        authors_str = metadata.get("authors", "")
         paper_id = metadata.get("paper_id", "")
+        paper_chunk_counts[paper_id] += 1
         
-        if authors_str:
+        if paper_id not in paper_authors:
+            authors_str = metadata.get("authors", "")
             # Parse authors (comma-separated)
-            authors = [a.strip() for a in authors_str.split(",")]
-            
-            for author in authors:
-                if author and len(author) > 2:
-                    author_papers[author].add(paper_id)
-                    author_chunks[author] += 1
-                    
-                    # Build co-author network
-                    for co_author in authors:
-                        if co_author != author:
-                            co_authors[author].add(co_author)
+            paper_authors[paper_id] = [
+                a.strip() for a in authors_str.split(",") if len(a.strip()) > 2
+            ] if authors_str else []
+    
+    # Second pass: aggregate once per paper instead of once per chunk
+    author_papers = defaultdict(set)  # author -> set of paper_ids
+    author_chunks = defaultdict(int)  # author -> chunk count
+    co_authors = defaultdict(set)  # author -> set of co-authors (capped)
+    
+    for paper_id, authors in paper_authors.items():
+        for author in authors:
+            author_papers[author].add(paper_id)
+            author_chunks[author] += paper_chunk_counts[paper_id]
+        
+        # Build co-author network, keeping at most MAX_CO_AUTHORS per author
+        for author, co_author in combinations(authors, 2):
+            if co_author == author:
+                continue
+            if len(co_authors[author]) < MAX_CO_AUTHORS:
+                co_authors[author].add(co_author)
+            if len(co_authors[co_author]) < MAX_CO_AUTHORS:
+                co_authors[co_author].add(author)
     
     # Get top authors by paper count
-    top_authors = sorted(
+    top_authors = heapq.nlargest(
+        20,
         author_papers.items(),
-        key=lambda x: len(x[1]),
-        reverse=True
-    )[:20]
+        key=lambda x: len(x[1])
+    )
     
     top_authors_list = [
         {
@@ -69,7 +102,7 @@ def get_author_stats() -> Dict:
         "total_authors": len(author_papers),
         "top_authors": top_authors_list,
         "co_author_network": {
-            author: list(co_authors[author])[:10]  # Limit co-authors
+            author: list(co_authors[author])  # Already capped at MAX_CO_AUTHORS
             for author in list(author_papers.keys())[:50]  # Limit to top 50
         }
     }
@@ -88,17 +121,24 @@ def get_author_profile(author_name: str) -> Dict:
     if count == 0:
         return {}
     
-    all_data = collection.get(limit=count)
+    all_data = get_all_metadata(collection)
     
+    needle = author_name.strip().lower()
     papers = {}
     co_authors = set()
+    seen_papers = set()
     
     for metadata in all_data.get("metadatas", []):
-        authors_str = metadata.get("authors", "")
         paper_id = metadata.get("paper_id", "")
         
-        if author_name.lower() in authors_str.lower():
+        # Every chunk of a paper carries the same authors; parse each paper once
+        if paper_id in seen_papers:
+            continue
+        seen_papers.add(paper_id)
+        
+        if needle in parse_authors(metadata):
             # This author is in this paper
+            authors_str = metadata.get("authors", "")
             papers[paper_id] = {
                 "paper_id": paper_id,
                 "title": metadata.get("title", "Unknown"),
@@ -109,7 +149,7 @@ def get_author_profile(author_name: str) -> Dict:
             # Collect co-authors
             authors = [a.strip() for a in authors_str.split(",")]
             for co_author in authors:
-                if co_author.lower() != author_name.lower():
+                if co_author.lower() != needle:
                     co_authors.add(co_author)
     
     return {
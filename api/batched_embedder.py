@@ -0,0 +1,129 @@
+"""Micro-batching of concurrent embedding requests."""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from typing import Callable, List, Optional
+from processing.embeddings import generate_embeddings_batch
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Dispatch a batch once it holds this many texts...
+EMBED_MAX_BATCH = 32
+# ...or once the oldest queued text has waited this long
+EMBED_MAX_WAIT_MS = 50
+
+
+class BatchedEmbedder:
+    """
+    Coalesce embedding requests from concurrent callers into batched encoder calls.
+    
+    Callers block in embed() while a background thread collects queued texts
+    and embeds them with one batch call. The thread stops waiting as soon as
+    every caller currently blocked is in the batch, so an uncontended call is
+    dispatched immediately instead of sitting out the full wait.
+    """
+    
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]] = partial(generate_embeddings_batch, use_cache=True),
+        max_batch: int = EMBED_MAX_BATCH,
+        max_wait_ms: float = EMBED_MAX_WAIT_MS
+    ):
+        self._embed_batch = embed_batch
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._worker = None
+    
+    def _ensure_worker(self):
+        """Start the dispatch thread on first use."""
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(
+                        target=self._run, name="batched-embedder", daemon=True
+                    )
+                    self._worker.start()
+    
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding and return a future for its vector."""
+        self._ensure_worker()
+        future = Future()
+        with self._lock:
+            self._pending += 1
+        self._queue.put((text, future))
+        return future
+    
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text, sharing the encoder call with concurrent callers."""
+        return self.submit(text).result()
+    
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts; they are queued together so they land in the same batch."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+    
+    def _collect(self) -> List[tuple]:
+        """Block for one request, then gather more until the batch is full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch:
+            with self._lock:
+                if len(batch) >= self._pending:
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        """Dispatch loop: embed each collected batch and resolve its futures."""
+        while True:
+            batch = self._collect()
+            with self._lock:
+                self._pending -= len(batch)
+            
+            texts = [text for text, _ in batch]
+            try:
+                vectors = self._embed_batch(texts)
+            except Exception as e:
+                logger.error(f"Batched embedding of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+_embedder: Optional[BatchedEmbedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> BatchedEmbedder:
+    """Get the shared process-wide embedder."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = BatchedEmbedder()
+    return _embedder
+
+
+def embed_text(text: str) -> List[float]:
+    """Embed a text through the shared batched embedder."""
+    return get_embedder().embed(text)
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed several texts through the shared batched embedder."""
+    return get_embedder().embed_many(texts)
@@ -1,13 +1,17 @@
 """Citation graph and related papers."""
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from config.chroma_client import get_collection
 from rag.search_enhanced import get_related_papers
-from processing.embeddings import generate_embedding
-from vectorstore.query import query_vectors
+from processing.embeddings import generate_embedding, generate_embeddings_batch
+from vectorstore.query import query_vectors, get_paper_metadata_batch
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Concurrent lookups for multi-paper citation scans
+CITATION_SCAN_WORKERS = 8
+
 
 def get_citation_info(paper_id: str) -> Dict:
     """
@@ -21,7 +25,8 @@ def get_citation_info(paper_id: str) -> Dict:
     # Get paper metadata
     paper_chunks = collection.get(
         where={"paper_id": paper_id},
-        limit=1
+        limit=1,
+        include=["metadatas"]
     )
     
     if not paper_chunks.get("ids"):
@@ -70,7 +75,8 @@ def find_citing_papers(paper_id: str, limit: int = 10) -> List[Dict]:
     collection = get_collection()
     paper_chunks = collection.get(
         where={"paper_id": paper_id},
-        limit=1
+        limit=1,
+        include=["metadatas"]
     )
     
     if not paper_chunks.get("ids"):
@@ -78,13 +84,20 @@ def find_citing_papers(paper_id: str, limit: int = 10) -> List[Dict]:
     
     # Use title/abstract for finding similar papers
     metadata = paper_chunks["metadatas"][0] if paper_chunks.get("metadatas") else {}
+    query_embedding = generate_embedding(_citation_query_text(metadata))
+    
+    return _rank_citing_papers(paper_id, query_embedding, limit)
+
+
+def _citation_query_text(metadata: Dict) -> str:
+    """Build the title + abstract text used to look for citing papers."""
     title = metadata.get("title", "")
     abstract = metadata.get("abstract", "")
-    
-    # Generate embedding for title + abstract
-    query_text = f"{title} {abstract[:500]}"
-    query_embedding = generate_embedding(query_text)
-    
+    return f"{title} {abstract[:500]}"
+
+
+def _rank_citing_papers(paper_id: str, query_embedding: List[float], limit: int) -> List[Dict]:
+    """Search for papers similar to a paper's embedding, excluding the paper itself."""
     # Search for similar papers
     similar_chunks = query_vectors(query_embedding, top_k=limit * 3)
     
@@ -105,4 +118,45 @@ def find_citing_papers(paper_id: str, limit: int = 10) -> List[Dict]:
     return results
 
 
-
+def find_citing_papers_batch(
+    paper_ids: List[str],
+    limit: int = 10,
+    max_workers: int = CITATION_SCAN_WORKERS
+) -> Dict[str, List[Dict]]:
+    """
+    Find citing papers for several papers at once.
+    
+    Metadata is fetched in one query and all title/abstract texts are embedded
+    in a single batch; the per-paper similarity searches then run on a thread
+    pool so their round-trips overlap.
+    
+    Args:
+        paper_ids: Papers to look up
+        limit: Maximum citing papers per paper
+        max_workers: Maximum concurrent similarity searches
+        
+    Returns:
+        Dictionary mapping paper_id to its citing papers
+    """
+    if not paper_ids:
+        return {}
+    
+    metadata_by_paper = get_paper_metadata_batch(paper_ids)
+    found_ids = [pid for pid in paper_ids if pid in metadata_by_paper]
+    results = {pid: [] for pid in paper_ids}
+    if not found_ids:
+        return results
+    
+    query_embeddings = generate_embeddings_batch(
+        [_citation_query_text(metadata_by_paper[pid]) for pid in found_ids]
+    )
+    
+    workers = max(1, min(max_workers, len(found_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        ranked = executor.map(
+            lambda args: _rank_citing_papers(args[0], args[1], limit),
+            zip(found_ids, query_embeddings)
+        )
+        results.update(zip(found_ids, ranked))
+    
+    return results
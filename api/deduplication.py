@@ -1,17 +1,231 @@
 """Paper deduplication and DOI normalization."""
-from typing import List, Dict
+import re
+import zlib
+from typing import List, Dict, Optional, Set, Tuple
+from collections import defaultdict
 from difflib import SequenceMatcher
+import numpy as np
 from config.chroma_client import get_collection
+from utils.chroma_cache import get_all_metadata
+from api.authors import parse_authors
+from vectorstore.query import get_paper_metadata_batch
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# MinHash/LSH parameters for title candidate generation.
+# 32 bands x 4 rows puts the candidate threshold around 0.42 Jaccard on
+# character 3-grams, well below what a 0.85 title ratio needs.
+SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+_MINHASH_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(42)
+_MINHASH_A = _rng.randint(1, _MINHASH_PRIME, size=MINHASH_PERMUTATIONS).astype(np.int64)
+_MINHASH_B = _rng.randint(0, _MINHASH_PRIME, size=MINHASH_PERMUTATIONS).astype(np.int64)
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+# SimHash prefilter for the fallback title scorer (used without scikit-learn).
+# Pairs whose 64-bit sketches differ in more bits than this are far below any
+# useful title threshold and skip the exact SequenceMatcher comparison.
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 20
+_SIMHASH_SHIFTS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
 
 def similarity_score(str1: str, str2: str) -> float:
     """Calculate similarity between two strings."""
     return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
 
 
+def _split_arxiv_version(arxiv_id: str) -> Tuple[str, int]:
+    """Split an ArXiv ID like "2101.00001v2" into its base ID and version (0 if none)."""
+    idx = arxiv_id.rfind('v')
+    if idx > 0 and arxiv_id[idx + 1:].isdigit():
+        return arxiv_id[:idx], int(arxiv_id[idx + 1:])
+    return arxiv_id, 0
+
+
+def _title_shingles(title: str) -> Set[str]:
+    """Character n-grams of a whitespace-normalized, lowercased title."""
+    text = " ".join(title.lower().split())
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _minhash_signature(shingles: Set[str]) -> np.ndarray:
+    """MinHash signature of a shingle set (one min per permutation)."""
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.int64,
+        count=len(shingles)
+    )
+    return ((np.outer(_MINHASH_A, hashes) + _MINHASH_B[:, None]) % _MINHASH_PRIME).min(axis=1)
+
+
+def _blocking_key(paper: Dict) -> Optional[Tuple[str, str]]:
+    """
+    (first-author surname, year) blocking key, or None if either part is missing.
+    """
+    first_author = (paper.get("authors") or "").split(",")[0].split()
+    year = paper.get("year")
+    if not first_author or not year:
+        return None
+    return first_author[-1].lower(), str(year)
+
+
+def _candidate_pairs(paper_list: List[Tuple[str, Dict]]) -> Dict[int, Set[int]]:
+    """
+    Generate candidate duplicate pairs without comparing every pair.
+    
+    Papers sharing a DOI or ArXiv base ID are always candidates; otherwise
+    titles are bucketed by MinHash LSH bands, and papers in the same band
+    bucket are only paired when their (first-author surname, year) blocks
+    agree. Papers missing either part of the block key pair with everyone
+    in the bucket.
+    
+    Returns:
+        Mapping of paper index -> set of later paper indices to compare
+    """
+    buckets = defaultdict(list)
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    blocks = [_blocking_key(paper) for _, paper in paper_list]
+    
+    for i, (_, paper) in enumerate(paper_list):
+        if paper["doi"]:
+            buckets[("doi", paper["doi"])].append(i)
+        if paper["arxiv_id"]:
+            buckets[("arxiv", _split_arxiv_version(paper["arxiv_id"])[0])].append(i)
+        
+        signature = _minhash_signature(_title_shingles(paper["title"]))
+        for band in range(LSH_BANDS):
+            band_key = signature[band * rows:(band + 1) * rows].tobytes()
+            buckets[("title", band, band_key)].append(i)
+    
+    candidates = defaultdict(set)
+    
+    def add_pairs(members: List[int]) -> None:
+        for a, i in enumerate(members):
+            for j in members[a + 1:]:
+                if i != j:
+                    candidates[min(i, j)].add(max(i, j))
+    
+    for key, members in buckets.items():
+        if len(members) < 2:
+            continue
+        if key[0] != "title":
+            # Identifier matches short-circuit blocking
+            add_pairs(members)
+            continue
+        
+        blocked = defaultdict(list)
+        unblocked = []
+        for i in members:
+            if blocks[i] is None:
+                unblocked.append(i)
+            else:
+                blocked[blocks[i]].append(i)
+        
+        if not blocked:
+            add_pairs(unblocked)
+        for group in blocked.values():
+            add_pairs(group + unblocked)
+    
+    return candidates
+
+
+def _simhash_sketches(titles: List[str]) -> np.ndarray:
+    """64-bit SimHash of each title's character shingles, as a uint64 array."""
+    sketches = np.zeros(len(titles), dtype=np.uint64)
+    for n, title in enumerate(titles):
+        shingles = [s.encode("utf-8") for s in _title_shingles(title)]
+        # Two seeded CRC32s give a 64-bit hash per shingle
+        hashes = np.fromiter(
+            (zlib.crc32(s) | (zlib.crc32(s, 0x9E3779B9) << 32) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        bits = (hashes[:, None] >> _SIMHASH_SHIFTS) & np.uint64(1)
+        votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(shingles)
+        sketches[n] = np.bitwise_or.reduce(
+            np.where(votes > 0, np.uint64(1) << _SIMHASH_SHIFTS, np.uint64(0))
+        )
+    return sketches
+
+
+def _hamming_distances(sketches: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Popcount of XORed sketches for every (row, col) pair at once."""
+    diff = sketches[rows] ^ sketches[cols]
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(diff)
+    return np.unpackbits(diff.view(np.uint8)).reshape(-1, SIMHASH_BITS).sum(axis=1)
+
+
+def _title_similarities(titles: List[str], pairs: List[Tuple[int, int]]) -> Dict[Tuple[int, int], float]:
+    """
+    Cosine similarity of character n-gram TF-IDF vectors for candidate pairs.
+    
+    All pairs are scored with one sparse row-wise product instead of one
+    SequenceMatcher call per pair. Without scikit-learn, a vectorized SimHash
+    Hamming pass discards clearly dissimilar pairs and only the rest are
+    scored with similarity_score.
+    """
+    if not pairs:
+        return {}
+    
+    rows = np.fromiter((i for i, _ in pairs), dtype=np.int64, count=len(pairs))
+    cols = np.fromiter((j for _, j in pairs), dtype=np.int64, count=len(pairs))
+    
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        # IDF is off: within a small library it down-weights exactly the
+        # n-grams two copies of a title share, pushing true duplicates under
+        # thresholds tuned for SequenceMatcher ratios.
+        vectors = TfidfVectorizer(
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            use_idf=False,
+            preprocessor=lambda t: _PUNCTUATION.sub(" ", t.lower())
+        ).fit_transform(titles)
+    except (ImportError, ValueError):
+        # ValueError: no usable n-grams (e.g. every title is empty)
+        distances = _hamming_distances(_simhash_sketches(titles), rows, cols)
+        return {
+            (i, j): similarity_score(titles[i], titles[j]) if distance <= SIMHASH_MAX_DISTANCE else 0.0
+            for (i, j), distance in zip(pairs, distances.tolist())
+        }
+    
+    # Rows are L2-normalized by TfidfVectorizer, so the dot product is the cosine
+    sims = np.asarray(vectors[rows].multiply(vectors[cols]).sum(axis=1)).ravel()
+    
+    return dict(zip(pairs, sims.tolist()))
+
+
+class _UnionFind:
+    """Disjoint-set forest over paper indices with path halving and union by size."""
+    
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+    
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
 def find_duplicate_papers(threshold: float = 0.85) -> List[Dict]:
     """
     Find duplicate papers in the collection.
@@ -28,10 +242,11 @@ def find_duplicate_papers(threshold: float = 0.85) -> List[Dict]:
     if count == 0:
         return []
     
-    all_data = collection.get(limit=count)
+    all_data = get_all_metadata(collection)
     
     # Group by paper_id and extract metadata
     papers = {}
+    author_sets = {}  # paper_id -> normalized author names
     for i, paper_id in enumerate(all_data.get("ids", [])):
         metadata = all_data.get("metadatas", [{}])[i] if all_data.get("metadatas") else {}
         pid = metadata.get("paper_id", "unknown")
@@ -45,54 +260,63 @@ def find_duplicate_papers(threshold: float = 0.85) -> List[Dict]:
                 "arxiv_id": metadata.get("arxiv_id", ""),
                 "year": metadata.get("year")
             }
+            author_sets[pid] = parse_authors(metadata)
     
     # Find duplicates
-    duplicates = []
-    checked = set()
-    
     paper_list = list(papers.items())
-    for i, (pid1, paper1) in enumerate(paper_list):
-        if pid1 in checked:
-            continue
-        
-        group = [paper1]
+    candidates = _candidate_pairs(paper_list)
+    title_sims = _title_similarities(
+        [paper["title"] for _, paper in paper_list],
+        [(i, j) for i, js in candidates.items() for j in js]
+    )
+    
+    # Union matching pairs so transitive matches (A~B, B~C) land in one group
+    groups = _UnionFind(len(paper_list))
+    
+    for i in sorted(candidates):
+        pid1, paper1 = paper_list[i]
         
-        for j, (pid2, paper2) in enumerate(paper_list[i+1:], i+1):
-            if pid2 in checked:
-                continue
+        for j in sorted(candidates[i]):
+            if groups.find(i) == groups.find(j):
+                continue  # Already in the same group
+            
+            pid2, paper2 = paper_list[j]
             
             # Check DOI match
             if paper1["doi"] and paper2["doi"]:
                 if paper1["doi"] == paper2["doi"]:
-                    group.append(paper2)
-                    checked.add(pid2)
+                    groups.union(i, j)
                     continue
             
             # Check ArXiv ID match (handle versions)
             if paper1["arxiv_id"] and paper2["arxiv_id"]:
-                base1 = paper1["arxiv_id"].split('v')[0]
-                base2 = paper2["arxiv_id"].split('v')[0]
+                base1 = _split_arxiv_version(paper1["arxiv_id"])[0]
+                base2 = _split_arxiv_version(paper2["arxiv_id"])[0]
                 if base1 == base2:
-                    group.append(paper2)
-                    checked.add(pid2)
+                    groups.union(i, j)
                     continue
             
             # Check title similarity
-            title_sim = similarity_score(paper1["title"], paper2["title"])
+            title_sim = title_sims.get((i, j), 0.0)
             if title_sim >= threshold:
-                # Also check author similarity
-                author_sim = similarity_score(paper1["authors"], paper2["authors"])
-                if author_sim >= 0.7:  # Authors should also match
-                    group.append(paper2)
-                    checked.add(pid2)
-        
+                # Also check author similarity (identical author sets match outright)
+                authors1, authors2 = author_sets[pid1], author_sets[pid2]
+                if (authors1 and authors1 == authors2) or \
+                        similarity_score(paper1["authors"], paper2["authors"]) >= 0.7:
+                    groups.union(i, j)
+    
+    members = defaultdict(list)
+    for i in range(len(paper_list)):
+        members[groups.find(i)].append(paper_list[i][1])
+    
+    duplicates = []
+    for group in members.values():
         if len(group) > 1:
             duplicates.append({
                 "group_id": f"group_{len(duplicates)}",
                 "papers": group,
                 "reason": "duplicate_detected"
             })
-            checked.add(pid1)
     
     logger.info(f"Found {len(duplicates)} duplicate groups")
     return duplicates
@@ -111,15 +335,13 @@ def normalize_arxiv_versions() -> Dict:
     if count == 0:
         return {}
     
-    all_data = collection.get(limit=count)
+    all_data = get_all_metadata(collection)
     
-    arxiv_groups = {}
+    arxiv_groups = defaultdict(list)
     for metadata in all_data.get("metadatas", []):
         arxiv_id = metadata.get("arxiv_id", "")
         if arxiv_id:
-            base_id = arxiv_id.split('v')[0]  # Remove version
-            if base_id not in arxiv_groups:
-                arxiv_groups[base_id] = []
+            base_id, _ = _split_arxiv_version(arxiv_id)  # Remove version
             arxiv_groups[base_id].append({
                 "paper_id": metadata.get("paper_id"),
                 "version": arxiv_id,
@@ -147,16 +369,7 @@ def merge_paper_metadata(paper_ids: List[str]) -> Dict:
     Returns:
         Merged metadata
     """
-    collection = get_collection()
-    
-    all_metadata = {}
-    for paper_id in paper_ids:
-        chunks = collection.get(
-            where={"paper_id": paper_id},
-            limit=1
-        )
-        if chunks.get("metadatas"):
-            all_metadata[paper_id] = chunks["metadatas"][0]
+    all_metadata = get_paper_metadata_batch(paper_ids)
     
     if not all_metadata:
         return {}
@@ -170,7 +383,7 @@ def merge_paper_metadata(paper_ids: List[str]) -> Dict:
                 merged[key] = max(v for v in values if v)
             elif key == "arxiv_id":
                 # Prefer latest version
-                merged[key] = max(values, key=lambda x: int(x.split('v')[1]) if 'v' in x else 0)
+                merged[key] = max(values, key=lambda x: _split_arxiv_version(x)[1])
             else:
                 # Prefer longest/non-empty
                 merged[key] = max(values, key=len) if values else None
@@ -1,14 +1,95 @@
 """Export capabilities - BibTeX, CSV, JSON, Markdown."""
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from config.chroma_client import get_collection
+from utils.chroma_cache import get_all_metadata
+from vectorstore.query import get_paper_metadata_batch
 from utils.logger import get_logger
 from pathlib import Path
 import json
 import csv
+import re
+import textwrap
 from datetime import datetime
 
 logger = get_logger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.debug("orjson not installed, JSON export will use the stdlib json module")
+
+# Write buffer for export files; records are small, so coalesce them into large writes
+EXPORT_BUFFER_SIZE = 1 << 20
+
+# Characters that are special in BibTeX/LaTeX field values
+_BIB_ESCAPE = re.compile(r"([{}&%#_$])")
+
+_format_bibtex = (
+    "@article{{{entry_id},\n"
+    "    title = {{{title}}},\n"
+    "    author = {{{authors}}},\n"
+    "    year = {{{year}}},\n"
+    "    journal = {{{journal}}},\n"
+    "    url = {{{url}}}\n"
+    "}}"
+).format
+
+
+def _bib_escape(value) -> str:
+    """Backslash-escape BibTeX special characters in a field value."""
+    return _BIB_ESCAPE.sub(r"\\\1", str(value) if value is not None else "")
+
+
+def iter_unique_papers(collection, paper_ids: Optional[List[str]] = None) -> Iterator[Dict]:
+    """
+    Yield one metadata dict per paper.
+    
+    Args:
+        collection: ChromaDB collection
+        paper_ids: Paper IDs to yield (if None, yields every paper once)
+    """
+    if paper_ids:
+        metadata_by_paper = get_paper_metadata_batch(paper_ids)
+        for pid in paper_ids:
+            if pid in metadata_by_paper:
+                yield metadata_by_paper[pid]
+        return
+    
+    seen = set()
+    for meta in get_all_metadata(collection)["metadatas"]:
+        pid = meta.get("paper_id")
+        if pid and pid not in seen:
+            seen.add(pid)
+            yield meta
+
+
+def _dump_json_record(paper: Dict) -> bytes:
+    """Serialize one paper as a UTF-8 JSON object indented to sit inside a top-level array."""
+    if orjson is not None:
+        # JSON strings never contain raw newlines, so indenting every line is safe
+        record = orjson.dumps(paper, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return b"  " + record.replace(b"\n", b"\n  ")
+    return textwrap.indent(json.dumps(paper, indent=2, ensure_ascii=False), "  ").encode("utf-8")
+
+
+def _format_bibtex_entry(paper: Dict, index: int) -> str:
+    """Format a single paper as a BibTeX entry."""
+    entry_id = f"paper_{paper.get('paper_id', index)}"
+    
+    authors = paper.get("authors", "Unknown")
+    if isinstance(authors, list):
+        authors = " and ".join(authors)
+    
+    return _format_bibtex(
+        entry_id=entry_id,
+        title=_bib_escape(paper.get("title", "Untitled")),
+        authors=_bib_escape(authors),
+        year=_bib_escape(paper.get("year", "")),
+        journal=_bib_escape(paper.get("source", "arXiv")),
+        url=paper.get("pdf_url", "")
+    )
+
 
 def export_to_bibtex(paper_ids: Optional[List[str]] = None, filename: str = "papers.bib") -> str:
     """
@@ -24,51 +105,15 @@ def export_to_bibtex(paper_ids: Optional[List[str]] = None, filename: str = "pap
     collection = get_collection()
     
     try:
-        if paper_ids:
-            papers = []
-            for pid in paper_ids:
-                chunks = collection.get(where={"paper_id": pid}, limit=1)
-                if chunks.get("metadatas"):
-                    papers.append(chunks["metadatas"][0])
-        else:
-            all_data = collection.get(limit=10000)
-            metadatas = all_data.get("metadatas", [])
-            # Deduplicate by paper_id
-            seen = set()
-            papers = []
-            for meta in metadatas:
-                pid = meta.get("paper_id")
-                if pid and pid not in seen:
-                    seen.add(pid)
-                    papers.append(meta)
-        
-        bibtex_entries = []
-        for i, paper in enumerate(papers):
-            # Generate BibTeX entry
-            entry_type = "article"  # Default
-            entry_id = f"paper_{paper.get('paper_id', i)}"
-            
-            title = paper.get("title", "Untitled").replace("{", "").replace("}", "")
-            authors = paper.get("authors", "Unknown")
-            if isinstance(authors, list):
-                authors = " and ".join(authors)
-            year = paper.get("year", "")
-            journal = paper.get("source", "arXiv")
-            
-            bibtex = f"""@article{{{entry_id},
-    title = {{{title}}},
-    author = {{{authors}}},
-    year = {{{year}}},
-    journal = {{{journal}}},
-    url = {{{paper.get('pdf_url', '')}}}
-}}"""
-            bibtex_entries.append(bibtex)
-        
         output_path = Path(filename)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("\n\n".join(bibtex_entries))
+        exported = 0
+        with open(output_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            for i, paper in enumerate(iter_unique_papers(collection, paper_ids)):
+                separator = "\n\n" if exported else ""
+                f.write(separator + _format_bibtex_entry(paper, i))
+                exported += 1
         
-        logger.info(f"Exported {len(bibtex_entries)} papers to {output_path}")
+        logger.info(f"Exported {exported} papers to {output_path}")
         return str(output_path)
         
     except Exception as e:
@@ -90,32 +135,15 @@ def export_to_csv(paper_ids: Optional[List[str]] = None, filename: str = "papers
     collection = get_collection()
     
     try:
-        if paper_ids:
-            papers = []
-            for pid in paper_ids:
-                chunks = collection.get(where={"paper_id": pid}, limit=1)
-                if chunks.get("metadatas"):
-                    papers.append(chunks["metadatas"][0])
-        else:
-            all_data = collection.get(limit=10000)
-            metadatas = all_data.get("metadatas", [])
-            # Deduplicate
-            seen = set()
-            papers = []
-            for meta in metadatas:
-                pid = meta.get("paper_id")
-                if pid and pid not in seen:
-                    seen.add(pid)
-                    papers.append(meta)
-        
         output_path = Path(filename)
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        exported = 0
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
             writer = csv.DictWriter(f, fieldnames=[
                 "paper_id", "title", "authors", "year", "abstract", "source", "pdf_url", "doi"
             ])
             writer.writeheader()
             
-            for paper in papers:
+            for paper in iter_unique_papers(collection, paper_ids):
                 authors = paper.get("authors", "Unknown")
                 if isinstance(authors, list):
                     authors = "; ".join(authors)
@@ -130,8 +158,9 @@ def export_to_csv(paper_ids: Optional[List[str]] = None, filename: str = "papers
                     "pdf_url": paper.get("pdf_url", ""),
                     "doi": paper.get("doi", "")
                 })
+                exported += 1
         
-        logger.info(f"Exported {len(papers)} papers to {output_path}")
+        logger.info(f"Exported {exported} papers to {output_path}")
         return str(output_path)
         
     except Exception as e:
@@ -153,29 +182,17 @@ def export_to_json(paper_ids: Optional[List[str]] = None, filename: str = "paper
     collection = get_collection()
     
     try:
-        if paper_ids:
-            papers = []
-            for pid in paper_ids:
-                chunks = collection.get(where={"paper_id": pid}, limit=1)
-                if chunks.get("metadatas"):
-                    papers.append(chunks["metadatas"][0])
-        else:
-            all_data = collection.get(limit=10000)
-            metadatas = all_data.get("metadatas", [])
-            # Deduplicate
-            seen = set()
-            papers = []
-            for meta in metadatas:
-                pid = meta.get("paper_id")
-                if pid and pid not in seen:
-                    seen.add(pid)
-                    papers.append(meta)
-        
         output_path = Path(filename)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(papers, f, indent=2, ensure_ascii=False)
+        exported = 0
+        with open(output_path, 'wb', buffering=EXPORT_BUFFER_SIZE) as f:
+            # Stream the array one object at a time (same layout as json.dump(indent=2))
+            f.write(b"[")
+            for paper in iter_unique_papers(collection, paper_ids):
+                f.write((b",\n" if exported else b"\n") + _dump_json_record(paper))
+                exported += 1
+            f.write(b"\n]" if exported else b"]")
         
-        logger.info(f"Exported {len(papers)} papers to {output_path}")
+        logger.info(f"Exported {exported} papers to {output_path}")
         return str(output_path)
         
     except Exception as e:
@@ -197,50 +214,40 @@ def export_to_markdown(paper_ids: Optional[List[str]] = None, filename: str = "p
     collection = get_collection()
     
     try:
-        if paper_ids:
-            papers = []
-            for pid in paper_ids:
-                chunks = collection.get(where={"paper_id": pid}, limit=1)
-                if chunks.get("metadatas"):
-                    papers.append(chunks["metadatas"][0])
-        else:
-            all_data = collection.get(limit=10000)
-            metadatas = all_data.get("metadatas", [])
-            # Deduplicate
-            seen = set()
-            papers = []
-            for meta in metadatas:
-                pid = meta.get("paper_id")
-                if pid and pid not in seen:
-                    seen.add(pid)
-                    papers.append(meta)
-        
         output_path = Path(filename)
-        with open(output_path, 'w', encoding='utf-8') as f:
+        exported = 0
+        with open(output_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
             f.write("# Research Papers Library\n\n")
             f.write(f"*Exported on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
-            f.write(f"Total papers: {len(papers)}\n\n")
             f.write("---\n\n")
             
-            for i, paper in enumerate(papers, 1):
+            for i, paper in enumerate(iter_unique_papers(collection, paper_ids), 1):
                 authors = paper.get("authors", "Unknown")
                 if isinstance(authors, list):
                     authors = ", ".join(authors)
                 
-                f.write(f"## {i}. {paper.get('title', 'Untitled')}\n\n")
-                f.write(f"**Authors:** {authors}\n\n")
-                f.write(f"**Year:** {paper.get('year', 'Unknown')}\n\n")
-                f.write(f"**Source:** {paper.get('source', 'Unknown')}\n\n")
+                # Build the whole record and write it once
+                parts = [
+                    f"## {i}. {paper.get('title', 'Untitled')}\n\n",
+                    f"**Authors:** {authors}\n\n",
+                    f"**Year:** {paper.get('year', 'Unknown')}\n\n",
+                    f"**Source:** {paper.get('source', 'Unknown')}\n\n",
+                ]
                 
                 if paper.get("abstract"):
-                    f.write(f"**Abstract:**\n\n{paper['abstract']}\n\n")
+                    parts.append(f"**Abstract:**\n\n{paper['abstract']}\n\n")
                 
                 if paper.get("pdf_url"):
-                    f.write(f"**PDF:** [{paper['pdf_url']}]({paper['pdf_url']})\n\n")
+                    parts.append(f"**PDF:** [{paper['pdf_url']}]({paper['pdf_url']})\n\n")
                 
-                f.write("---\n\n")
+                parts.append("---\n\n")
+                f.write("".join(parts))
+                exported = i
+            
+            # Papers are streamed, so the total is only known at the end
+            f.write(f"Total papers: {exported}\n")
         
-        logger.info(f"Exported {len(papers)} papers to {output_path}")
+        logger.info(f"Exported {exported} papers to {output_path}")
         return str(output_path)
         
     except Exception as e:
@@ -264,7 +271,7 @@ def export_rag_session(query: str, answer: str, citations: List[Dict], filename:
     output_path = Path(filename)
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open(output_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
             f.write("# RAG Session Export\n\n")
             f.write(f"*Exported on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
             f.write("## Query\n\n")
@@ -0,0 +1,182 @@
+"""User reading history stored in SQLite (WAL mode)."""
+from typing import Dict, List, Optional
+from pathlib import Path
+import json
+import sqlite3
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HISTORY_DB = Path(__file__).parent.parent / "user_history.db"
+
+# Earlier JSON history, imported the first time the database is created
+LEGACY_HISTORY_FILE = Path(__file__).parent.parent / "user_history.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (id INTEGER PRIMARY KEY, ts TEXT NOT NULL, query TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS viewed (paper_id TEXT PRIMARY KEY, title TEXT, ts TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS viewed_ts ON viewed (ts);
+CREATE TABLE IF NOT EXISTS interests (word TEXT PRIMARY KEY, last_seen INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS interests_last_seen ON interests (last_seen);
+CREATE TABLE IF NOT EXISTS topic_counts (word TEXT PRIMARY KEY, count INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS topic_counts_count ON topic_counts (count);
+"""
+
+# One connection per thread; sqlite3 connections must not be shared across threads
+_local = threading.local()
+_init_lock = threading.Lock()
+
+
+def _topic_words(query: str) -> List[str]:
+    """Words of a query counted towards trending topics."""
+    return [word for word in query.lower().split() if len(word) > 4]
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Get this thread's connection, creating the schema (and migrating old history) on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        with _init_lock:
+            is_new = not HISTORY_DB.exists()
+            conn = sqlite3.connect(HISTORY_DB, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            if is_new:
+                _migrate_legacy_history(conn)
+        _local.conn = conn
+    return conn
+
+
+def _migrate_legacy_history(conn: sqlite3.Connection):
+    """Import the earlier user_history.json into a freshly created database."""
+    if not LEGACY_HISTORY_FILE.exists():
+        return
+    try:
+        with open(LEGACY_HISTORY_FILE, 'r') as f:
+            _import_history(conn, json.load(f))
+        logger.info(f"Migrated {LEGACY_HISTORY_FILE.name} to {HISTORY_DB.name}")
+    except Exception as e:
+        logger.warning(f"Failed to migrate user history from {LEGACY_HISTORY_FILE.name}: {e}")
+
+
+def _import_history(conn: sqlite3.Connection, history: Dict):
+    """Insert every view, query and interest of a history dict (one transaction)."""
+    now = int(time.time())
+    with conn:
+        for view in history.get("viewed_papers", []):
+            conn.execute(
+                "INSERT OR REPLACE INTO viewed (paper_id, title, ts) VALUES (?, ?, ?)",
+                (view.get("paper_id"), view.get("title", ""), view.get("timestamp", ""))
+            )
+        for query in history.get("queries", []):
+            _insert_query(conn, query.get("query", ""), query.get("timestamp", ""))
+        # Keep the stored order: later interests are more recent
+        for offset, word in enumerate(history.get("interests", [])):
+            conn.execute(
+                "INSERT OR REPLACE INTO interests (word, last_seen) VALUES (?, ?)",
+                (word, now - len(history["interests"]) + offset)
+            )
+
+
+def _insert_query(conn: sqlite3.Connection, query: str, timestamp: str):
+    """Insert a query and bump its topic counts (caller manages the transaction)."""
+    conn.execute("INSERT INTO queries (ts, query) VALUES (?, ?)", (timestamp, query))
+    conn.executemany(
+        "INSERT INTO topic_counts (word, count) VALUES (?, 1) "
+        "ON CONFLICT(word) DO UPDATE SET count = count + 1",
+        [(word,) for word in _topic_words(query)]
+    )
+
+
+def add_query(query: str, timestamp: str, interests: List[str]):
+    """
+    Record a query together with the interests extracted from it.
+    
+    Args:
+        query: Query text
+        timestamp: ISO timestamp of the query
+        interests: Interest words to mark as seen now
+    """
+    conn = _get_connection()
+    now = int(time.time())
+    with conn:
+        _insert_query(conn, query, timestamp)
+        conn.executemany(
+            "INSERT INTO interests (word, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(word) DO UPDATE SET last_seen = excluded.last_seen",
+            [(word, now) for word in interests]
+        )
+
+
+def add_view(paper_id: str, title: str, timestamp: str):
+    """Record a paper view (a repeat view updates the paper's title and timestamp)."""
+    conn = _get_connection()
+    with conn:
+        conn.execute(
+            "INSERT INTO viewed (paper_id, title, ts) VALUES (?, ?, ?) "
+            "ON CONFLICT(paper_id) DO UPDATE SET title = excluded.title, ts = excluded.ts",
+            (paper_id, title, timestamp)
+        )
+
+
+def get_recent_views(limit: Optional[int] = None) -> List[Dict]:
+    """Viewed papers, oldest first (the last `limit` if given)."""
+    rows = _get_connection().execute(
+        "SELECT paper_id, title, ts FROM viewed ORDER BY ts DESC, rowid DESC LIMIT ?",
+        (-1 if limit is None else limit,)
+    ).fetchall()
+    return [{"paper_id": pid, "title": title, "timestamp": ts} for pid, title, ts in reversed(rows)]
+
+
+def get_recent_queries(limit: Optional[int] = None) -> List[Dict]:
+    """Queries, oldest first (the last `limit` if given)."""
+    rows = _get_connection().execute(
+        "SELECT query, ts FROM queries ORDER BY id DESC LIMIT ?",
+        (-1 if limit is None else limit,)
+    ).fetchall()
+    return [{"query": query, "timestamp": ts} for query, ts in reversed(rows)]
+
+
+def get_interests(limit: Optional[int] = None) -> List[str]:
+    """Interest words, least recently seen first (the last `limit` if given)."""
+    rows = _get_connection().execute(
+        "SELECT word FROM interests ORDER BY last_seen DESC, rowid DESC LIMIT ?",
+        (-1 if limit is None else limit,)
+    ).fetchall()
+    return [word for (word,) in reversed(rows)]
+
+
+def get_top_topics(limit: int = 10) -> List[tuple]:
+    """Most frequent query words as (word, count) pairs, most frequent first."""
+    return _get_connection().execute(
+        "SELECT word, count FROM topic_counts ORDER BY count DESC, rowid ASC LIMIT ?",
+        (limit,)
+    ).fetchall()
+
+
+def export_history() -> Dict:
+    """Full history in the original user_history.json layout."""
+    return {
+        "viewed_papers": get_recent_views(),
+        "queries": get_recent_queries(),
+        "interests": get_interests()
+    }
+
+
+def import_history(history: Dict, replace: bool = True):
+    """
+    Store a history dict in the original user_history.json layout.
+    
+    Args:
+        history: History with viewed_papers, queries and interests
+        replace: Clear the stored history first
+    """
+    conn = _get_connection()
+    if replace:
+        with conn:
+            for table in ("queries", "viewed", "interests", "topic_counts"):
+                conn.execute(f"DELETE FROM {table}")
+    _import_history(conn, history)
@@ -1,157 +1,165 @@
 """Main API interface - unified access to all features."""
 from typing import Dict, List, Optional
-from api.paper_api import get_paper_by_id, get_paper_summary
-from api.citations import get_citation_info, find_citing_papers
-from api.summaries import generate_paper_summary
-from api.authors import get_author_stats, get_author_profile
-from api.topics import cluster_papers_by_topic, get_paper_topics
-from api.rag_modes import (
-    rag_query_concise, rag_query_detailed, rag_query_explain_simple,
-    rag_query_compare, rag_query_literature_survey, rag_query_multi_document
-)
-from api.deduplication import find_duplicate_papers, normalize_arxiv_versions, merge_paper_metadata
-from api.similarity import compare_papers, check_text_similarity
-from api.query_logger import get_query_stats
-from api.ranking import calculate_citation_metrics, get_paper_rank
-from api.search import search_papers, compare_papers_side_by_side, get_paper_details_scholar_style
-from api.recommendations import (
-    recommend_papers_based_on_history, recommend_papers_for_query,
-    record_paper_view, record_query, get_trending_topics
-)
-from api.trends import analyze_topic_trends, get_field_popularity, predict_future_trends
-from api.research_gaps import (
-    identify_research_gaps, find_underexplored_combinations, suggest_research_directions
-)
-from api.exports import (
-    export_to_bibtex, export_to_csv, export_to_json, export_to_markdown, export_rag_session
-)
-from api.query_intent import classify_query_intent, route_query_by_intent
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
 class ScholarXAPI:
-    """Unified API for all ScholarX features."""
+    """
+    Unified API for all ScholarX features.
+    
+    Feature modules are imported inside each method, so importing this module
+    stays cheap and callers only load the modules (and their numpy, sklearn,
+    ChromaDB or embedding-model dependencies) they actually use.
+    """
     
     # Paper Operations
     @staticmethod
     def get_paper(paper_id: str) -> Optional[Dict]:
         """Get paper details."""
+        from api.paper_api import get_paper_by_id
         return get_paper_by_id(paper_id)
     
+    @staticmethod
+    def get_papers_batch(paper_ids: List[str]) -> Dict[str, Dict]:
+        """Get details for several papers in one batch."""
+        from api.paper_api import get_papers_by_ids
+        return get_papers_by_ids(paper_ids)
+    
     @staticmethod
     def get_paper_summary_api(paper_id: str) -> Optional[Dict]:
         """Get paper summary."""
+        from api.paper_api import get_paper_summary
         return get_paper_summary(paper_id)
     
     # Citations
     @staticmethod
     def get_citations(paper_id: str) -> Dict:
         """Get citation information."""
+        from api.citations import get_citation_info
         return get_citation_info(paper_id)
     
     @staticmethod
     def get_related_papers(paper_id: str, limit: int = 10) -> List[Dict]:
         """Get related papers."""
+        from api.citations import find_citing_papers
         return find_citing_papers(paper_id, limit)
     
     # Summaries
     @staticmethod
     def generate_summary(paper_id: str, use_llm: bool = False) -> Dict:
         """Generate paper summary."""
+        from api.summaries import generate_paper_summary
         return generate_paper_summary(paper_id, use_llm)
     
     # Authors
     @staticmethod
     def get_author_statistics() -> Dict:
         """Get author statistics."""
+        from api.authors import get_author_stats
         return get_author_stats()
     
     @staticmethod
     def get_author(author_name: str) -> Dict:
         """Get author profile."""
+        from api.authors import get_author_profile
         return get_author_profile(author_name)
     
     # Topics
     @staticmethod
     def cluster_topics(num_clusters: int = 5) -> Dict:
         """Cluster papers by topic."""
+        from api.topics import cluster_papers_by_topic
         return cluster_papers_by_topic(num_clusters)
     
     @staticmethod
     def get_paper_topics_api(paper_id: str) -> List[str]:
         """Get topics for a paper."""
+        from api.topics import get_paper_topics
         return get_paper_topics(paper_id)
     
     # RAG Modes
     @staticmethod
     def rag_concise(query: str) -> Dict:
         """RAG in concise mode."""
+        from api.rag_modes import rag_query_concise
         return rag_query_concise(query)
     
     @staticmethod
     def rag_detailed(query: str) -> Dict:
         """RAG in detailed mode."""
+        from api.rag_modes import rag_query_detailed
         return rag_query_detailed(query)
     
     @staticmethod
     def rag_explain(query: str) -> Dict:
         """RAG in simple explanation mode."""
+        from api.rag_modes import rag_query_explain_simple
         return rag_query_explain_simple(query)
     
     @staticmethod
     def rag_compare(query: str) -> Dict:
         """RAG in compare mode."""
+        from api.rag_modes import rag_query_compare
         return rag_query_compare(query)
     
     @staticmethod
     def rag_survey(topic: str) -> Dict:
         """Generate literature survey."""
+        from api.rag_modes import rag_query_literature_survey
         return rag_query_literature_survey(topic)
     
     @staticmethod
     def rag_multi_document(papers: List[str], query: str) -> Dict:
         """RAG across multiple papers."""
+        from api.rag_modes import rag_query_multi_document
         return rag_query_multi_document(papers, query)
     
     # Deduplication
     @staticmethod
     def find_duplicates(threshold: float = 0.85) -> List[Dict]:
         """Find duplicate papers."""
+        from api.deduplication import find_duplicate_papers
         return find_duplicate_papers(threshold)
     
     @staticmethod
     def normalize_versions() -> Dict:
         """Normalize ArXiv versions."""
+        from api.deduplication import normalize_arxiv_versions
         return normalize_arxiv_versions()
     
     # Similarity
     @staticmethod
     def compare_two_papers(paper_id1: str, paper_id2: str) -> Dict:
         """Compare two papers."""
+        from api.similarity import compare_papers
         return compare_papers(paper_id1, paper_id2)
     
     @staticmethod
     def check_similarity(text: str, threshold: float = 0.8) -> List[Dict]:
         """Check text similarity to papers."""
+        from api.similarity import check_text_similarity
         return check_text_similarity(text, threshold)
     
     # Analytics
     @staticmethod
     def get_query_statistics() -> Dict:
         """Get query statistics."""
+        from api.query_logger import get_query_stats
         return get_query_stats()
     
     # Ranking
     @staticmethod
     def get_citation_rankings() -> Dict:
         """Get citation-based rankings."""
+        from api.ranking import calculate_citation_metrics
         return calculate_citation_metrics()
     
     @staticmethod
     def get_paper_ranking(paper_id: str) -> Dict:
         """Get ranking for a paper."""
+        from api.ranking import get_paper_rank
         return get_paper_rank(paper_id)
     
     # Search (Google Scholar-like)
@@ -163,111 +171,132 @@ class ScholarXAPI:
         limit: int = 10
     ) -> Dict:
         """Google Scholar-like search."""
+        from api.search import search_papers
         return search_papers(query=query, author=author, year=year, limit=limit)
     
     @staticmethod
     def compare_papers(paper_ids: List[str]) -> Dict:
         """Compare papers side-by-side."""
+        from api.search import compare_papers_side_by_side
         return compare_papers_side_by_side(paper_ids)
     
     @staticmethod
     def get_paper_scholar_style(paper_id: str) -> Dict:
         """Get paper details in Google Scholar format."""
+        from api.search import get_paper_details_scholar_style
         return get_paper_details_scholar_style(paper_id)
     
     # Recommendations (NEW)
     @staticmethod
     def recommend_papers(limit: int = 10) -> List[Dict]:
         """Recommend papers based on user history."""
+        from api.recommendations import recommend_papers_based_on_history
         return recommend_papers_based_on_history(limit)
     
     @staticmethod
     def recommend_for_query(query: str, limit: int = 10) -> List[Dict]:
         """Recommend papers for a specific query."""
+        from api.recommendations import recommend_papers_for_query
         return recommend_papers_for_query(query, limit)
     
     @staticmethod
     def record_view(paper_id: str, paper_title: str = ""):
         """Record that a user viewed a paper."""
+        from api.recommendations import record_paper_view
         record_paper_view(paper_id, paper_title)
     
     @staticmethod
     def record_user_query(query: str):
         """Record a user query for recommendations."""
+        from api.recommendations import record_query
         record_query(query)
     
     @staticmethod
     def get_trending_topics_api(days: int = 30) -> List[Dict]:
         """Get trending topics."""
+        from api.recommendations import get_trending_topics
         return get_trending_topics(days)
     
     # Trends (NEW)
     @staticmethod
     def analyze_trends(years: Optional[List[int]] = None) -> Dict:
         """Analyze topic trends over time."""
+        from api.trends import analyze_topic_trends
         return analyze_topic_trends(years)
     
     @staticmethod
     def get_field_trends(field: str) -> Dict:
         """Get popularity trend for a field."""
+        from api.trends import get_field_popularity
         return get_field_popularity(field)
     
     @staticmethod
     def predict_trends(field: str, years_ahead: int = 3) -> Dict:
         """Predict future trends for a field."""
+        from api.trends import predict_future_trends
         return predict_future_trends(field, years_ahead)
     
     # Research Gaps (NEW)
     @staticmethod
     def find_gaps(topic: str, min_papers: int = 5) -> Dict:
         """Identify research gaps in a topic."""
+        from api.research_gaps import identify_research_gaps
         return identify_research_gaps(topic, min_papers)
     
     @staticmethod
     def find_combination_gaps(concept1: str, concept2: str) -> Dict:
         """Find if a combination of concepts is underexplored."""
+        from api.research_gaps import find_underexplored_combinations
         return find_underexplored_combinations(concept1, concept2)
     
     @staticmethod
     def suggest_directions(topic: str) -> List[str]:
         """Suggest research directions based on gaps."""
+        from api.research_gaps import suggest_research_directions
         return suggest_research_directions(topic)
     
     # Exports (NEW)
     @staticmethod
     def export_bibtex(paper_ids: Optional[List[str]] = None, filename: str = "papers.bib") -> str:
         """Export papers to BibTeX."""
+        from api.exports import export_to_bibtex
         return export_to_bibtex(paper_ids, filename)
     
     @staticmethod
     def export_csv(paper_ids: Optional[List[str]] = None, filename: str = "papers.csv") -> str:
         """Export papers to CSV."""
+        from api.exports import export_to_csv
         return export_to_csv(paper_ids, filename)
     
     @staticmethod
     def export_json(paper_ids: Optional[List[str]] = None, filename: str = "papers.json") -> str:
         """Export papers to JSON."""
+        from api.exports import export_to_json
         return export_to_json(paper_ids, filename)
     
     @staticmethod
     def export_markdown(paper_ids: Optional[List[str]] = None, filename: str = "papers.md") -> str:
         """Export papers to Markdown."""
+        from api.exports import export_to_markdown
         return export_to_markdown(paper_ids, filename)
     
     @staticmethod
     def export_rag(query: str, answer: str, citations: List[Dict], filename: str = "rag_session.md") -> str:
         """Export a RAG session."""
+        from api.exports import export_rag_session
         return export_rag_session(query, answer, citations, filename)
     
     # Query Intent (NEW)
     @staticmethod
     def classify_intent(query: str) -> Dict:
         """Classify query intent."""
+        from api.query_intent import classify_query_intent
         return classify_query_intent(query)
     
     @staticmethod
     def route_query(query: str) -> Dict:
         """Route query to appropriate handler."""
+        from api.query_intent import route_query_by_intent
         return route_query_by_intent(query)
 
 
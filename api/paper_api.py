@@ -2,73 +2,182 @@
 from typing import Dict, List, Optional
 from config.chroma_client import get_collection
 from vectorstore.query import query_by_paper_id
+from utils.chroma_cache import get_cached_paper, cache_paper
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _top_chunk_ids(chunk_ids: List[str], metadatas: List[Dict], limit: int = 10) -> List[tuple]:
+    """Pick one chunk per index for the lowest chunk indices (representing different sections)."""
+    chunk_id_by_index = {}
+    for i, chunk_id in enumerate(chunk_ids):
+        chunk_meta = metadatas[i] if metadatas else {}
+        chunk_id_by_index.setdefault(chunk_meta.get("chunk_index", i), chunk_id)
+    return [(idx, chunk_id_by_index[idx]) for idx in sorted(chunk_id_by_index)[:limit]]
+
+
+def _build_paper(
+    paper_id: str,
+    metadata: Dict,
+    chunk_count: int,
+    top_chunks: List[tuple],
+    text_by_id: Dict[str, str]
+) -> Dict:
+    """Assemble the paper dict returned by get_paper_by_id / get_papers_by_ids."""
+    chunk_data = []
+    for chunk_idx, chunk_id in top_chunks:
+        chunk_text = text_by_id.get(chunk_id) or ""
+        chunk_data.append({
+            "chunk_index": chunk_idx,
+            "text": chunk_text[:500],  # Preview
+            "full_text": chunk_text
+        })
+    
+    return {
+        "paper_id": paper_id,
+        "title": metadata.get("title", "Unknown"),
+        "authors": metadata.get("authors", "Unknown"),
+        "abstract": metadata.get("abstract", ""),
+        "year": metadata.get("year"),
+        "pdf_url": metadata.get("pdf_url", ""),
+        "source": metadata.get("source", "unknown"),
+        "doi": metadata.get("doi", ""),
+        "arxiv_id": metadata.get("arxiv_id", ""),
+        "keywords": metadata.get("keywords", ""),
+        "word_count": metadata.get("word_count", 0),
+        "chunk_count": chunk_count,
+        "top_chunks": chunk_data,
+        "ingestion_date": metadata.get("ingestion_date", "")
+    }
+
+
+def _get_documents(collection, chunk_ids: List[str]) -> Dict[str, str]:
+    """Fetch documents for specific chunk IDs in one call."""
+    if not chunk_ids:
+        return {}
+    docs = collection.get(ids=chunk_ids, include=["documents"])
+    return dict(zip(docs.get("ids") or [], docs.get("documents") or []))
+
+
 def get_paper_by_id(paper_id: str) -> Optional[Dict]:
     """
     Get paper details by ID.
     
+    Results are cached per paper (LRU with a TTL) and invalidated when the
+    paper's chunks are upserted or deleted.
+    
     Returns:
         Paper metadata with abstract, authors, top chunks, etc.
     """
+    cached = get_cached_paper(paper_id)
+    if cached is not None:
+        return cached
+    
     collection = get_collection()
     
     try:
-        # Get all chunks for this paper
+        # Metadata only for every chunk; documents are fetched for the top chunks below
         chunks = collection.get(
             where={"paper_id": paper_id},
-            limit=1000
+            limit=1000,
+            include=["metadatas"]
         )
         
         if not chunks.get("ids"):
             return None
         
-        # Get metadata from first chunk
-        metadata = chunks["metadatas"][0] if chunks.get("metadatas") else {}
+        metadatas = chunks.get("metadatas") or []
+        top_chunks = _top_chunk_ids(chunks["ids"], metadatas)
         
-        # Get top chunks (by index, representing different sections)
-        chunk_data = []
-        seen_indices = set()
-        for i, chunk_id in enumerate(chunks["ids"]):
-            chunk_meta = chunks["metadatas"][i] if chunks.get("metadatas") else {}
-            chunk_text = chunks["documents"][i] if chunks.get("documents") else ""
-            chunk_idx = chunk_meta.get("chunk_index", i)
-            
-            if chunk_idx not in seen_indices:
-                chunk_data.append({
-                    "chunk_index": chunk_idx,
-                    "text": chunk_text[:500],  # Preview
-                    "full_text": chunk_text
-                })
-                seen_indices.add(chunk_idx)
-                if len(chunk_data) >= 10:  # Top 10 chunks
-                    break
+        paper = _build_paper(
+            paper_id,
+            metadatas[0] if metadatas else {},  # Metadata from first chunk
+            len(chunks["ids"]),
+            top_chunks,
+            _get_documents(collection, [chunk_id for _, chunk_id in top_chunks])
+        )
         
-        return {
-            "paper_id": paper_id,
-            "title": metadata.get("title", "Unknown"),
-            "authors": metadata.get("authors", "Unknown"),
-            "abstract": metadata.get("abstract", ""),
-            "year": metadata.get("year"),
-            "pdf_url": metadata.get("pdf_url", ""),
-            "source": metadata.get("source", "unknown"),
-            "doi": metadata.get("doi", ""),
-            "arxiv_id": metadata.get("arxiv_id", ""),
-            "keywords": metadata.get("keywords", ""),
-            "word_count": metadata.get("word_count", 0),
-            "chunk_count": len(chunks["ids"]),
-            "top_chunks": chunk_data,
-            "ingestion_date": metadata.get("ingestion_date", "")
-        }
+        # Misses and errors are not cached, so a newly ingested paper shows up immediately
+        cache_paper(paper_id, paper)
+        return paper
         
     except Exception as e:
         logger.error(f"Error getting paper: {e}")
         return None
 
 
+def get_papers_by_ids(paper_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Get details for several papers with two ChromaDB calls in total.
+    
+    Cached papers are served directly; the rest are fetched with one
+    metadata query over all missing IDs and one document query for their
+    top chunks.
+    
+    Args:
+        paper_ids: Paper IDs to look up
+        
+    Returns:
+        Dictionary mapping paper_id to paper details (missing papers are omitted)
+    """
+    papers = {}
+    missing = []
+    for paper_id in dict.fromkeys(paper_ids):
+        cached = get_cached_paper(paper_id)
+        if cached is not None:
+            papers[paper_id] = cached
+        else:
+            missing.append(paper_id)
+    
+    if not missing:
+        return papers
+    
+    collection = get_collection()
+    
+    try:
+        chunks = collection.get(
+            where={"paper_id": {"$in": missing}},
+            include=["metadatas"]
+        )
+        
+        # Bucket chunks by paper
+        chunk_ids_by_paper = {}
+        metadatas_by_paper = {}
+        for chunk_id, chunk_meta in zip(chunks.get("ids") or [], chunks.get("metadatas") or []):
+            pid = chunk_meta.get("paper_id")
+            chunk_ids_by_paper.setdefault(pid, []).append(chunk_id)
+            metadatas_by_paper.setdefault(pid, []).append(chunk_meta)
+        
+        top_chunks_by_paper = {
+            pid: _top_chunk_ids(chunk_ids_by_paper[pid], metadatas_by_paper[pid])
+            for pid in chunk_ids_by_paper
+        }
+        text_by_id = _get_documents(collection, [
+            chunk_id
+            for top_chunks in top_chunks_by_paper.values()
+            for _, chunk_id in top_chunks
+        ])
+        
+        for paper_id in missing:
+            if paper_id not in top_chunks_by_paper:
+                continue
+            paper = _build_paper(
+                paper_id,
+                metadatas_by_paper[paper_id][0],
+                len(chunk_ids_by_paper[paper_id]),
+                top_chunks_by_paper[paper_id],
+                text_by_id
+            )
+            cache_paper(paper_id, paper)
+            papers[paper_id] = paper
+        
+    except Exception as e:
+        logger.error(f"Error getting papers: {e}")
+    
+    return papers
+
+
 def get_paper_summary(paper_id: str) -> Optional[Dict]:
     """
     Get paper summary (abstract + key chunks).
@@ -84,10 +193,11 @@ def get_paper_summary(paper_id: str) -> Optional[Dict]:
     key_insights = []
     for chunk in paper.get("top_chunks", [])[:5]:
         text = chunk.get("full_text", chunk.get("text", ""))
-        # Get first sentence
-        first_sentence = text.split('.')[0] if '.' in text else text[:200]
-        if first_sentence.strip():
-            key_insights.append(first_sentence.strip() + ".")
+        # Get first sentence (partition stops at the first '.')
+        head, sep, _ = text.partition('.')
+        first_sentence = (head if sep else text[:200]).strip()
+        if first_sentence:
+            key_insights.append(first_sentence + ".")
     
     return {
         "paper_id": paper_id,
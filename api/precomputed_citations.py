@@ -0,0 +1,123 @@
+"""Precomputed incoming-citation counts, persisted between runs."""
+from typing import Dict, List, Optional
+from pathlib import Path
+import json
+import os
+import time
+from config.chroma_client import get_collection
+from api.citations import find_citing_papers_batch
+from utils.chroma_cache import get_all_metadata
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CITATION_COUNTS_FILE = Path(__file__).parent.parent / "citation_counts.json"
+
+# Counts older than this are recomputed even if the collection has not changed
+CITATION_COUNTS_TTL = 86400
+
+# Citing papers considered per paper (caps each paper's count)
+CITATION_SCAN_LIMIT = 20
+
+
+def compute_citation_counts(paper_ids: List[str]) -> Dict[str, int]:
+    """
+    Count similarity-based incoming citations for each paper.
+    
+    Args:
+        paper_ids: Papers to score
+    
+    Returns:
+        Dictionary mapping paper_id to its incoming citation count
+    """
+    citing_by_paper = find_citing_papers_batch(paper_ids, limit=CITATION_SCAN_LIMIT)
+    return {pid: len(citing) for pid, citing in citing_by_paper.items()}
+
+
+def load_citation_counts(chunk_count: int, max_age: int = CITATION_COUNTS_TTL) -> Optional[Dict[str, int]]:
+    """
+    Load persisted citation counts if they are still fresh.
+    
+    Args:
+        chunk_count: Current collection chunk count; counts computed for a
+            different collection size are treated as stale
+        max_age: Maximum age in seconds
+    
+    Returns:
+        Dictionary mapping paper_id to count, or None if missing or stale
+    """
+    try:
+        with open(CITATION_COUNTS_FILE, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable citation counts file: {e}")
+        return None
+    
+    if stored.get("chunk_count") != chunk_count:
+        return None
+    if time.time() - stored.get("computed_at", 0) > max_age:
+        return None
+    return stored.get("counts", {})
+
+
+def save_citation_counts(counts: Dict[str, int], chunk_count: int) -> None:
+    """Persist citation counts atomically, tagged with the collection size they describe."""
+    tmp_path = CITATION_COUNTS_FILE.with_suffix(".tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "chunk_count": chunk_count,
+                "computed_at": time.time(),
+                "counts": counts
+            }, f)
+        os.replace(tmp_path, CITATION_COUNTS_FILE)
+    except Exception as e:
+        logger.warning(f"Failed to save citation counts: {e}")
+
+
+def get_citation_counts(paper_ids: List[str], chunk_count: int) -> Dict[str, int]:
+    """
+    Get incoming citation counts, from the persisted file when fresh.
+    
+    Falls back to computing (and persisting) the counts when the file is
+    missing, stale, or does not cover every requested paper.
+    
+    Args:
+        paper_ids: Papers to score
+        chunk_count: Current collection chunk count
+    
+    Returns:
+        Dictionary mapping paper_id to its incoming citation count
+    """
+    counts = load_citation_counts(chunk_count)
+    if counts is not None and all(pid in counts for pid in paper_ids):
+        logger.debug(f"Using precomputed citation counts for {len(paper_ids)} papers")
+        return counts
+    
+    counts = compute_citation_counts(paper_ids)
+    save_citation_counts(counts, chunk_count)
+    return counts
+
+
+def precompute_citation_counts() -> Dict[str, int]:
+    """
+    Recompute and persist citation counts for every paper in the collection.
+    
+    Run after ingesting papers (or periodically) so ranking requests read
+    the stored counts instead of running one similarity search per paper.
+    
+    Returns:
+        Dictionary mapping paper_id to its incoming citation count
+    """
+    collection = get_collection()
+    chunk_count = collection.count()
+    paper_ids = list(dict.fromkeys(
+        meta.get("paper_id", "unknown") for meta in get_all_metadata(collection)["metadatas"]
+    ))
+    
+    counts = compute_citation_counts(paper_ids)
+    save_citation_counts(counts, chunk_count)
+    logger.info(f"Precomputed citation counts for {len(counts)} papers")
+    return counts
@@ -1,5 +1,6 @@
 """Query intent classification and smart routing."""
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from utils.logger import get_logger
 import re
 
@@ -19,86 +20,144 @@ class QueryIntent:
     UNKNOWN = "unknown"
 
 
+# Distinct normalized queries kept by the classification cache
+INTENT_CACHE_SIZE = 4096
+
+# Common stop words and question words skipped by extract_entities
+_STOP_WORDS = frozenset({
+    "what", "is", "are", "the", "a", "an", "how", "why", "when", "where",
+    "which", "who", "do", "does", "can", "could", "should", "would",
+    "compare", "explain", "describe", "define", "about", "on", "in", "to"
+})
+
+# Keyword patterns per intent, used by classify_query_intent
+INTENT_PATTERNS = (
+    (QueryIntent.FACTUAL, (
+        r"what is",
+        r"what are",
+        r"define",
+        r"definition of",
+        r"meaning of"
+    )),
+    (QueryIntent.COMPARISON, (
+        r"compare",
+        r"difference between",
+        r"vs\.",
+        r"versus",
+        r"contrast"
+    )),
+    (QueryIntent.HOW_TO, (
+        r"how to",
+        r"how do",
+        r"how can",
+        r"steps to",
+        r"method to"
+    )),
+    (QueryIntent.EXPLANATION, (
+        r"explain",
+        r"why",
+        r"how does",
+        r"how works",
+        r"describe"
+    )),
+    (QueryIntent.LITERATURE_SURVEY, (
+        r"survey",
+        r"review",
+        r"overview of",
+        r"state of the art",
+        r"literature on"
+    )),
+    (QueryIntent.RECOMMENDATION, (
+        r"recommend",
+        r"suggest",
+        r"find papers",
+        r"papers about",
+        r"related to"
+    )),
+    (QueryIntent.TREND_ANALYSIS, (
+        r"trend",
+        r"popular",
+        r"recent developments",
+        r"evolution of",
+        r"changes in"
+    )),
+    (QueryIntent.RESEARCH_GAP, (
+        r"gap",
+        r"missing",
+        r"underexplored",
+        r"future research",
+        r"open problem"
+    )),
+)
+
+# Compiled patterns per intent. Each pattern is counted on its own:
+# keywords of one intent overlap ("find papers about"), and a single
+# alternation would count only one of them.
+_INTENT_REGEXES = {
+    intent: tuple(re.compile(pattern) for pattern in pattern_list)
+    for intent, pattern_list in INTENT_PATTERNS
+}
+
+
+def _build_intent_automaton():
+    """Build an Aho-Corasick automaton over all intent keywords, if pyahocorasick is installed."""
+    try:
+        import ahocorasick
+    except ImportError:
+        logger.debug("pyahocorasick not installed, intent classification will use regex scans")
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for intent, pattern_list in INTENT_PATTERNS:
+        for pattern in pattern_list:
+            # Every pattern is a literal apart from escaped punctuation ("vs\.")
+            keyword = re.sub(r"\\(.)", r"\1", pattern)
+            automaton.add_word(keyword, (intent, keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+# Single-pass multi-keyword matcher shared by all queries (None without pyahocorasick)
+_INTENT_AUTOMATON = _build_intent_automaton()
+
+
 def classify_query_intent(query: str) -> Dict:
     """
     Classify the intent of a user query.
     
+    Results are memoized on the normalized query, so repeated queries skip
+    the keyword scan and entity extraction.
+    
     Args:
         query: User query string
         
     Returns:
         Dictionary with intent classification and confidence
     """
-    query_lower = query.lower()
+    primary_intent, confidence, intent_scores, entities = _classify_normalized(query.strip().lower())
     
-    # Pattern matching for intent classification
-    patterns = {
-        QueryIntent.FACTUAL: [
-            r"what is",
-            r"what are",
-            r"define",
-            r"definition of",
-            r"meaning of"
-        ],
-        QueryIntent.COMPARISON: [
-            r"compare",
-            r"difference between",
-            r"vs\.",
-            r"versus",
-            r"contrast"
-        ],
-        QueryIntent.HOW_TO: [
-            r"how to",
-            r"how do",
-            r"how can",
-            r"steps to",
-            r"method to"
-        ],
-        QueryIntent.EXPLANATION: [
-            r"explain",
-            r"why",
-            r"how does",
-            r"how works",
-            r"describe"
-        ],
-        QueryIntent.LITERATURE_SURVEY: [
-            r"survey",
-            r"review",
-            r"overview of",
-            r"state of the art",
-            r"literature on"
-        ],
-        QueryIntent.RECOMMENDATION: [
-            r"recommend",
-            r"suggest",
-            r"find papers",
-            r"papers about",
-            r"related to"
-        ],
-        QueryIntent.TREND_ANALYSIS: [
-            r"trend",
-            r"popular",
-            r"recent developments",
-            r"evolution of",
-            r"changes in"
-        ],
-        QueryIntent.RESEARCH_GAP: [
-            r"gap",
-            r"missing",
-            r"underexplored",
-            r"future research",
-            r"open problem"
-        ]
+    return {
+        "intent": primary_intent,
+        "confidence": confidence,
+        "all_scores": dict(intent_scores),
+        "entities": list(entities),
+        "query": query
     }
-    
-    intent_scores = {}
-    
-    for intent, pattern_list in patterns.items():
-        score = 0
-        for pattern in pattern_list:
-            matches = len(re.findall(pattern, query_lower))
-            score += matches
-        intent_scores[intent] = score
+
+
+@lru_cache(maxsize=INTENT_CACHE_SIZE)
+def _classify_normalized(query_lower: str) -> Tuple:
+    """Score intents for a stripped, lowercased query (cached; returns immutable parts)."""
+    if _INTENT_AUTOMATON is not None:
+        # One DFA pass over the query finds every keyword of every intent
+        intent_scores = dict.fromkeys(_INTENT_REGEXES, 0)
+        for _, (intent, _) in _INTENT_AUTOMATON.iter(query_lower):
+            intent_scores[intent] += 1
+    else:
+        intent_scores = {
+            intent: sum(len(regex.findall(query_lower)) for regex in regexes)
+            for intent, regexes in _INTENT_REGEXES.items()
+        }
     
     # Determine primary intent
     max_score = max(intent_scores.values())
@@ -113,15 +172,14 @@ def classify_query_intent(query: str) -> Dict:
         confidence = 0.3
     
     # Extract entities/topics
-    entities = extract_entities(query)
+    entities = extract_entities(query_lower)
     
-    return {
-        "intent": primary_intent,
-        "confidence": confidence,
-        "all_scores": intent_scores,
-        "entities": entities,
-        "query": query
-    }
+    return primary_intent, confidence, tuple(intent_scores.items()), tuple(entities)
+
+
+def clear_intent_cache() -> None:
+    """Drop memoized intent classifications."""
+    _classify_normalized.cache_clear()
 
 
 def extract_entities(query: str) -> List[str]:
@@ -134,25 +192,54 @@ def extract_entities(query: str) -> List[str]:
     Returns:
         List of extracted entities
     """
-    # Remove common stop words and question words
-    stop_words = {
-        "what", "is", "are", "the", "a", "an", "how", "why", "when", "where",
-        "which", "who", "do", "does", "can", "could", "should", "would",
-        "compare", "explain", "describe", "define", "about", "on", "in", "to"
-    }
-    
-    words = query.lower().split()
-    entities = [w for w in words if w not in stop_words and len(w) > 2]
+    # Unique non-stop words in order of appearance (dict keeps insertion order)
+    entities = {}
+    for w in query.lower().split():
+        if len(w) > 2 and w not in _STOP_WORDS and w not in entities:
+            entities[w] = None
+            if len(entities) == 5:  # Top 5 entities
+                break
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_entities = []
-    for e in entities:
-        if e not in seen:
-            seen.add(e)
-            unique_entities.append(e)
-    
-    return unique_entities[:5]  # Top 5 entities
+    return list(entities)
+
+
+# intent -> (recommended RAG mode, recommended API, suggestion)
+INTENT_ROUTES = {
+    QueryIntent.COMPARISON: (
+        "compare", "rag_compare",
+        "Use comparison mode for detailed side-by-side analysis"
+    ),
+    QueryIntent.EXPLANATION: (
+        "explain", "rag_explain",
+        "Use explain mode for simplified explanations"
+    ),
+    QueryIntent.LITERATURE_SURVEY: (
+        "survey", "rag_survey",
+        "Use survey mode for comprehensive literature reviews"
+    ),
+    QueryIntent.RECOMMENDATION: (
+        None, "recommend_papers",
+        "Use recommendation API to find relevant papers"
+    ),
+    QueryIntent.TREND_ANALYSIS: (
+        None, "analyze_trends",
+        "Use trend analysis to see how topics evolved over time"
+    ),
+    QueryIntent.RESEARCH_GAP: (
+        None, "identify_gaps",
+        "Use research gap identification to find underexplored areas"
+    ),
+    QueryIntent.FACTUAL: (
+        "detailed", "rag_detailed",
+        "Use detailed mode for comprehensive answers"
+    ),
+    QueryIntent.HOW_TO: (
+        "detailed", "rag_detailed",
+        "Use detailed mode for comprehensive answers"
+    ),
+}
+
+_DEFAULT_ROUTE = ("concise", "rag_concise", "Use concise mode for quick answers")
 
 
 def route_query_by_intent(query: str, intent_classification: Optional[Dict] = None) -> Dict:
@@ -171,50 +258,13 @@ def route_query_by_intent(query: str, intent_classification: Optional[Dict] = No
     
     intent = intent_classification["intent"]
     
-    routing = {
-        "intent": intent,
-        "recommended_mode": None,
-        "recommended_api": None,
-        "suggestions": []
-    }
-    
     # Map intent to recommended RAG mode or API
-    if intent == QueryIntent.COMPARISON:
-        routing["recommended_mode"] = "compare"
-        routing["recommended_api"] = "rag_compare"
-        routing["suggestions"].append("Use comparison mode for detailed side-by-side analysis")
-    
-    elif intent == QueryIntent.EXPLANATION:
-        routing["recommended_mode"] = "explain"
-        routing["recommended_api"] = "rag_explain"
-        routing["suggestions"].append("Use explain mode for simplified explanations")
-    
-    elif intent == QueryIntent.LITERATURE_SURVEY:
-        routing["recommended_mode"] = "survey"
-        routing["recommended_api"] = "rag_survey"
-        routing["suggestions"].append("Use survey mode for comprehensive literature reviews")
-    
-    elif intent == QueryIntent.RECOMMENDATION:
-        routing["recommended_api"] = "recommend_papers"
-        routing["suggestions"].append("Use recommendation API to find relevant papers")
-    
-    elif intent == QueryIntent.TREND_ANALYSIS:
-        routing["recommended_api"] = "analyze_trends"
-        routing["suggestions"].append("Use trend analysis to see how topics evolved over time")
-    
-    elif intent == QueryIntent.RESEARCH_GAP:
-        routing["recommended_api"] = "identify_gaps"
-        routing["suggestions"].append("Use research gap identification to find underexplored areas")
+    mode, api_name, suggestion = INTENT_ROUTES.get(intent, _DEFAULT_ROUTE)
     
-    elif intent == QueryIntent.FACTUAL or intent == QueryIntent.HOW_TO:
-        routing["recommended_mode"] = "detailed"
-        routing["recommended_api"] = "rag_detailed"
-        routing["suggestions"].append("Use detailed mode for comprehensive answers")
-    
-    else:
-        routing["recommended_mode"] = "concise"
-        routing["recommended_api"] = "rag_concise"
-        routing["suggestions"].append("Use concise mode for quick answers")
-    
-    return routing
+    return {
+        "intent": intent,
+        "recommended_mode": mode,
+        "recommended_api": api_name,
+        "suggestions": [suggestion]
+    }
 
@@ -1,5 +1,13 @@
 """Query logging for analytics."""
+import atexit
+import copy
 import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
@@ -9,6 +17,113 @@ logger = get_logger(__name__)
 
 LOG_FILE = Path("query_logs.jsonl")
 
+# Sidecar holding running totals for LOG_FILE up to a byte offset
+STATS_CACHE = Path("query_logs.stats.json")
+STATS_LOCK = Path("query_logs.stats.lock")
+
+# Background writer: entries are queued and appended in batches
+LOG_QUEUE_SIZE = 10_000
+LOG_BATCH_SIZE = 64
+LOG_FLUSH_INTERVAL = 0.1  # Seconds to wait for a batch to fill
+# Keep each write under PIPE_BUF so concurrent O_APPEND writers never interleave
+LOG_WRITE_MAX_BYTES = 4000
+
+try:
+    import orjson
+    _loads = orjson.loads
+    # Serializes datetime natively, in the same format as datetime.isoformat()
+    _dumps = orjson.dumps
+except ImportError:
+    # json.loads accepts UTF-8 bytes as well
+    _loads = json.loads
+    
+    def _dumps(entry: Dict) -> bytes:
+        return json.dumps(entry, ensure_ascii=False, default=datetime.isoformat).encode("utf-8")
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+
+_log_queue: "queue.Queue[bytes]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_writer_thread = None
+_writer_lock = threading.Lock()
+_log_fd = None
+
+# Last get_query_stats result, keyed by the (inode, size) of LOG_FILE it was computed from
+_stats_memo: Dict = {"key": None, "stats": None}
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """os.write until every byte of data is on disk."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _log_writer() -> None:
+    """Drain queued log lines, appending them to LOG_FILE in batches."""
+    global _log_fd
+    # Unbuffered O_APPEND descriptor: the kernel positions every write at end of file
+    _log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    pending = None
+    while True:
+        line = pending if pending is not None else _log_queue.get()
+        pending = None
+        batch = [line]
+        size = len(line)
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        while len(batch) < LOG_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                line = _log_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if size + len(line) > LOG_WRITE_MAX_BYTES:
+                pending = line  # Starts the next batch
+                break
+            batch.append(line)
+            size += len(line)
+        
+        try:
+            _write_all(_log_fd, b"".join(batch))
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} query log entries: {e}")
+        finally:
+            for _ in batch:
+                _log_queue.task_done()
+
+
+def _ensure_writer() -> None:
+    """Start the background log writer on first use."""
+    global _writer_thread
+    if _writer_thread is not None and _writer_thread.is_alive():
+        return
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_log_writer, name="query-log-writer", daemon=True)
+            _writer_thread.start()
+
+
+def flush_query_log() -> None:
+    """Block until every queued log entry has been written."""
+    if _writer_thread is not None and _writer_thread.is_alive():
+        _log_queue.join()
+
+
+def _close_query_log() -> None:
+    """Flush pending entries and close the log descriptor at interpreter exit."""
+    flush_query_log()
+    if _log_fd is not None:
+        os.close(_log_fd)
+
+
+atexit.register(_close_query_log)
+
 
 def log_query(
     query: str,
@@ -31,8 +146,9 @@ def log_query(
         time_taken: Time in seconds
         mode: RAG mode used
     """
+    # The timestamp is left as a datetime and formatted by the serializer
     log_entry = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(),
         "query": query,
         "answer_length": len(answer),
         "papers_used": papers_used,
@@ -43,20 +159,110 @@ def log_query(
         "time_taken": time_taken
     }
     
-    # Append to JSONL file
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+    # Hand off to the background writer (blocks only if the queue is full)
+    _ensure_writer()
+    _log_queue.put(_dumps(log_entry) + b"\n")
     
     logger.debug(f"Logged query: {query[:50]}...")
 
 
+def _empty_rollup() -> Dict:
+    """Fresh running totals for a log read from byte 0."""
+    return {
+        "inode": None,
+        "last_offset": 0,
+        "total": 0,
+        "time_sum": 0.0,
+        "query_counter": Counter(),
+        "paper_usage": Counter()
+    }
+
+
+def _load_rollup() -> Dict:
+    """Load the stats sidecar, or start over if it is missing or unreadable."""
+    try:
+        with open(STATS_CACHE, "r", encoding="utf-8") as f:
+            rollup = json.load(f)
+        rollup["query_counter"] = Counter(rollup["query_counter"])
+        rollup["paper_usage"] = Counter(rollup["paper_usage"])
+        return rollup
+    except FileNotFoundError:
+        return _empty_rollup()
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable query stats cache: {e}")
+        return _empty_rollup()
+
+
+def _save_rollup(rollup: Dict) -> None:
+    """Write the stats sidecar atomically."""
+    tmp_path = STATS_CACHE.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(rollup, f)
+    os.replace(tmp_path, STATS_CACHE)
+
+
+@contextmanager
+def _rollup_lock():
+    """Serialize sidecar updates across processes (no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    with open(STATS_LOCK, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _update_rollup() -> Dict:
+    """Fold log lines appended since the last call into the sidecar totals."""
+    with _rollup_lock():
+        rollup = _load_rollup()
+        stat = os.stat(LOG_FILE)
+        
+        # Truncated or rotated log: rebuild from the start
+        if rollup["inode"] != stat.st_ino or stat.st_size < rollup["last_offset"]:
+            rollup = _empty_rollup()
+            rollup["inode"] = stat.st_ino
+        
+        if stat.st_size == rollup["last_offset"]:
+            return rollup
+        
+        offset = rollup["last_offset"]
+        with open(LOG_FILE, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partially written entry; pick it up next time
+                offset += len(line)
+                if not line.strip():
+                    continue
+                q = _loads(line)
+                rollup["total"] += 1
+                rollup["time_sum"] += q.get("time_taken", 0)
+                rollup["query_counter"][q["query"]] += 1
+                rollup["paper_usage"].update(q.get("papers_used", ()))
+        
+        rollup["last_offset"] = offset
+        _save_rollup(rollup)
+        return rollup
+
+
 def get_query_stats() -> Dict:
     """
     Get statistics from query logs.
     
+    Totals are kept in a sidecar file, so each call only reads the part of
+    the log appended since the previous call. If the log has not grown since
+    the last call in this process, the previous result is reused without
+    touching the sidecar or re-ranking the counters.
+    
     Returns:
         Dictionary with query statistics
     """
+    flush_query_log()
+    
     if not LOG_FILE.exists():
         return {
             "total_queries": 0,
@@ -65,31 +271,25 @@ def get_query_stats() -> Dict:
             "papers_usage": {}
         }
     
-    queries = []
-    with open(LOG_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                queries.append(json.loads(line))
+    stat = os.stat(LOG_FILE)
+    memo_key = (stat.st_ino, stat.st_size)
+    if _stats_memo["key"] == memo_key:
+        return copy.deepcopy(_stats_memo["stats"])
     
-    if not queries:
+    rollup = _update_rollup()
+    total = rollup["total"]
+    
+    if not total:
         return {"total_queries": 0}
     
     # Calculate stats
-    total = len(queries)
-    avg_time = sum(q.get("time_taken", 0) for q in queries) / total
-    
-    # Most common queries
-    from collections import Counter
-    query_texts = [q["query"] for q in queries]
-    common_queries = Counter(query_texts).most_common(10)
+    avg_time = rollup["time_sum"] / total
     
-    # Paper usage
-    paper_usage = Counter()
-    for q in queries:
-        for pid in q.get("papers_used", []):
-            paper_usage[pid] += 1
+    # Most common queries (most_common(n) is a heapq.nlargest partial top-k, not a full sort)
+    common_queries = rollup["query_counter"].most_common(10)
+    paper_usage = rollup["paper_usage"]
     
-    return {
+    stats = {
         "total_queries": total,
         "avg_time_seconds": avg_time,
         "most_common_queries": [{"query": q, "count": c} for q, c in common_queries],
@@ -98,6 +298,7 @@ def get_query_stats() -> Dict:
             for pid, count in paper_usage.most_common(10)
         ]
     }
-
-
-
+    
+    _stats_memo["key"] = memo_key
+    _stats_memo["stats"] = stats
+    return copy.deepcopy(stats)
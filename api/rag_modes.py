@@ -1,13 +1,47 @@
 """Advanced RAG modes for different use cases."""
+import re
 from typing import Dict, List
 from rag.pipeline import run_rag_pipeline
 from rag.generator import generate_answer, RAGResponse
 from vectorstore.query import QueryResult
+from utils.llm_cache import cached_rag
+from api.semantic_cache import semantic_cached_rag
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-
+# Literature survey retrieval: one sub-query per section of the survey
+SURVEY_SUBQUERY_TEMPLATES = (
+    "history of {topic}",
+    "key approaches to {topic}",
+    "recent advances in {topic}",
+    "challenges in {topic}",
+    "future directions in {topic}",
+)
+
+# "A vs B", "A versus B", "A compared to B"
+_COMPARE_SPLIT = re.compile(r"\s+(?:vs\.?|versus|compared (?:to|with))\s+", re.IGNORECASE)
+# "compare A and B", "difference between A and B"
+_COMPARE_PAIR = re.compile(
+    r"^(?:compare|contrast|differences? between)\s+(.+?)\s+(?:and|with|to)\s+(.+?)\??$",
+    re.IGNORECASE
+)
+
+
+def _comparison_subjects(query: str) -> List[str]:
+    """Extract the things being compared from a query (empty if none are recognised)."""
+    query = query.strip()
+    match = _COMPARE_PAIR.match(query)
+    if match:
+        return [match.group(1), match.group(2)]
+    
+    subjects = [part.strip(" ?") for part in _COMPARE_SPLIT.split(query)]
+    subjects = [subject for subject in subjects if subject]
+    return subjects if len(subjects) > 1 else []
+
+
+@cached_rag("concise")
+@semantic_cached_rag("concise")
 def rag_query_concise(query: str, top_k: int = 3) -> Dict:
     """RAG query in concise mode - short, direct answers."""
     system_prompt = (
@@ -29,6 +63,8 @@ def rag_query_concise(query: str, top_k: int = 3) -> Dict:
     }
 
 
+@cached_rag("detailed")
+@semantic_cached_rag("detailed")
 def rag_query_detailed(query: str, top_k: int = 8) -> Dict:
     """RAG query in detailed mode - comprehensive answers."""
     system_prompt = (
@@ -52,6 +88,8 @@ def rag_query_detailed(query: str, top_k: int = 8) -> Dict:
     }
 
 
+@cached_rag("explain_simple")
+@semantic_cached_rag("explain_simple")
 def rag_query_explain_simple(query: str, top_k: int = 5) -> Dict:
     """RAG query in 'explain like I'm 5' mode."""
     system_prompt = (
@@ -74,6 +112,8 @@ def rag_query_explain_simple(query: str, top_k: int = 5) -> Dict:
     }
 
 
+@cached_rag("compare")
+@semantic_cached_rag("compare")
 def rag_query_compare(query: str, top_k: int = 10) -> Dict:
     """RAG query in compare mode - compare multiple papers."""
     system_prompt = (
@@ -82,10 +122,12 @@ def rag_query_compare(query: str, top_k: int = 10) -> Dict:
         "and relative strengths/weaknesses. Organize by paper or by theme."
     )
     
+    # Retrieve for each compared subject separately so one side cannot crowd out the other
     response = run_rag_pipeline(
         query=query,
         top_k=top_k,
-        system_prompt=system_prompt
+        system_prompt=system_prompt,
+        sub_queries=_comparison_subjects(query)
     )
     
     # Group citations by paper
@@ -105,6 +147,8 @@ def rag_query_compare(query: str, top_k: int = 10) -> Dict:
     }
 
 
+@cached_rag("literature_survey")
+@semantic_cached_rag("literature_survey", query_arg="topic")
 def rag_query_literature_survey(topic: str, top_k: int = 15) -> Dict:
     """Generate a literature survey on a topic."""
     query = f"Provide a comprehensive literature survey on {topic}"
@@ -119,7 +163,8 @@ def rag_query_literature_survey(topic: str, top_k: int = 15) -> Dict:
     response = run_rag_pipeline(
         query=query,
         top_k=top_k,
-        system_prompt=system_prompt
+        system_prompt=system_prompt,
+        sub_queries=[template.format(topic=topic) for template in SURVEY_SUBQUERY_TEMPLATES]
     )
     
     return {
@@ -131,6 +176,8 @@ def rag_query_literature_survey(topic: str, top_k: int = 15) -> Dict:
     }
 
 
+@cached_rag("multi_document")
+@semantic_cached_rag("multi_document")
 def rag_query_multi_document(papers: List[str], query: str, top_k: int = 5) -> Dict:
     """
     RAG query across multiple specific papers.
@@ -145,15 +192,26 @@ def rag_query_multi_document(papers: List[str], query: str, top_k: int = 5) -> D
     
     query_embedding = generate_embedding(query)
     
-    # Search within each paper
+    # One query over all requested papers instead of one per paper, then keep
+    # at most top_k chunks per paper so a single paper cannot crowd out the rest
+    paper_ids = list(dict.fromkeys(papers))
     all_chunks = []
-    for paper_id in papers:
-        chunks = query_vectors(
+    if paper_ids:
+        if len(paper_ids) == 1:
+            paper_filter = {"paper_id": paper_ids[0]}
+        else:
+            paper_filter = {"paper_id": {"$in": paper_ids}}
+        results = query_vectors(
             query_embedding=query_embedding,
-            top_k=top_k,
-            filter_metadata={"paper_id": paper_id}
+            top_k=top_k * len(paper_ids),
+            filter_metadata=paper_filter
         )
-        all_chunks.extend(chunks)
+        per_paper = {}
+        for chunk in results:
+            taken = per_paper.get(chunk.paper_id, 0)
+            if taken < top_k:
+                per_paper[chunk.paper_id] = taken + 1
+                all_chunks.append(chunk)
     
     if not all_chunks:
         return {
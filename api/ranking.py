@@ -1,31 +1,77 @@
 """Citation-based ranking and paper metrics."""
+import copy
+import threading
+import time
 from typing import List, Dict
 from collections import defaultdict
 from config.chroma_client import get_collection
-from api.citations import find_citing_papers
+from api.precomputed_citations import get_citation_counts
+from utils.chroma_cache import get_all_metadata
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Ranked metrics are reused while the collection's chunk count is unchanged, up to this many seconds
+METRICS_CACHE_TTL = 300
+
+_METRICS_CACHE = {"ts": 0.0, "count": -1, "data": None, "rank_by_pid": {}}
+_metrics_lock = threading.Lock()
+
+
+def _is_fresh(cache: Dict, count: int) -> bool:
+    """Whether a metrics snapshot still matches the collection size and TTL."""
+    return cache["count"] == count and time.time() - cache["ts"] < METRICS_CACHE_TTL
+
+
+def _ranked_metrics() -> Dict:
+    """Return the shared metrics snapshot, recomputing it when stale. Treat as read-only."""
+    global _METRICS_CACHE
+    count = get_collection().count()
+    if _is_fresh(_METRICS_CACHE, count):
+        return _METRICS_CACHE
+    
+    with _metrics_lock:
+        # Another thread may have refreshed the snapshot while we waited
+        if _is_fresh(_METRICS_CACHE, count):
+            return _METRICS_CACHE
+        
+        data = _compute_citation_metrics(count)
+        # Swap in a new snapshot so readers never see a half-updated one
+        _METRICS_CACHE = {
+            "ts": time.time(),
+            "count": count,
+            "data": data,
+            "rank_by_pid": {
+                paper["paper_id"]: (i, paper)
+                for i, paper in enumerate(data.get("ranked_papers", []), 1)
+            }
+        }
+        return _METRICS_CACHE
+
 
 def calculate_citation_metrics() -> Dict:
     """
     Calculate citation-based metrics for papers.
     
+    Results are cached for METRICS_CACHE_TTL seconds and recomputed as soon
+    as the collection's chunk count changes.
+    
     Returns:
         Dictionary with papers ranked by citations
     """
+    return copy.deepcopy(_ranked_metrics()["data"])
+
+
+def _compute_citation_metrics(count: int) -> Dict:
+    """Rank every paper in the collection by (similarity-based) incoming citations."""
     collection = get_collection()
-    count = collection.count()
     
     if count == 0:
         return {}
     
-    all_data = collection.get(limit=count)
-    
     # Get all unique papers
     papers = {}
-    for metadata in all_data.get("metadatas", []):
+    for metadata in get_all_metadata(collection)["metadatas"]:
         pid = metadata.get("paper_id", "unknown")
         if pid not in papers:
             papers[pid] = {
@@ -37,12 +83,14 @@ def calculate_citation_metrics() -> Dict:
                 "citation_score": 0
             }
     
-    # Calculate incoming citations (simplified - based on similarity)
-    for paper_id in papers.keys():
-        citing = find_citing_papers(paper_id, limit=20)
-        papers[paper_id]["incoming_citations"] = len(citing)
+    # Calculate incoming citations (simplified - based on similarity);
+    # precomputed counts are reused while the collection is unchanged
+    citation_counts = get_citation_counts(list(papers.keys()), count)
+    for paper_id, paper in papers.items():
+        incoming = citation_counts.get(paper_id, 0)
+        paper["incoming_citations"] = incoming
         # Citation score = number of papers that cite it
-        papers[paper_id]["citation_score"] = len(citing)
+        paper["citation_score"] = incoming
     
     # Rank by citation score
     ranked = sorted(
@@ -64,19 +112,18 @@ def get_paper_rank(paper_id: str) -> Dict:
     Returns:
         Paper rank, citation metrics, etc.
     """
-    metrics = calculate_citation_metrics()
+    ranked = _ranked_metrics()["rank_by_pid"].get(paper_id)
     
     paper_rank = None
-    for i, paper in enumerate(metrics.get("ranked_papers", []), 1):
-        if paper["paper_id"] == paper_id:
-            paper_rank = {
-                "paper_id": paper_id,
-                "rank": i,
-                "citation_score": paper["citation_score"],
-                "incoming_citations": paper["incoming_citations"],
-                "title": paper["title"]
-            }
-            break
+    if ranked:
+        rank, paper = ranked
+        paper_rank = {
+            "paper_id": paper_id,
+            "rank": rank,
+            "citation_score": paper["citation_score"],
+            "incoming_citations": paper["incoming_citations"],
+            "title": paper["title"]
+        }
     
     if not paper_rank:
         # Paper not in top rankings
@@ -1,97 +1,84 @@
 """Paper recommendation system based on user queries and reading patterns."""
 from typing import List, Dict, Optional
-from vectorstore.query import query_vectors
-from config.chroma_client import get_collection
-from processing.embeddings import generate_embedding
+from vectorstore.query import query_vectors, get_paper_metadata_batch
+from api.batched_embedder import embed_text
 from rag.hybrid_search import hybrid_search
 # from api.query_logger import get_query_history  # Will implement if needed
+from api import history_store
 from utils.logger import get_logger
-import json
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 logger = get_logger(__name__)
 
-# User reading history storage
-HISTORY_FILE = Path(__file__).parent.parent / "user_history.json"
+# Query words never recorded as interests
+INTEREST_STOPWORDS = frozenset({"what", "how", "when", "where", "which", "about"})
 
 
 def load_user_history() -> Dict:
     """Load user reading history."""
-    if HISTORY_FILE.exists():
-        try:
-            with open(HISTORY_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.warning(f"Failed to load user history: {e}")
-    return {"viewed_papers": [], "queries": [], "interests": []}
+    try:
+        return history_store.export_history()
+    except Exception as e:
+        logger.warning(f"Failed to load user history: {e}")
+        return {"viewed_papers": [], "queries": [], "interests": []}
 
 
 def save_user_history(history: Dict):
-    """Save user reading history."""
+    """Save user reading history (replaces the stored history)."""
     try:
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump(history, f, indent=2)
+        history_store.import_history(history)
     except Exception as e:
         logger.error(f"Failed to save user history: {e}")
 
 
 def record_paper_view(paper_id: str, paper_title: str = ""):
     """Record that a user viewed a paper."""
-    history = load_user_history()
-    if paper_id not in history["viewed_papers"]:
-        history["viewed_papers"].append({
-            "paper_id": paper_id,
-            "title": paper_title,
-            "timestamp": datetime.now().isoformat()
-        })
-        save_user_history(history)
+    try:
+        history_store.add_view(paper_id, paper_title, datetime.now().isoformat())
+    except Exception as e:
+        logger.error(f"Failed to record paper view: {e}")
 
 
 def record_query(query: str):
     """Record a user query."""
-    history = load_user_history()
-    history["queries"].append({
-        "query": query,
-        "timestamp": datetime.now().isoformat()
-    })
-    # Extract interests from queries
-    if len(history["queries"]) > 0:
-        # Simple keyword extraction
-        words = query.lower().split()
-        for word in words:
-            if len(word) > 4 and word not in ["what", "how", "when", "where", "which", "about"]:
-                if word not in history["interests"]:
-                    history["interests"].append(word)
-    save_user_history(history)
+    # Extract interests from queries (simple keyword extraction)
+    interests = list(dict.fromkeys(
+        word for word in query.lower().split()
+        if len(word) > 4 and word not in INTEREST_STOPWORDS
+    ))
+    try:
+        history_store.add_query(query, datetime.now().isoformat(), interests)
+    except Exception as e:
+        logger.error(f"Failed to record query: {e}")
 
 
-def recommend_papers_based_on_history(limit: int = 10) -> List[Dict]:
-    """
-    Recommend papers based on user's reading history and queries.
-    
-    Returns:
-        List of recommended papers with relevance scores
-    """
-    history = load_user_history()
-    collection = get_collection()
+def _get_metadata_by_paper(paper_ids: List[str]) -> Dict[str, Dict]:
+    """Fetch first-chunk metadata for several papers in one call (empty on error)."""
+    try:
+        return get_paper_metadata_batch(paper_ids)
+    except Exception as e:
+        logger.warning(f"Error getting metadata for {len(paper_ids)} papers: {e}")
+        return {}
+
+
+def _strategy_viewed(history: Dict, limit: int) -> List[Dict]:
+    """Strategy 1: papers similar to the recently viewed ones."""
     recommendations = []
-    
-    # Strategy 1: Based on viewed papers (find similar papers)
-    for viewed in history["viewed_papers"][-5:]:  # Last 5 viewed
+    recent_views = history["viewed_papers"][-5:]  # Last 5 viewed
+    viewed_meta = _get_metadata_by_paper([viewed.get("paper_id") for viewed in recent_views])
+    for viewed in recent_views:
         paper_id = viewed.get("paper_id")
         try:
-            # Get paper metadata
-            chunks = collection.get(where={"paper_id": paper_id}, limit=1)
-            if chunks.get("metadatas"):
-                meta = chunks["metadatas"][0]
+            meta = viewed_meta.get(paper_id)
+            if meta:
                 title = meta.get("title", "")
                 abstract = meta.get("abstract", "")
                 
                 # Find similar papers
                 if abstract:
                     query_text = f"{title} {abstract[:200]}"
-                    query_embedding = generate_embedding(query_text)
+                    query_embedding = embed_text(query_text)
                     similar = query_vectors(query_embedding, top_k=5)
                     
                     for result in similar:
@@ -104,37 +91,80 @@ def recommend_papers_based_on_history(limit: int = 10) -> List[Dict]:
                             })
         except Exception as e:
             logger.warning(f"Error processing viewed paper {paper_id}: {e}")
+    return recommendations
+
+
+def _strategy_queries(history: Dict, limit: int) -> List[Dict]:
+    """Strategy 2: papers matching the recent queries."""
+    if not history["queries"]:
+        return []
     
-    # Strategy 2: Based on query history (find papers matching interests)
-    if history["queries"]:
-        # Combine recent queries
-        recent_queries = [q["query"] for q in history["queries"][-3:]]
-        combined_query = " ".join(recent_queries)
-        
-        query_embedding = generate_embedding(combined_query)
-        query_results = query_vectors(query_embedding, top_k=limit * 2)
-        
-        for result in query_results:
-            recommendations.append({
-                "paper_id": result.paper_id,
-                "score": result.score * 0.8,  # Weight for query match
-                "reason": f"Matches your recent queries",
-                "type": "query_match"
-            })
+    # Combine recent queries
+    recent_queries = [q["query"] for q in history["queries"][-3:]]
+    combined_query = " ".join(recent_queries)
     
-    # Strategy 3: Based on interests (keyword-based)
-    if history["interests"]:
-        interest_query = " ".join(history["interests"][-5:])
-        query_embedding = generate_embedding(interest_query)
-        interest_results = query_vectors(query_embedding, top_k=limit)
-        
-        for result in interest_results:
-            recommendations.append({
-                "paper_id": result.paper_id,
-                "score": result.score * 0.6,  # Weight for interest match
-                "reason": f"Matches your interests: {', '.join(history['interests'][-3:])}",
-                "type": "interest_match"
-            })
+    query_embedding = embed_text(combined_query)
+    query_results = query_vectors(query_embedding, top_k=limit * 2)
+    
+    return [
+        {
+            "paper_id": result.paper_id,
+            "score": result.score * 0.8,  # Weight for query match
+            "reason": f"Matches your recent queries",
+            "type": "query_match"
+        }
+        for result in query_results
+    ]
+
+
+def _strategy_interests(history: Dict, limit: int) -> List[Dict]:
+    """Strategy 3: papers matching the recorded interests (keyword-based)."""
+    if not history["interests"]:
+        return []
+    
+    interest_query = " ".join(history["interests"][-5:])
+    query_embedding = embed_text(interest_query)
+    interest_results = query_vectors(query_embedding, top_k=limit)
+    
+    return [
+        {
+            "paper_id": result.paper_id,
+            "score": result.score * 0.6,  # Weight for interest match
+            "reason": f"Matches your interests: {', '.join(history['interests'][-3:])}",
+            "type": "interest_match"
+        }
+        for result in interest_results
+    ]
+
+
+RECOMMENDATION_STRATEGIES = (_strategy_viewed, _strategy_queries, _strategy_interests)
+
+
+def recommend_papers_based_on_history(limit: int = 10) -> List[Dict]:
+    """
+    Recommend papers based on user's reading history and queries.
+    
+    The strategies (viewed papers, recent queries, interests) are independent
+    and run concurrently; their embedding requests share batches.
+    
+    Returns:
+        List of recommended papers with relevance scores
+    """
+    # Only the recent part of the history is used by the strategies
+    try:
+        history = {
+            "viewed_papers": history_store.get_recent_views(5),
+            "queries": history_store.get_recent_queries(3),
+            "interests": history_store.get_interests(5)
+        }
+    except Exception as e:
+        logger.warning(f"Failed to load user history: {e}")
+        history = {"viewed_papers": [], "queries": [], "interests": []}
+    
+    with ThreadPoolExecutor(max_workers=len(RECOMMENDATION_STRATEGIES)) as executor:
+        futures = [executor.submit(strategy, history, limit) for strategy in RECOMMENDATION_STRATEGIES]
+        # Collected in strategy order so ties are broken as before
+        recommendations = [rec for future in futures for rec in future.result()]
     
     # Deduplicate and rank
     paper_scores = {}
@@ -143,26 +173,25 @@ def recommend_papers_based_on_history(limit: int = 10) -> List[Dict]:
         if pid not in paper_scores or rec["score"] > paper_scores[pid]["score"]:
             paper_scores[pid] = rec
     
-    # Get full paper metadata
+    # Get full paper metadata (one batched lookup for all top recommendations)
+    top = sorted(paper_scores.items(), key=lambda x: x[1]["score"], reverse=True)[:limit]
+    meta_by_pid = _get_metadata_by_paper([pid for pid, _ in top])
+    
     final_recommendations = []
-    for pid, rec in sorted(paper_scores.items(), key=lambda x: x[1]["score"], reverse=True)[:limit]:
-        try:
-            chunks = collection.get(where={"paper_id": pid}, limit=1)
-            if chunks.get("metadatas"):
-                meta = chunks["metadatas"][0]
-                final_recommendations.append({
-                    "paper_id": pid,
-                    "title": meta.get("title", "Unknown"),
-                    "authors": meta.get("authors", "Unknown"),
-                    "year": meta.get("year"),
-                    "abstract": meta.get("abstract", "")[:200],
-                    "relevance_score": rec["score"],
-                    "recommendation_reason": rec["reason"],
-                    "recommendation_type": rec["type"],
-                    "source": meta.get("source", "unknown")
-                })
-        except Exception as e:
-            logger.warning(f"Error getting metadata for {pid}: {e}")
+    for pid, rec in top:
+        meta = meta_by_pid.get(pid)
+        if meta:
+            final_recommendations.append({
+                "paper_id": pid,
+                "title": meta.get("title", "Unknown"),
+                "authors": meta.get("authors", "Unknown"),
+                "year": meta.get("year"),
+                "abstract": meta.get("abstract", "")[:200],
+                "relevance_score": rec["score"],
+                "recommendation_reason": rec["reason"],
+                "recommendation_type": rec["type"],
+                "source": meta.get("source", "unknown")
+            })
     
     return final_recommendations
 
@@ -174,34 +203,31 @@ def recommend_papers_for_query(query: str, limit: int = 10) -> List[Dict]:
     Args:
         query: User query
         limit: Number of recommendations
-        
+    
     Returns:
         List of recommended papers
     """
     # Use hybrid search for better results
     results = hybrid_search(query, top_k=limit * 2, semantic_weight=0.7, keyword_weight=0.3)
     
-    collection = get_collection()
+    top_results = results[:limit]
+    meta_by_pid = _get_metadata_by_paper([result.paper_id for result in top_results])
     recommendations = []
     
-    for result in results[:limit]:
-        try:
-            chunks = collection.get(where={"paper_id": result.paper_id}, limit=1)
-            if chunks.get("metadatas"):
-                meta = chunks["metadatas"][0]
-                recommendations.append({
-                    "paper_id": result.paper_id,
-                    "title": meta.get("title", "Unknown"),
-                    "authors": meta.get("authors", "Unknown"),
-                    "year": meta.get("year"),
-                    "abstract": meta.get("abstract", "")[:200],
-                    "relevance_score": result.score,
-                    "semantic_score": result.metadata.get("semantic_score", 0) if result.metadata else 0,
-                    "keyword_score": result.metadata.get("keyword_score", 0) if result.metadata else 0,
-                    "source": meta.get("source", "unknown")
-                })
-        except Exception as e:
-            logger.warning(f"Error getting metadata: {e}")
+    for result in top_results:
+        meta = meta_by_pid.get(result.paper_id)
+        if meta:
+            recommendations.append({
+                "paper_id": result.paper_id,
+                "title": meta.get("title", "Unknown"),
+                "authors": meta.get("authors", "Unknown"),
+                "year": meta.get("year"),
+                "abstract": meta.get("abstract", "")[:200],
+                "relevance_score": result.score,
+                "semantic_score": result.metadata.get("semantic_score", 0) if result.metadata else 0,
+                "keyword_score": result.metadata.get("keyword_score", 0) if result.metadata else 0,
+                "source": meta.get("source", "unknown")
+            })
     
     return recommendations
 
@@ -212,26 +238,15 @@ def get_trending_topics(days: int = 30) -> List[Dict]:
     
     Args:
         days: Number of days to look back
-        
+    
     Returns:
         List of trending topics with scores
     """
-    history = load_user_history()
-    # Use user history queries instead of query_logs
-    
-    # Extract topics from queries
-    topic_counts = {}
-    for query in history["queries"]:
-        words = query["query"].lower().split()
-        for word in words:
-            if len(word) > 4:
-                topic_counts[word] = topic_counts.get(word, 0) + 1
-    
-    # Sort by frequency
-    trending = sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Topic counts are maintained per query word as queries are recorded
+    trending = history_store.get_top_topics(10)
+    max_count = trending[0][1] if trending else 1
     
     return [
-        {"topic": topic, "frequency": count, "trend_score": count / max(topic_counts.values()) if topic_counts else 0}
+        {"topic": topic, "frequency": count, "trend_score": count / max_count}
         for topic, count in trending
     ]
-
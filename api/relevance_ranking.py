@@ -1,19 +1,56 @@
 """Relevance ranking for search results."""
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import FrozenSet, List, Dict, Optional
 from processing.embeddings import generate_embedding
-from vectorstore.query import query_vectors
-from config.chroma_client import get_collection
+from processing.embedding_cache import embed_paper, embed_papers
+from vectorstore.query import query_vectors, get_paper_metadata_batch
 from utils.logger import get_logger
 import numpy as np
 
 logger = get_logger(__name__)
 
+# Semantic scoring only runs on the best keyword matches: max(SEMANTIC_POOL_FACTOR * top_k, SEMANTIC_POOL_MIN)
+SEMANTIC_POOL_FACTOR = 5
+SEMANTIC_POOL_MIN = 100
+
+# Tokenized titles/abstracts kept in memory (the same papers are ranked for many queries)
+TOKEN_CACHE_SIZE = 10_000
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _tokenize(text: str) -> FrozenSet[str]:
+    """Set of lowercased whitespace-separated words in text."""
+    return frozenset(text.lower().split())
+
+
+def _cosine_batch(E: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of every row of E against q in one matrix-vector product.
+    
+    Args:
+        E: (n, d) matrix of embeddings
+        q: (d,) query embedding
+    
+    Returns:
+        (n,) float32 similarities (0 for zero-length vectors)
+    """
+    E = np.asarray(E, dtype=np.float32)
+    q = np.asarray(q, dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        En = E / np.linalg.norm(E, axis=1, keepdims=True)
+        qn = q / np.linalg.norm(q)
+        return np.nan_to_num(En @ qn, nan=0.0, posinf=0.0, neginf=0.0)
+
 
 def calculate_relevance_score(
     query: str,
     paper: Dict,
     use_semantic: bool = True,
-    use_keyword: bool = True
+    use_keyword: bool = True,
+    *,
+    query_embedding: Optional[List[float]] = None,
+    paper_embedding: Optional[List[float]] = None,
+    semantic_score: Optional[float] = None
 ) -> Dict:
     """
     Calculate comprehensive relevance score for a paper.
@@ -23,7 +60,13 @@ def calculate_relevance_score(
         paper: Paper dictionary with title, abstract, etc.
         use_semantic: Use semantic similarity
         use_keyword: Use keyword matching
-        
+        query_embedding: Precomputed embedding of query (computed here if None)
+        paper_embedding: Precomputed embedding of the paper's title/abstract for a
+            paper known not to be in the vector store; used directly instead of
+            looking the paper up
+        semantic_score: Precomputed semantic similarity; skips all embedding
+            and vector store work for this paper
+    
     Returns:
         Dictionary with relevance score, percentage, and breakdown
     """
@@ -39,18 +82,15 @@ def calculate_relevance_score(
     if not query:
         return scores
     
-    query_lower = query.lower()
-    query_words = set(query_lower.split())
-    
     # Get paper text
     title = paper.get("title", "").lower()
     abstract = paper.get("abstract", "").lower()
-    full_text = f"{title} {abstract}"
     
     # 1. Keyword matching (title + abstract)
     if use_keyword:
-        title_words = set(title.split())
-        abstract_words = set(abstract.split())
+        query_words = _tokenize(query)
+        title_words = _tokenize(title)
+        abstract_words = _tokenize(abstract)
         
         # Title match (weighted higher)
         title_overlap = len(query_words & title_words)
@@ -67,53 +107,38 @@ def calculate_relevance_score(
         scores["abstract_score"] = min(abstract_score, 1.0)
     
     # 2. Semantic similarity (if paper is in vector store)
-    if use_semantic:
+    if use_semantic and semantic_score is not None:
+        scores["semantic_score"] = max(0.0, float(semantic_score))
+    
+    elif use_semantic:
         try:
-            collection = get_collection()
             paper_id = paper.get("paper_id")
             
             if paper_id:
-                # Check if paper is in collection
-                chunks = collection.get(
-                    where={"paper_id": paper_id},
-                    limit=1
-                )
-                
-                if chunks.get("ids"):
-                    # Paper is in vector store - use semantic search
+                if query_embedding is None:
                     query_embedding = generate_embedding(query)
+                
+                # A non-empty result means the paper is in the vector store; no
+                # separate membership check. Skipped when the caller already
+                # knows the paper is not stored.
+                results = []
+                if paper_embedding is None:
                     results = query_vectors(
                         query_embedding=query_embedding,
                         top_k=5,
                         filter_metadata={"paper_id": paper_id}
                     )
-                    
-                    if results:
-                        # Get max score from chunks
-                        semantic_score = max([r.score for r in results])
-                        scores["semantic_score"] = float(semantic_score)
-                    else:
-                        # Paper in store but no matching chunks - use embedding similarity
-                        # Get paper text embedding
-                        paper_text = f"{title} {abstract[:500]}"
-                        paper_embedding = generate_embedding(paper_text)
-                        query_embedding = generate_embedding(query)
-                        
-                        # Cosine similarity
-                        similarity = np.dot(paper_embedding, query_embedding) / (
-                            np.linalg.norm(paper_embedding) * np.linalg.norm(query_embedding)
-                        )
-                        scores["semantic_score"] = max(0.0, float(similarity))
+                
+                if results:
+                    # Get max score from chunks
+                    scores["semantic_score"] = float(max(r.score for r in results))
                 else:
                     # Paper not in vector store - calculate embedding similarity directly
-                    paper_text = f"{title} {abstract[:500]}"
-                    paper_embedding = generate_embedding(paper_text)
-                    query_embedding = generate_embedding(query)
+                    if paper_embedding is None:
+                        paper_embedding = embed_paper(f"{title} {abstract[:500]}")
                     
                     # Cosine similarity
-                    similarity = np.dot(paper_embedding, query_embedding) / (
-                        np.linalg.norm(paper_embedding) * np.linalg.norm(query_embedding)
-                    )
+                    similarity = _cosine_batch([paper_embedding], query_embedding)[0]
                     scores["semantic_score"] = max(0.0, float(similarity))
         except Exception as e:
             logger.warning(f"Error calculating semantic score: {e}")
@@ -141,21 +166,87 @@ def calculate_relevance_score(
     return scores
 
 
+def _keyword_scores(query: str, papers: List[Dict]) -> np.ndarray:
+    """
+    Keyword scores for many papers at once (same values as calculate_relevance_score).
+    
+    Only the set-intersection counts are computed per paper (on cached token
+    sets); weighting and clipping are vectorized.
+    
+    Returns:
+        Array of keyword scores, one per paper
+    """
+    query_words = _tokenize(query)
+    if not query_words or not papers:
+        return np.zeros(len(papers))
+    
+    title_hits = np.fromiter(
+        (len(query_words & _tokenize(paper.get("title", "").lower())) for paper in papers),
+        dtype=np.float64, count=len(papers)
+    )
+    abstract_hits = np.fromiter(
+        (len(query_words & _tokenize(paper.get("abstract", "").lower())) for paper in papers),
+        dtype=np.float64, count=len(papers)
+    )
+    n = len(query_words)
+    return np.minimum((title_hits / n) * 0.6 + (abstract_hits / n) * 0.4, 1.0)
+
+
+def _semantic_scores_outside_store(papers: List[Dict], query_embedding: List[float]) -> Dict[int, float]:
+    """
+    Score papers that are not in the vector store against the query.
+    
+    Membership is checked with one batched metadata lookup, all missing
+    papers are embedded with one batch call (reusing persisted embeddings),
+    and their cosine similarities are computed with a single matrix-vector
+    product.
+    
+    Returns:
+        Dictionary mapping index in papers to the paper's semantic similarity
+    """
+    paper_ids = [paper.get("paper_id") for paper in papers if paper.get("paper_id")]
+    if not paper_ids:
+        return {}
+    
+    in_store = get_paper_metadata_batch(paper_ids)
+    outside = [
+        i for i, paper in enumerate(papers)
+        if paper.get("paper_id") and paper["paper_id"] not in in_store
+    ]
+    if not outside:
+        return {}
+    
+    texts = []
+    for i in outside:
+        title = papers[i].get("title", "").lower()
+        abstract = papers[i].get("abstract", "").lower()
+        texts.append(f"{title} {abstract[:500]}")
+    
+    similarities = _cosine_batch(embed_papers(texts), query_embedding)
+    return dict(zip(outside, similarities.tolist()))
+
+
 def rank_papers_by_relevance(
     query: str,
     papers: List[Dict],
     use_semantic: bool = True,
-    use_keyword: bool = True
+    use_keyword: bool = True,
+    top_k: int = 20
 ) -> List[Dict]:
     """
     Rank papers by relevance to query.
     
+    Ranking is two-stage when both signals are used: every paper gets a
+    keyword score, and only the best max(5 * top_k, 100) keyword matches are
+    scored semantically; the rest are ranked with a semantic score of 0.
+    
     Args:
         query: Search query
         papers: List of paper dictionaries
         use_semantic: Use semantic similarity
         use_keyword: Use keyword matching
-        
+        top_k: Number of results the caller needs ranked precisely
+    
     Returns:
         List of papers with relevance scores, sorted by relevance
     """
@@ -164,14 +255,40 @@ def rank_papers_by_relevance(
     
     logger.info(f"Ranking {len(papers)} papers by relevance to: {query}")
     
+    # Stage 1: cheap keyword prefilter picks the papers worth embedding
+    semantic_candidates = range(len(papers))
+    pool_size = max(SEMANTIC_POOL_FACTOR * top_k, SEMANTIC_POOL_MIN)
+    if use_semantic and use_keyword and len(papers) > pool_size:
+        keyword_scores = _keyword_scores(query, papers)
+        semantic_candidates = np.argsort(-keyword_scores, kind="stable")[:pool_size].tolist()
+        logger.debug(f"Semantic scoring limited to {pool_size} of {len(papers)} papers")
+    
+    # Embed the query once; candidates outside the vector store are scored in one batch
+    query_embedding = None
+    semantic_scores = {}
+    if use_semantic:
+        # Papers outside the candidate pool keep a semantic score of 0
+        candidate_set = set(semantic_candidates)
+        semantic_scores = {i: 0.0 for i in range(len(papers)) if i not in candidate_set}
+        try:
+            query_embedding = generate_embedding(query)
+            candidate_papers = [papers[i] for i in semantic_candidates]
+            outside_scores = _semantic_scores_outside_store(candidate_papers, query_embedding)
+            for j, score in outside_scores.items():
+                semantic_scores[semantic_candidates[j]] = score
+        except Exception as e:
+            logger.warning(f"Error preparing embeddings for ranking: {e}")
+    
     # Calculate relevance for each paper
     ranked_papers = []
-    for paper in papers:
+    for i, paper in enumerate(papers):
         relevance = calculate_relevance_score(
             query=query,
             paper=paper,
             use_semantic=use_semantic,
-            use_keyword=use_keyword
+            use_keyword=use_keyword,
+            query_embedding=query_embedding,
+            semantic_score=semantic_scores.get(i)
         )
         
         # Add relevance scores to paper
@@ -201,7 +318,7 @@ def get_relevance_category(score: float) -> Dict[str, str]:
     
     Args:
         score: Relevance score (0-1)
-        
+    
     Returns:
         Dictionary with category, color, and emoji
     """
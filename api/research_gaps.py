@@ -1,14 +1,29 @@
 """Research gap identification - find underexplored areas."""
 from typing import List, Dict, Optional
+import re
+import numpy as np
 from config.chroma_client import get_collection
 from vectorstore.query import query_vectors
-from processing.embeddings import generate_embedding
+from processing.embeddings import generate_embedding, generate_embeddings_batch
 from rag.hybrid_search import hybrid_search
 from utils.logger import get_logger
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 logger = get_logger(__name__)
 
+# Common subtopics/keywords
+SUBTOPIC_KEYWORDS = (
+    "application", "method", "algorithm", "framework", "model", "system",
+    "evaluation", "benchmark", "dataset", "comparison", "survey", "review",
+    "optimization", "efficiency", "scalability", "robustness", "accuracy"
+)
+
+# Papers sampled when checking topic keyword coverage
+COVERAGE_SAMPLE_SIZE = 20
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
 
 def identify_research_gaps(topic: str, min_papers: int = 5) -> Dict:
     """
@@ -22,7 +37,7 @@ def identify_research_gaps(topic: str, min_papers: int = 5) -> Dict:
     Args:
         topic: Main topic to analyze
         min_papers: Minimum papers needed to consider a subtopic explored
-        
+    
     Returns:
         Dictionary with identified gaps
     """
@@ -44,26 +59,27 @@ def identify_research_gaps(topic: str, min_papers: int = 5) -> Dict:
         
         # Analyze subtopics
         subtopics = defaultdict(int)
-        subtopic_years = defaultdict(list)
+        # Publication years per subtopic: row i holds the years of SUBTOPIC_KEYWORDS[i], -1 padded
+        years_buf = np.full((len(SUBTOPIC_KEYWORDS), len(results)), -1, dtype=np.int16)
+        year_counts = np.zeros(len(SUBTOPIC_KEYWORDS), dtype=np.int16)
+        year_order = []  # Subtopic indices in order of their first dated paper
+        sample_words = []  # Word sets of the first COVERAGE_SAMPLE_SIZE papers
         
         for result in results:
             meta = result.metadata or {}
-            title = meta.get("title", "").lower()
-            abstract = meta.get("abstract", "").lower()
+            text = meta.get("search_text") or f"{meta.get('title', '')} {meta.get('abstract', '')}".lower()
             year = meta.get("year")
+            if len(sample_words) < COVERAGE_SAMPLE_SIZE:
+                sample_words.append(frozenset(_WORD_RE.findall(text)))
             
-            # Common subtopics/keywords
-            keywords = [
-                "application", "method", "algorithm", "framework", "model", "system",
-                "evaluation", "benchmark", "dataset", "comparison", "survey", "review",
-                "optimization", "efficiency", "scalability", "robustness", "accuracy"
-            ]
-            
-            for keyword in keywords:
-                if keyword in title or keyword in abstract:
+            for kw_idx, keyword in enumerate(SUBTOPIC_KEYWORDS):
+                if keyword in text:
                     subtopics[keyword] += 1
                     if year:
-                        subtopic_years[keyword].append(year)
+                        if year_counts[kw_idx] == 0:
+                            year_order.append(kw_idx)
+                        years_buf[kw_idx, year_counts[kw_idx]] = int(year)
+                        year_counts[kw_idx] += 1
         
         # Find gaps (subtopics with few papers)
         gaps = []
@@ -76,39 +92,37 @@ def identify_research_gaps(topic: str, min_papers: int = 5) -> Dict:
                     "recommendation": f"'{subtopic}' aspect of '{topic}' needs more research"
                 })
         
-        # Find declining subtopics
+        # Find declining subtopics: mean of the 3 most recent years vs the next 3
         declining = []
-        for subtopic, years in subtopic_years.items():
-            if len(years) >= 3:
-                recent_years = sorted(years, reverse=True)[:3]
-                older_years = sorted(years, reverse=True)[3:6] if len(years) >= 6 else []
-                
-                if older_years:
-                    recent_avg = sum(recent_years) / len(recent_years)
-                    older_avg = sum(older_years) / len(older_years)
-                    
-                    if recent_avg < older_avg - 2:  # Declining by more than 2 years
-                        declining.append({
-                            "subtopic": subtopic,
-                            "trend": "declining",
-                            "recent_avg_year": recent_avg,
-                            "older_avg_year": older_avg,
-                            "gap_type": "declining_research",
-                            "recommendation": f"Research on '{subtopic}' in '{topic}' is declining - potential gap"
-                        })
+        if len(results) >= 6:
+            top_years = -np.sort(-years_buf, axis=1)[:, :6]  # Newest first; padding sorts last
+            recent_avg = top_years[:, :3].mean(axis=1)
+            older_avg = top_years[:, 3:6].mean(axis=1)
+            # Needs 6 dated papers; declining by more than 2 years
+            is_declining = (year_counts >= 6) & (recent_avg < older_avg - 2)
+            
+            for kw_idx in year_order:
+                if is_declining[kw_idx]:
+                    subtopic = SUBTOPIC_KEYWORDS[kw_idx]
+                    declining.append({
+                        "subtopic": subtopic,
+                        "trend": "declining",
+                        "recent_avg_year": float(recent_avg[kw_idx]),
+                        "older_avg_year": float(older_avg[kw_idx]),
+                        "gap_type": "declining_research",
+                        "recommendation": f"Research on '{subtopic}' in '{topic}' is declining - potential gap"
+                    })
         
         # Find unexplored combinations
         # (This is simplified - in practice, would use more sophisticated NLP)
         combination_gaps = []
-        main_keywords = topic.lower().split()
+        main_keywords = frozenset(_WORD_RE.findall(topic.lower()))
+        n_main = len(main_keywords)
         
         # Check if combinations exist
-        for result in results[:20]:  # Sample
-            meta = result.metadata or {}
-            text = f"{meta.get('title', '')} {meta.get('abstract', '')}".lower()
-            
-            # If topic keywords are sparse in results, it's a gap
-            keyword_density = sum(1 for kw in main_keywords if kw in text) / len(main_keywords) if main_keywords else 0
+        for paper_words in sample_words:
+            # If topic keywords are sparse in results, it's a gap (whole-word matches)
+            keyword_density = len(main_keywords & paper_words) / n_main if n_main else 0
             if keyword_density < 0.3:
                 combination_gaps.append({
                     "gap_type": "low_keyword_coverage",
@@ -127,7 +141,7 @@ def identify_research_gaps(topic: str, min_papers: int = 5) -> Dict:
                 gap["recommendation"] for gap in gaps[:5]
             ] + [d["recommendation"] for d in declining[:3]]
         }
-        
+    
     except Exception as e:
         logger.error(f"Error identifying research gaps: {e}")
         return {"error": str(e)}
@@ -140,18 +154,22 @@ def find_underexplored_combinations(concept1: str, concept2: str) -> Dict:
     Args:
         concept1: First concept
         concept2: Second concept
-        
+    
     Returns:
         Dictionary with analysis
     """
-    # Search for each concept individually
-    embedding1 = generate_embedding(concept1)
-    embedding2 = generate_embedding(concept2)
-    embedding_combined = generate_embedding(f"{concept1} {concept2}")
-    
-    results1 = query_vectors(embedding1, top_k=50)
-    results2 = query_vectors(embedding2, top_k=50)
-    results_combined = query_vectors(embedding_combined, top_k=50)
+    # Search for each concept individually (all three texts embedded in one batch)
+    embedding1, embedding2, embedding_combined = generate_embeddings_batch(
+        [concept1, concept2, f"{concept1} {concept2}"], use_cache=True
+    )
+    
+    # The three searches are independent; run them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(query_vectors, embedding, top_k=50)
+            for embedding in (embedding1, embedding2, embedding_combined)
+        ]
+        results1, results2, results_combined = [future.result() for future in futures]
     
     # Count papers mentioning both
     collection = get_collection()
@@ -159,7 +177,7 @@ def find_underexplored_combinations(concept1: str, concept2: str) -> Dict:
     
     for result in results_combined:
         meta = result.metadata or {}
-        text = f"{meta.get('title', '')} {meta.get('abstract', '')}".lower()
+        text = meta.get("search_text") or f"{meta.get('title', '')} {meta.get('abstract', '')}".lower()
         if concept1.lower() in text and concept2.lower() in text:
             both_count += 1
     
@@ -193,7 +211,7 @@ def suggest_research_directions(topic: str) -> List[str]:
     
     Args:
         topic: Research topic
-        
+    
     Returns:
         List of suggested research directions
     """
@@ -1,14 +1,23 @@
 """Google Scholar-like search interface."""
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from vectorstore.query import QueryResult, query_vectors
+from vectorstore.query import QueryResult, query_vectors, get_paper_metadata_batch
 from config.chroma_client import get_collection
 from processing.embeddings import generate_embedding
 from rag.search_enhanced import search_by_author, search_by_year
 from api.relevance_ranking import rank_papers_by_relevance
+from api.similarity import pairwise_cosine
+from vectorstore.centroids import get_centroids
+from api.main_api import api
 from utils.logger import get_logger
+import numpy as np
 
 logger = get_logger(__name__)
 
+# Concurrent per-paper lookups in compare_papers_side_by_side
+COMPARE_WORKERS = 8
+
 
 def search_papers(
     query: Optional[str] = None,
@@ -24,7 +33,7 @@ def search_papers(
         author: Author name filter
         year: Publication year filter
         limit: Maximum results
-        
+    
     Returns:
         Dictionary with papers, total count, and metadata
     """
@@ -52,17 +61,17 @@ def search_papers(
         query_embedding = generate_embedding(query)
         query_results = query_vectors(query_embedding, top_k=limit * 3)
         
+        # Get full paper metadata for all new papers in one batched lookup
+        meta_by_pid = get_paper_metadata_batch([
+            result.paper_id for result in query_results if result.paper_id not in papers
+        ])
+        
         # Get unique papers from results
         for result in query_results:
             pid = result.paper_id
             if pid not in papers:
-                # Get full paper metadata
-                paper_chunks = collection.get(
-                    where={"paper_id": pid},
-                    limit=1
-                )
-                if paper_chunks.get("metadatas"):
-                    meta = paper_chunks["metadatas"][0]
+                meta = meta_by_pid.get(pid)
+                if meta:
                     papers[pid] = {
                         "paper_id": pid,
                         "title": meta.get("title", "Unknown"),
@@ -75,7 +84,7 @@ def search_papers(
     
     # If no filters, get all papers
     if not query and not author and not year:
-        all_data = collection.get(limit=limit * 10)
+        all_data = collection.get(limit=limit * 10, include=["metadatas"])
         for metadata in all_data.get("metadatas", []):
             pid = metadata.get("paper_id", "unknown")
             if pid not in papers:
@@ -101,14 +110,13 @@ def search_papers(
         
         filtered_papers.append(paper)
     
-    # Sort by score if available, else by year (newest first)
-    filtered_papers.sort(
-        key=lambda x: (x.get("score", 0), x.get("year", 0) or 0),
-        reverse=True
+    # Top `limit` by score if available, else by year (newest first)
+    results = heapq.nlargest(
+        limit,
+        filtered_papers,
+        key=lambda x: (x.get("score", 0), x.get("year", 0) or 0)
     )
     
-    results = filtered_papers[:limit]
-    
     logger.info(f"Search returned {len(results)} papers (query={query}, author={author}, year={year})")
     
     return {
@@ -128,24 +136,35 @@ def compare_papers_side_by_side(paper_ids: List[str]) -> Dict:
     
     Args:
         paper_ids: List of paper IDs to compare
-        
+    
     Returns:
         Comparison data with metadata, citations, and similarities
     """
-    from api.main_api import api
-    
     collection = get_collection()
     comparison = {
         "papers": [],
         "comparison_metrics": {}
     }
     
-    for paper_id in paper_ids:
-        paper = api.get_paper(paper_id)
-        if paper:
-            # Get additional metrics
-            citations = api.get_citations(paper_id)
-            ranking = api.get_paper_ranking(paper_id)
+    papers = api.get_papers_batch(paper_ids)
+    found_ids = [pid for pid in paper_ids if papers.get(pid)]
+    pairs = [
+        (found_ids[i], found_ids[j])
+        for i in range(len(found_ids))
+        for j in range(i + 1, len(found_ids))
+    ]
+    
+    # Citation and ranking lookups are independent, so run them concurrently
+    workers = max(1, min(COMPARE_WORKERS, len(found_ids) * 2))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        citation_futures = [executor.submit(api.get_citations, pid) for pid in found_ids]
+        ranking_futures = [executor.submit(api.get_paper_ranking, pid) for pid in found_ids]
+        centroids_future = executor.submit(get_centroids, found_ids) if pairs else None
+        
+        for paper_id, citation_future, ranking_future in zip(found_ids, citation_futures, ranking_futures):
+            paper = papers[paper_id]
+            citations = citation_future.result()
+            ranking = ranking_future.result()
             
             comparison["papers"].append({
                 "paper_id": paper_id,
@@ -158,22 +177,28 @@ def compare_papers_side_by_side(paper_ids: List[str]) -> Dict:
                 "citation_score": ranking.get("citation_score", 0),
                 "rank": ranking.get("rank", "N/A")
             })
+        
+        centroids = centroids_future.result() if centroids_future else {}
     
-    # Calculate similarities between papers
+    # Calculate similarities between papers: one matrix product over the paper centroids
     if len(comparison["papers"]) >= 2:
+        embedded_ids = [pid for pid in found_ids if pid in centroids]
+        row_of = {pid: i for i, pid in enumerate(embedded_ids)}
+        similarity_matrix = pairwise_cosine(np.stack([centroids[pid] for pid in embedded_ids])) if embedded_ids else None
+        
         similarities = []
-        for i in range(len(comparison["papers"])):
-            for j in range(i + 1, len(comparison["papers"])):
-                pid1 = comparison["papers"][i]["paper_id"]
-                pid2 = comparison["papers"][j]["paper_id"]
-                
-                sim_result = api.compare_two_papers(pid1, pid2)
-                similarities.append({
-                    "paper1": pid1,
-                    "paper2": pid2,
-                    "similarity": sim_result.get("similarity", 0.0),
-                    "similarity_percent": sim_result.get("similarity_percent", "0%")
-                })
+        for pid1, pid2 in pairs:
+            if pid1 in row_of and pid2 in row_of:
+                similarity = float(similarity_matrix[row_of[pid1], row_of[pid2]])
+                similarity_percent = f"{similarity * 100:.2f}%"
+            else:
+                similarity, similarity_percent = 0.0, "0%"
+            similarities.append({
+                "paper1": pid1,
+                "paper2": pid2,
+                "similarity": similarity,
+                "similarity_percent": similarity_percent
+            })
         
         comparison["comparison_metrics"]["similarities"] = similarities
     
@@ -187,16 +212,21 @@ def get_paper_details_scholar_style(paper_id: str) -> Dict:
     Returns:
         Paper details with citations, related papers, etc.
     """
-    from api.main_api import api
-    
     paper = api.get_paper(paper_id)
     if not paper:
         return {}
     
-    citations = api.get_citations(paper_id)
-    related = api.get_related_papers(paper_id, limit=10)
-    ranking = api.get_paper_ranking(paper_id)
-    summary = api.generate_summary(paper_id, use_llm=False)
+    # The remaining lookups are independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        citations_future = executor.submit(api.get_citations, paper_id)
+        related_future = executor.submit(api.get_related_papers, paper_id, limit=10)
+        ranking_future = executor.submit(api.get_paper_ranking, paper_id)
+        summary_future = executor.submit(api.generate_summary, paper_id, use_llm=False)
+        
+        citations = citations_future.result()
+        related = related_future.result()
+        ranking = ranking_future.result()
+        summary = summary_future.result()
     
     return {
         "paper_id": paper_id,
@@ -0,0 +1,120 @@
+"""Semantic cache for RAG answers - reuse answers for paraphrased queries."""
+from typing import Dict, List, Optional
+from functools import wraps
+import hashlib
+import inspect
+import json
+import time
+from config.chroma_client import get_semantic_cache_collection
+from config.settings import settings
+from processing.embeddings import generate_embedding
+from utils.llm_cache import function_fingerprint, has_evidence, log_cache_hit, make_cache_key
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def lookup_semantic_cache(scope: str, query_embedding: List[float]) -> Optional[Dict]:
+    """
+    Find a cached answer for a query with a near-identical embedding.
+    
+    Args:
+        scope: Cache scope (mode, prompt, corpus version, model and non-query arguments)
+        query_embedding: Embedding of the incoming query
+    
+    Returns:
+        Cached result dict, or None if no entry within the scope is similar enough
+    """
+    try:
+        collection = get_semantic_cache_collection()
+        results = collection.query(
+            query_embeddings=[query_embedding],
+            n_results=1,
+            where={"scope": scope},
+            include=["documents", "metadatas", "distances"]
+        )
+        
+        if not results["ids"] or not results["ids"][0]:
+            return None
+        
+        # Cosine space: distance = 1 - cosine similarity
+        similarity = 1.0 - results["distances"][0][0]
+        metadata = results["metadatas"][0][0]
+        if similarity < settings.semantic_cache_threshold:
+            return None
+        if time.time() - metadata.get("ts", 0) > settings.rag_cache_ttl:
+            return None
+        
+        logger.debug(f"Semantic cache hit (similarity {similarity:.3f}) for: {metadata.get('query', '')[:50]}")
+        return json.loads(results["documents"][0][0])
+    
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed: {e}")
+        return None
+
+
+def store_semantic_cache(scope: str, query: str, query_embedding: List[float], result: Dict) -> None:
+    """Store a result under its query embedding (replacing an earlier entry for the same query)."""
+    try:
+        entry_id = hashlib.blake2b(f"{scope}\0{query}".encode("utf-8"), digest_size=16).hexdigest()
+        get_semantic_cache_collection().upsert(
+            ids=[entry_id],
+            embeddings=[query_embedding],
+            documents=[json.dumps(result, default=str)],
+            metadatas=[{"scope": scope, "query": query[:500], "ts": int(time.time())}]
+        )
+    except Exception as e:
+        logger.warning(f"Semantic cache store failed: {e}")
+
+
+def semantic_cached_rag(mode: str, query_arg: str = "query"):
+    """
+    Decorator serving a RAG mode from the semantic cache.
+    
+    The query is embedded once and matched against earlier queries of the
+    same mode with the same remaining arguments and corpus version; a match
+    at or above settings.semantic_cache_threshold returns the stored answer.
+    Results without citations or context are not stored. Disabled when
+    either RAG_CACHE or SEMANTIC_CACHE is off.
+    
+    Args:
+        mode: RAG mode name
+        query_arg: Name of the argument holding the query text
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        fingerprint = function_fingerprint(func)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not (settings.rag_cache_enabled and settings.semantic_cache_enabled):
+                return func(*args, **kwargs)
+            
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            query = arguments.pop(query_arg)
+            scope = make_cache_key(mode, fingerprint, arguments).hex()
+            
+            try:
+                query_embedding = generate_embedding(query)
+            except Exception as e:
+                logger.warning(f"Semantic cache skipped, could not embed query: {e}")
+                return func(*args, **kwargs)
+            
+            cached_result = lookup_semantic_cache(scope, query_embedding)
+            if cached_result is not None:
+                # Report the query that was asked, not the paraphrase that was cached
+                for key in ("query", "topic"):
+                    if key in cached_result:
+                        cached_result[key] = query
+                log_cache_hit(mode, cached_result)
+                return cached_result
+            
+            result = func(*args, **kwargs)
+            if has_evidence(result):
+                store_semantic_cache(scope, query, query_embedding, result)
+            return result
+        
+        return wrapper
+    return decorator
@@ -1,12 +1,44 @@
 """Similarity checking and plagiarism detection."""
 from typing import Dict, List
-from processing.embeddings import generate_embedding
+from api.batched_embedder import embed_text, embed_texts
 from vectorstore.query import query_vectors
+from vectorstore.centroids import get_centroids, search_centroids
 from config.chroma_client import get_collection
+from utils.lsh_cache import LSHCache
 from utils.logger import get_logger
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:  # Optional SIMD kernels; NumPy is used otherwise
+    simsimd = None
 
 logger = get_logger(__name__)
 
+# Queries at least this similar to an earlier check_text_similarity query reuse its chunk matches
+SIMILAR_QUERY_THRESHOLD = 0.98
+
+# Earlier queries' chunk matches, tagged with the collection chunk count they were computed at
+_similar_chunks_cache = LSHCache(threshold=SIMILAR_QUERY_THRESHOLD)
+
+
+def _cosine_similarity(emb1: List[float], emb2: List[float]) -> float:
+    """Cosine similarity of two embeddings (simsimd when installed, else NumPy)."""
+    a = np.ascontiguousarray(emb1, dtype=np.float32)
+    b = np.ascontiguousarray(emb2, dtype=np.float32)
+    if simsimd is not None:
+        # simsimd returns the cosine distance
+        return 1.0 - float(simsimd.cosine(a, b))
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def pairwise_cosine(embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity between every pair of rows, as one (k, k) matrix product."""
+    E = np.asarray(embeddings, dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        E = E / np.linalg.norm(E, axis=1, keepdims=True)
+    return np.nan_to_num(E @ E.T)
+
 
 def compare_papers(paper_id1: str, paper_id2: str) -> Dict:
     """
@@ -15,6 +47,18 @@ def compare_papers(paper_id1: str, paper_id2: str) -> Dict:
     Returns:
         Similarity score and similar chunks
     """
+    # Stored per-paper centroids: no chunk text fetch and no encoder call
+    centroids = get_centroids([paper_id1, paper_id2])
+    if paper_id1 in centroids and paper_id2 in centroids:
+        similarity = _cosine_similarity(centroids[paper_id1], centroids[paper_id2])
+        return {
+            "paper1": paper_id1,
+            "paper2": paper_id2,
+            "similarity": float(similarity),
+            "similarity_percent": f"{similarity * 100:.2f}%"
+        }
+    
+    # Fall back to embedding each paper's leading chunk text
     collection = get_collection()
     
     # Get representative chunks from each paper
@@ -39,14 +83,11 @@ def compare_papers(paper_id1: str, paper_id2: str) -> Dict:
     text1 = " ".join([doc[:500] for doc in chunks1.get("documents", [])[:3]])
     text2 = " ".join([doc[:500] for doc in chunks2.get("documents", [])[:3]])
     
-    # Generate embeddings
-    from processing.embeddings import generate_embedding
-    emb1 = generate_embedding(text1)
-    emb2 = generate_embedding(text2)
+    # Generate embeddings (queued together so they share one encoder call)
+    emb1, emb2 = embed_texts([text1, text2])
     
     # Calculate cosine similarity
-    import numpy as np
-    similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
+    similarity = _cosine_similarity(emb1, emb2)
     
     return {
         "paper1": paper_id1,
@@ -56,6 +97,46 @@ def compare_papers(paper_id1: str, paper_id2: str) -> Dict:
     }
 
 
+def _centroid_candidate_chunks(query_embedding: List[float], known_papers: set) -> List:
+    """
+    Top chunks of extra candidate papers found through the centroid index.
+    
+    The centroid index only widens the candidate set: papers whose centroid
+    is close to the query but which have no chunk among the global top
+    matches get their own top chunks fetched (one filtered query), and are
+    then scored and thresholded on those chunks like any other paper. The
+    centroid score itself is never thresholded, since a paper with a single
+    near-identical chunk can have a distant centroid.
+    
+    Returns:
+        Chunks of the extra papers (empty without FAISS or when there are none)
+    """
+    candidates = search_centroids(query_embedding, top_k=20)
+    if not candidates:
+        return []
+    extra = [pid for pid, _ in candidates if pid not in known_papers]
+    if not extra:
+        return []
+    return query_vectors(
+        query_embedding,
+        top_k=20,
+        filter_metadata={"paper_id": {"$in": extra}} if len(extra) > 1 else {"paper_id": extra[0]}
+    )
+
+
+def _search_similar_chunks(query_embedding: List[float]) -> List:
+    """Top chunks for a query, served from the LSH cache while the collection is unchanged."""
+    count = get_collection().count()
+    cached = _similar_chunks_cache.get(query_embedding)
+    if cached is not None and cached[0] == count:
+        logger.debug("Similar-text chunk matches served from LSH cache")
+        return cached[1]
+    
+    similar_chunks = query_vectors(query_embedding, top_k=20)
+    _similar_chunks_cache.put(query_embedding, (count, similar_chunks))
+    return similar_chunks
+
+
 def check_text_similarity(text: str, threshold: float = 0.8) -> List[Dict]:
     """
     Check if text is similar to any paper in collection.
@@ -65,44 +146,55 @@ def check_text_similarity(text: str, threshold: float = 0.8) -> List[Dict]:
     Args:
         text: Text to check
         threshold: Minimum similarity threshold
-        
+    
     Returns:
         List of similar papers with scores
     """
     # Generate embedding for input text
-    query_embedding = generate_embedding(text)
+    query_embedding = embed_text(text)
     
-    # Search for similar chunks
-    similar_chunks = query_vectors(query_embedding, top_k=20)
+    # Search for similar chunks (reusing a near-identical earlier query's matches)
+    similar_chunks = _search_similar_chunks(query_embedding)
+    
+    # Add papers the centroid index ranks close but the chunk search missed (FAISS only)
+    extra_chunks = _centroid_candidate_chunks(query_embedding, {chunk.paper_id for chunk in similar_chunks})
+    if extra_chunks:
+        similar_chunks = similar_chunks + extra_chunks
+    
+    if not similar_chunks:
+        return []
+    
+    # Group by paper (group ids in order of first appearance) and average per group
+    group_of = {}
+    groups = np.fromiter(
+        (group_of.setdefault(chunk.paper_id, len(group_of)) for chunk in similar_chunks),
+        dtype=np.intp, count=len(similar_chunks)
+    )
+    scores = np.fromiter((chunk.score for chunk in similar_chunks), dtype=np.float64, count=len(similar_chunks))
+    counts = np.bincount(groups)
+    avg_scores = np.bincount(groups, weights=scores) / counts
+    passing = set(np.flatnonzero(avg_scores >= threshold).tolist())
+    
+    # Collect chunks only for papers above the threshold
+    chunks_by_group = {group: [] for group in passing}
+    for chunk, group in zip(similar_chunks, groups.tolist()):
+        if group in passing:
+            chunks_by_group[group].append({
+                "chunk_index": chunk.chunk_index,
+                "text": chunk.text[:200],
+                "score": chunk.score
+            })
     
-    # Group by paper and calculate average similarity
-    paper_scores = {}
-    for chunk in similar_chunks:
-        pid = chunk.paper_id
-        if pid not in paper_scores:
-            paper_scores[pid] = {
-                "paper_id": pid,
-                "scores": [],
-                "chunks": []
-            }
-        paper_scores[pid]["scores"].append(chunk.score)
-        paper_scores[pid]["chunks"].append({
-            "chunk_index": chunk.chunk_index,
-            "text": chunk.text[:200],
-            "score": chunk.score
-        })
-    
-    # Calculate average scores
     results = []
-    for pid, data in paper_scores.items():
-        avg_score = sum(data["scores"]) / len(data["scores"])
-        if avg_score >= threshold:
+    for pid, group in group_of.items():
+        if group in passing:
+            avg_score = float(avg_scores[group])
             results.append({
                 "paper_id": pid,
                 "similarity_score": avg_score,
                 "similarity_percent": f"{avg_score * 100:.2f}%",
-                "matching_chunks": len(data["chunks"]),
-                "top_chunks": data["chunks"][:3]
+                "matching_chunks": int(counts[group]),
+                "top_chunks": chunks_by_group[group][:3]
             })
     
     results.sort(key=lambda x: x["similarity_score"], reverse=True)
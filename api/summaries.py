@@ -1,5 +1,7 @@
 """Automatic paper summarization."""
 from typing import Dict, List
+import json
+import re
 from config.openai_client import client
 from config.settings import settings
 from api.paper_api import get_paper_by_id
@@ -7,6 +9,21 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Structured output schema for LLM summaries (strict mode: the reply always parses)
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "short": {"type": "string"},
+        "medium": {"type": "string"},
+        "bullets": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["short", "medium", "bullets"],
+    "additionalProperties": False
+}
+
+# End of the first sentence in a chunk (for extractive bullets)
+_SENTENCE_END = re.compile(r"[.!?]")
+
 
 def generate_paper_summary(paper_id: str, use_llm: bool = False) -> Dict:
     """
@@ -43,9 +60,7 @@ Key Content: {key_text[:2000]}
 Generate three summaries:
 1. Short summary (1-2 sentences)
 2. Medium summary (2-3 paragraphs)
-3. Bullet-point insights (5-7 key points)
-
-Format as JSON with keys: short, medium, bullets (array)."""
+3. Bullet-point insights (5-7 key points)"""
 
             response = client.chat.completions.create(
                 model=settings.llm_model,
@@ -54,22 +69,27 @@ Format as JSON with keys: short, medium, bullets (array)."""
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
-                max_tokens=500
+                max_tokens=500,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {"name": "paper_summary", "strict": True, "schema": SUMMARY_SCHEMA}
+                }
             )
             
-            import json
-            summary_text = response.choices[0].message.content
-            # Try to parse JSON, fallback to extractive if fails
-            try:
-                summaries = json.loads(summary_text)
-                return {
-                    "paper_id": paper_id,
-                    "short": summaries.get("short", abstract[:200]),
-                    "medium": summaries.get("medium", abstract),
-                    "bullets": summaries.get("bullets", [])
-                }
-            except:
-                pass
+            choice = response.choices[0]
+            if choice.finish_reason == "length":
+                # A reply cut off at max_tokens is incomplete JSON
+                raise ValueError("summary truncated at max_tokens")
+            if getattr(choice.message, "refusal", None):
+                raise ValueError(f"model refused: {choice.message.refusal}")
+            
+            summaries = json.loads(choice.message.content)
+            return {
+                "paper_id": paper_id,
+                "short": summaries["short"] or abstract[:200],
+                "medium": summaries["medium"] or abstract,
+                "bullets": summaries["bullets"]
+            }
         except Exception as e:
             logger.warning(f"LLM summary failed: {e}, using extractive")
     
@@ -81,7 +101,8 @@ Format as JSON with keys: short, medium, bullets (array)."""
     bullets = []
     for chunk in top_chunks[:5]:
         text = chunk.get("full_text", chunk.get("text", ""))
-        first_sentence = text.split('.')[0] if '.' in text else text[:150]
+        sentence_end = _SENTENCE_END.search(text)
+        first_sentence = text[:sentence_end.start()] if sentence_end else text[:150]
         if first_sentence.strip():
             bullets.append(first_sentence.strip() + ".")
     
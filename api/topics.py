@@ -1,4 +1,7 @@
 """Topic clustering and paper organization."""
+import copy
+import threading
+import time
 from typing import List, Dict
 from collections import defaultdict
 from config.chroma_client import get_collection
@@ -6,66 +9,118 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Clusterings are reused while the collection's chunk count is unchanged, up to this many seconds
+CLUSTER_CACHE_TTL = 3600
+
+# num_clusters -> {"ts", "count", "data", "kmeans", "topics_by_pid"}
+_CLUSTER_CACHE: Dict[int, Dict] = {}
+_cluster_lock = threading.Lock()
+
+
+def _is_fresh(cache: Dict, count: int) -> bool:
+    """Whether a clustering snapshot still matches the collection size and TTL."""
+    return cache["count"] == count and time.time() - cache["ts"] < CLUSTER_CACHE_TTL
+
+
+def _clustering(num_clusters: int) -> Dict:
+    """Return the shared clustering snapshot for num_clusters, recomputing it when stale. Treat as read-only."""
+    count = get_collection().count()
+    cached = _CLUSTER_CACHE.get(num_clusters)
+    if cached is not None and _is_fresh(cached, count):
+        return cached
+    
+    with _cluster_lock:
+        # Another thread may have refreshed the snapshot while we waited
+        cached = _CLUSTER_CACHE.get(num_clusters)
+        if cached is not None and _is_fresh(cached, count):
+            return cached
+        
+        data, kmeans = _compute_clusters(num_clusters, count)
+        topics_by_pid = defaultdict(list)
+        for cluster_info in data.values():
+            for paper in cluster_info["papers"]:
+                topics_by_pid[paper["paper_id"]].append(cluster_info["topic"])
+        
+        snapshot = {
+            "ts": time.time(),
+            "count": count,
+            "data": data,
+            "kmeans": kmeans,
+            "topics_by_pid": dict(topics_by_pid)
+        }
+        _CLUSTER_CACHE[num_clusters] = snapshot
+        return snapshot
+
 
 def cluster_papers_by_topic(num_clusters: int = 5) -> Dict:
     """
     Cluster papers by topic using K-Means on embeddings.
     
+    Results (and the fitted model) are cached per num_clusters for
+    CLUSTER_CACHE_TTL seconds and recomputed as soon as the collection's
+    chunk count changes.
+    
     Args:
         num_clusters: Number of topic clusters to create
-        
+    
     Returns:
         Dictionary with clusters and their papers
     """
+    return copy.deepcopy(_clustering(num_clusters)["data"])
+
+
+def _compute_clusters(num_clusters: int, count: int) -> tuple:
+    """Fit K-Means over every paper; returns (clusters dict, fitted model or None)."""
     try:
         from sklearn.cluster import KMeans
         import numpy as np
     except ImportError:
         logger.warning("scikit-learn not installed, cannot cluster")
-        return {}
+        return {}, None
     
     collection = get_collection()
-    count = collection.count()
     
     if count < num_clusters:
         logger.warning(f"Not enough papers ({count}) for {num_clusters} clusters")
-        return {}
+        return {}, None
     
-    # Get all paper embeddings
-    all_data = collection.get(limit=count)
+    # Stored chunk embeddings and metadata (documents are not needed)
+    all_data = collection.get(limit=count, include=["embeddings", "metadatas"])
+    chunk_embeddings = all_data.get("embeddings")
+    if chunk_embeddings is None or len(chunk_embeddings) == 0:
+        return {}, None
     
-    # Group by paper_id and get representative embedding
-    paper_embeddings = {}
+    # Group chunks by paper_id
+    group_of = {}
     paper_metadata = {}
+    chunk_groups = []
     
-    for i, paper_id in enumerate(all_data.get("ids", [])):
-        metadata = all_data.get("metadatas", [{}])[i] if all_data.get("metadatas") else {}
+    for metadata in all_data.get("metadatas") or []:
         pid = metadata.get("paper_id", "unknown")
         
-        if pid not in paper_embeddings:
-            # Get first chunk's embedding (or generate from title+abstract)
-            title = metadata.get("title", "")
-            abstract = metadata.get("abstract", "")
-            text = f"{title} {abstract[:500]}"
-            
-            from processing.embeddings import generate_embedding
-            embedding = generate_embedding(text)
-            paper_embeddings[pid] = embedding
+        if pid not in group_of:
+            group_of[pid] = len(group_of)
             paper_metadata[pid] = {
-                "title": title,
+                "title": metadata.get("title", ""),
                 "authors": metadata.get("authors", ""),
                 "year": metadata.get("year")
             }
+        chunk_groups.append(group_of[pid])
     
-    if len(paper_embeddings) < num_clusters:
-        return {}
+    if len(group_of) < num_clusters:
+        return {}, None
     
-    # Perform K-Means clustering
-    embeddings_list = list(paper_embeddings.values())
-    paper_ids = list(paper_embeddings.keys())
+    # Represent each paper by the mean of its chunk embeddings
+    chunk_embeddings = np.asarray(chunk_embeddings, dtype=np.float32)
+    chunk_groups = np.asarray(chunk_groups)
+    embeddings = np.zeros((len(group_of), chunk_embeddings.shape[1]), dtype=np.float32)
+    np.add.at(embeddings, chunk_groups, chunk_embeddings)
+    embeddings /= np.bincount(chunk_groups)[:, None]
+    paper_ids = list(group_of.keys())
     
+    # Perform K-Means clustering
     kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
-    clusters = kmeans.fit_predict(embeddings_list)
+    clusters = kmeans.fit_predict(embeddings)
     
     # Organize results
     cluster_papers = defaultdict(list)
@@ -96,7 +151,7 @@ def cluster_papers_by_topic(num_clusters: int = 5) -> Dict:
         }
     
     logger.info(f"Created {len(result)} topic clusters")
-    return result
+    return result, kmeans
 
 
 def get_paper_topics(paper_id: str, num_clusters: int = 5) -> List[str]:
@@ -106,13 +161,5 @@ def get_paper_topics(paper_id: str, num_clusters: int = 5) -> List[str]:
     Returns:
         List of topic labels
     """
-    clusters = cluster_papers_by_topic(num_clusters)
-    
-    topics = []
-    for cluster_info in clusters.values():
-        paper_ids = [p["paper_id"] for p in cluster_info["papers"]]
-        if paper_id in paper_ids:
-            topics.append(cluster_info["topic"])
-    
-    return topics
+    return list(_clustering(num_clusters)["topics_by_pid"].get(paper_id, []))
 
@@ -1,12 +1,120 @@
 """Research trend analysis - topic popularity over time."""
 from typing import List, Dict, Optional
+import threading
+import time
 from config.chroma_client import get_collection
 from datetime import datetime
 from collections import defaultdict
+import numpy as np
+from utils.chroma_cache import METADATA_CACHE_TTL, iter_metadata
 from utils.logger import get_logger
 
+try:
+    import ahocorasick
+except ImportError:  # Optional multi-pattern matcher; substring checks are used otherwise
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
+# Common research keywords tracked by analyze_topic_trends
+TREND_KEYWORDS = (
+    "transformer", "attention", "neural", "deep learning", "machine learning",
+    "reinforcement learning", "nlp", "computer vision", "cnn", "rnn", "lstm",
+    "gan", "bert", "gpt", "llm", "diffusion", "adversarial", "optimization",
+    "gradient", "backpropagation", "embedding", "vector", "semantic"
+)
+
+# Column of each keyword in analyze_topic_trends' count matrix
+_KEYWORD_COLUMNS = {keyword: col for col, keyword in enumerate(TREND_KEYWORDS)}
+
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton over TREND_KEYWORDS (values are keyword indices), or None."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for idx, keyword in enumerate(TREND_KEYWORDS):
+        automaton.add_word(keyword, idx)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _matched_keywords(text: str) -> List[str]:
+    """Trend keywords occurring in text (substring matches), in TREND_KEYWORDS order."""
+    if _KEYWORD_AUTOMATON is None:
+        return [keyword for keyword in TREND_KEYWORDS if keyword in text]
+    # One pass over the text; a keyword counts once however often it occurs
+    matched = {idx for _, idx in _KEYWORD_AUTOMATON.iter(text)}
+    return [TREND_KEYWORDS[idx] for idx in sorted(matched)]
+
+
+# Keyword counts from one pass over the collection:
+# {"ts", "count", "chunks", "texts": {paper_id: (year, lowercased title + abstract, chunk count)},
+#  "year_topics": {year: {keyword: chunk count}}}
+_trend_index: Optional[Dict] = None
+_trend_index_lock = threading.Lock()
+
+
+def _is_fresh(index: Optional[Dict], count: int) -> bool:
+    """Whether a trend index still matches the collection size and TTL."""
+    return index is not None and index["count"] == count and time.time() - index["ts"] < METADATA_CACHE_TTL
+
+
+def _get_trend_index(collection) -> Dict:
+    """
+    Per-year keyword counts for the collection, built in one paged pass.
+    
+    Metadata is streamed page by page and folded into the counts, so the
+    full metadata list is never held; title and abstract are kept once per
+    paper, not per chunk. The index is rebuilt when the chunk count changes
+    or METADATA_CACHE_TTL expires. Treat the result as read-only.
+    """
+    global _trend_index
+    count = collection.count()
+    index = _trend_index
+    if _is_fresh(index, count):
+        return index
+    
+    with _trend_index_lock:
+        index = _trend_index
+        if _is_fresh(index, count):
+            return index
+        
+        chunks = 0
+        papers = {}
+        for meta in iter_metadata(collection):
+            chunks += 1
+            year = meta.get("year")
+            if not year:
+                continue
+            # Chunks of a paper share its title and abstract: keep one copy and a chunk count
+            paper_id = meta.get("paper_id", "unknown")
+            paper = papers.get(paper_id)
+            if paper is None:
+                text = meta.get("search_text") or f"{meta.get('title', '')} {meta.get('abstract', '')}".lower()
+                papers[paper_id] = [year, text, 1]
+            else:
+                paper[2] += 1
+        
+        # Counts stay per chunk, as before; each paper's text is matched once
+        year_topics = {}
+        for year, text, chunk_count in papers.values():
+            topics = year_topics.setdefault(year, {})
+            for keyword in _matched_keywords(text):
+                topics[keyword] = topics.get(keyword, 0) + chunk_count
+        
+        index = _trend_index = {
+            "ts": time.time(),
+            "count": count,
+            "chunks": chunks,
+            "texts": {paper_id: tuple(paper) for paper_id, paper in papers.items()},
+            "year_topics": year_topics
+        }
+        return index
+
 
 def analyze_topic_trends(years: Optional[List[int]] = None) -> Dict:
     """
@@ -21,70 +129,42 @@ def analyze_topic_trends(years: Optional[List[int]] = None) -> Dict:
     collection = get_collection()
     
     try:
-        # Get all papers
-        all_data = collection.get(limit=10000)
-        metadatas = all_data.get("metadatas", [])
+        # Keyword counts per year (shared, rebuilt when the collection changes)
+        index = _get_trend_index(collection)
         
-        # Group papers by year
-        papers_by_year = defaultdict(list)
-        for meta in metadatas:
-            year = meta.get("year")
-            if year:
-                papers_by_year[year].append(meta)
+        year_topics = {
+            year: dict(topics)
+            for year, topics in index["year_topics"].items()
+            if not years or year in years
+        }
         
-        # Extract topics from titles/abstracts (simple keyword extraction)
-        year_topics = {}
-        for year, papers in papers_by_year.items():
-            if years and year not in years:
-                continue
-            
-            topics = defaultdict(int)
-            for paper in papers:
-                title = paper.get("title", "").lower()
-                abstract = paper.get("abstract", "").lower()
-                text = f"{title} {abstract}"
-                
-                # Common research keywords
-                keywords = [
-                    "transformer", "attention", "neural", "deep learning", "machine learning",
-                    "reinforcement learning", "nlp", "computer vision", "cnn", "rnn", "lstm",
-                    "gan", "bert", "gpt", "llm", "diffusion", "adversarial", "optimization",
-                    "gradient", "backpropagation", "embedding", "vector", "semantic"
-                ]
-                
-                for keyword in keywords:
-                    if keyword in text:
-                        topics[keyword] += 1
-            
-            year_topics[year] = dict(topics)
-        
-        # Calculate trends (growth/decline)
-        trends = {}
+        # Calculate trends (growth/decline) on a (years x keywords) count matrix
         years_sorted = sorted(year_topics.keys())
+        counts = np.zeros((len(years_sorted), len(TREND_KEYWORDS)), dtype=np.int32)
+        for row, year in enumerate(years_sorted):
+            for topic, count in year_topics[year].items():
+                counts[row, _KEYWORD_COLUMNS[topic]] = count
         
-        for i, year in enumerate(years_sorted):
-            if i == 0:
-                continue
-            
-            prev_year = years_sorted[i - 1]
-            trends[year] = {}
-            
-            all_topics = set(list(year_topics[year].keys()) + list(year_topics[prev_year].keys()))
-            
-            for topic in all_topics:
-                current_count = year_topics[year].get(topic, 0)
-                prev_count = year_topics[prev_year].get(topic, 0)
-                
-                if prev_count > 0:
-                    growth_rate = ((current_count - prev_count) / prev_count) * 100
-                else:
-                    growth_rate = 100 if current_count > 0 else 0
-                
-                trends[year][topic] = {
-                    "count": current_count,
-                    "growth_rate": growth_rate,
-                    "trend": "rising" if growth_rate > 10 else "declining" if growth_rate < -10 else "stable"
+        prev, cur = counts[:-1], counts[1:]
+        growth = np.where(
+            prev > 0,
+            (cur - prev) / np.maximum(prev, 1) * 100.0,
+            np.where(cur > 0, 100.0, 0.0)
+        )
+        labels = np.select([growth > 10, growth < -10], ["rising", "declining"], "stable")
+        # Report a topic for a year if it occurs in that year or the one before
+        present = (prev > 0) | (cur > 0)
+        
+        trends = {}
+        for row, year in enumerate(years_sorted[1:]):
+            trends[year] = {
+                TREND_KEYWORDS[col]: {
+                    "count": int(cur[row, col]),
+                    "growth_rate": float(growth[row, col]),
+                    "trend": str(labels[row, col])
                 }
+                for col in np.flatnonzero(present[row])
+            }
         
         # Find hottest topics (most growth in recent years)
         recent_years = sorted(years_sorted, reverse=True)[:3]
@@ -102,7 +182,7 @@ def analyze_topic_trends(years: Optional[List[int]] = None) -> Dict:
             "trends": trends,
             "hottest_topics": [{"topic": t, "total_growth": g} for t, g in hottest_topics],
             "years_analyzed": years_sorted,
-            "total_papers": len(metadatas)
+            "total_papers": index["chunks"]
         }
         
     except Exception as e:
@@ -123,22 +203,21 @@ def get_field_popularity(field: str) -> Dict:
     collection = get_collection()
     
     try:
-        all_data = collection.get(limit=10000)
-        metadatas = all_data.get("metadatas", [])
+        index = _get_trend_index(collection)
+        field_lower = field.lower()
         
         # Count papers by year for this field
-        field_by_year = defaultdict(int)
-        for meta in metadatas:
-            year = meta.get("year")
-            if not year:
-                continue
-            
-            title = meta.get("title", "").lower()
-            abstract = meta.get("abstract", "").lower()
-            text = f"{title} {abstract}"
-            
-            if field.lower() in text:
-                field_by_year[year] += 1
+        if field_lower in TREND_KEYWORDS:
+            field_by_year = {
+                year: topics[field_lower]
+                for year, topics in index["year_topics"].items()
+                if field_lower in topics
+            }
+        else:
+            field_by_year = defaultdict(int)
+            for year, text, chunk_count in index["texts"].values():
+                if field_lower in text:
+                    field_by_year[year] += chunk_count
         
         years = sorted(field_by_year.keys())
         counts = [field_by_year[y] for y in years]
@@ -189,33 +268,25 @@ def predict_future_trends(field: str, years_ahead: int = 3) -> Dict:
     if len(years) < 3:
         return {"error": "Need at least 3 years of data"}
     
-    # Simple linear regression
-    n = len(years)
-    sum_x = sum(years)
-    sum_y = sum(counts)
-    sum_xy = sum(years[i] * counts[i] for i in range(n))
-    sum_x2 = sum(y * y for y in years)
-    
-    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-    intercept = (sum_y - slope * sum_x) / n
+    # Simple linear regression (least squares fit of counts on years)
+    slope, intercept = np.polyfit(
+        np.asarray(years, dtype=np.float64), np.asarray(counts, dtype=np.float64), 1
+    )
     
     # Predict future
     current_year = max(years)
-    predictions = []
-    
-    for i in range(1, years_ahead + 1):
-        future_year = current_year + i
-        predicted_count = slope * future_year + intercept
-        predictions.append({
-            "year": future_year,
-            "predicted_count": max(0, int(predicted_count)),
-            "confidence": "high" if len(years) >= 5 else "medium" if len(years) >= 3 else "low"
-        })
+    future_years = current_year + np.arange(1, years_ahead + 1)
+    predicted_counts = np.clip((slope * future_years + intercept).astype(int), 0, None)
+    confidence = "high" if len(years) >= 5 else "medium" if len(years) >= 3 else "low"
+    predictions = [
+        {"year": int(year), "predicted_count": int(count), "confidence": confidence}
+        for year, count in zip(future_years, predicted_counts)
+    ]
     
     return {
         "field": field,
         "current_trend": popularity.get("recent_trend", "unknown"),
-        "slope": slope,
+        "slope": float(slope),
         "predictions": predictions,
         "method": "linear_regression"
     }
@@ -1,4 +1,5 @@
 """ChromaDB client configuration."""
+import threading
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from config.settings import settings
@@ -6,6 +7,19 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# HNSW index parameters, applied only when the collection is created.
+# Existing collections keep their original index settings; delete and
+# re-ingest (or re-create the collection) to pick these up.
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+}
+
+# Collection holding query embeddings of cached RAG answers (see api/semantic_cache.py)
+SEMANTIC_CACHE_COLLECTION = "llm_semantic_cache"
+
 # Initialize ChromaDB client (persistent storage)
 client = chromadb.PersistentClient(
     path=settings.chroma_persist_directory,
@@ -13,20 +27,29 @@ client = chromadb.PersistentClient(
 )
 
 
-def get_collection():
-    """Get or create the ChromaDB collection."""
-    try:
-        collection = client.get_collection(name=settings.chroma_collection_name)
-        logger.info(f"Using existing collection: {settings.chroma_collection_name}")
-    except Exception:
-        # Collection doesn't exist, create it
-        collection = client.create_collection(
-            name=settings.chroma_collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
-        logger.info(f"Created new collection: {settings.chroma_collection_name}")
-    
+# Collection handles, opened once per process
+_collections = {}
+_collections_lock = threading.Lock()
+
+
+def _open_collection(name: str, metadata: dict):
+    """Get or create a collection, caching its handle for later calls."""
+    collection = _collections.get(name)
+    if collection is None:
+        with _collections_lock:
+            collection = _collections.get(name)
+            if collection is None:
+                collection = client.get_or_create_collection(name=name, metadata=metadata)
+                logger.info(f"Using collection: {name} ({collection.count()} chunks)")
+                _collections[name] = collection
     return collection
 
 
+def get_collection():
+    """Get or create the ChromaDB collection."""
+    return _open_collection(settings.chroma_collection_name, HNSW_METADATA)
+
 
+def get_semantic_cache_collection():
+    """Get or create the collection backing the semantic answer cache."""
+    return _open_collection(SEMANTIC_CACHE_COLLECTION, {"hnsw:space": "cosine"})
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 from dataclasses import dataclass
+from functools import cached_property
 
 # Load .env from project root
 project_root = Path(__file__).parent.parent
@@ -10,6 +11,9 @@ env_path = project_root / ".env"
 load_dotenv(dotenv_path=env_path)
 
 
+_UNSET = object()
+
+
 @dataclass
 class Settings:
     """Application settings."""
@@ -23,6 +27,7 @@ class Settings:
     
     # Sentence Transformers (free, local)
     sentence_transformer_model: str = os.getenv("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2")
+    embedding_device: str = os.getenv("EMBEDDING_DEVICE", "auto")  # "auto", "cuda", "mps", or "cpu"
     
     # LLM provider: "openai", "ollama", or "simple" (template-based, no LLM)
     llm_provider: str = os.getenv("LLM_PROVIDER", "simple")
@@ -55,6 +60,28 @@ class Settings:
     # Performance
     enable_caching: bool = os.getenv("ENABLE_CACHING", "false").lower() == "true"
     max_collection_size: int = int(os.getenv("MAX_COLLECTION_SIZE", "100000"))  # Max chunks
+    embedding_cache_enabled: bool = os.getenv("EMBEDDING_CACHE", "true").lower() in ("1", "true")  # Reuse embeddings of repeated texts
+    rag_cache_enabled: bool = os.getenv("RAG_CACHE", "true").lower() in ("1", "true")  # Exact-match RAG answer cache
+    rag_cache_ttl: int = int(os.getenv("RAG_CACHE_TTL", "86400"))  # Seconds
+    semantic_cache_enabled: bool = os.getenv("SEMANTIC_CACHE", "true").lower() in ("1", "true")  # Reuse answers for paraphrased queries
+    semantic_cache_threshold: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))  # Min cosine similarity for a hit
+    
+    # Values derived from the fields above, computed on first access
+    _DERIVED = ("embedding_model_id",)
+    
+    def __setattr__(self, name, value) -> None:
+        """Set a field, dropping derived values only when the field actually changes."""
+        if self.__dict__.get(name, _UNSET) != value:
+            super().__setattr__(name, value)
+            for derived in self._DERIVED:
+                self.__dict__.pop(derived, None)
+    
+    @cached_property
+    def embedding_model_id(self) -> str:
+        """Provider-qualified name of the embedding model in use (part of embedding cache keys)."""
+        if self.embedding_provider == "openai":
+            return f"openai:{self.embedding_model}"
+        return f"{self.embedding_provider}:{self.sentence_transformer_model}"
     
     def validate(self) -> None:
         """Validate that required settings are present."""
@@ -18,7 +18,8 @@ def ingest_pdf_from_url(
     pdf_url: str,
     paper_id: Optional[str] = None,
     metadata: Optional[dict] = None,
-    use_smart_chunking: bool = True
+    use_smart_chunking: bool = True,
+    text: Optional[str] = None
 ) -> str:
     """
     Ingest a PDF from URL into the RAG pipeline with enhanced features.
@@ -28,6 +29,7 @@ def ingest_pdf_from_url(
         paper_id: Optional paper ID (generated if not provided)
         metadata: Optional additional metadata
         use_smart_chunking: Use smart chunking (section/paragraph-based) instead of fixed-size
+        text: Optional pre-extracted PDF text (skips the download when provided)
         
     Returns:
         Generated paper ID
@@ -39,7 +41,8 @@ def ingest_pdf_from_url(
     
     with timer("PDF Ingestion"):
         # Load and extract text
-        text = load_pdf_from_url(pdf_url)
+        if text is None:
+            text = load_pdf_from_url(pdf_url)
         
         # Extract enhanced metadata
         enhanced_meta = extract_enhanced_metadata(text)
@@ -73,9 +76,13 @@ def ingest_pdf_from_url(
         
         # Prepare metadata for storage
         from datetime import datetime
+        title = enhanced_meta.get("title", "Untitled")
+        abstract = enhanced_meta.get("abstract", "")
         upsert_metadata = {
-            "title": enhanced_meta.get("title", "Untitled"),
-            "abstract": enhanced_meta.get("abstract", ""),
+            "title": title,
+            "abstract": abstract,
+            # Lowercased title + abstract, read by keyword scans (trends, research gaps)
+            "search_text": f"{title} {abstract}".lower(),
             "authors": enhanced_meta.get("authors", enhanced_meta.get("authors_string", "Unknown")),
             "year": enhanced_meta.get("year"),
             "keywords": ", ".join(enhanced_meta.get("keywords", [])),
@@ -1,7 +1,7 @@
 """Fetch papers from various APIs based on topic."""
 import requests
 import feedparser
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from config.settings import settings
 from utils.logger import get_logger
 from ingestion.semantic_scholar_enhanced import search_papers_enhanced, paper_autocomplete
@@ -98,87 +98,94 @@ def search_arxiv(
         return []
 
 
-def fetch_papers_by_topic(
+def iter_papers_by_topic(
     topic: str, 
     max_papers: int = None,
     sources: Optional[List[str]] = None
-) -> List[Dict]:
+) -> Iterator[Dict]:
     """
-    Fetch papers from multiple sources based on a topic.
+    Yield unique papers on a topic as each source returns them.
+    
+    Consumers can start downloading PDFs from the first source while the
+    remaining sources are still being queried.
     
     Args:
         topic: Topic or query string
-        max_papers: Maximum total papers to fetch
+        max_papers: Maximum total papers to yield
         sources: List of sources to use (default: all available)
         
-    Returns:
-        List of paper dictionaries with PDF URLs
+    Yields:
+        Paper dictionaries with PDF URLs
     """
     max_papers = max_papers or settings.max_papers_per_query
     sources = sources or ["arxiv", "semantic_scholar", "crossref", "openalex"]
     
     logger.info(f"Fetching papers for topic: {topic} from {sources}")
     
-    all_papers = []
     papers_per_source = max_papers // len(sources) + 1
+    fetched = 0  # Papers returned by sources, including duplicates
+    yielded = 0
+    seen_titles = set()
+    
+    def search(source: str, remaining: int) -> List[Dict]:
+        if source == "semantic_scholar":
+            return search_semantic_scholar(topic, limit=papers_per_source)
+        if source == "arxiv":
+            return search_arxiv(topic, max_results=min(remaining, papers_per_source))
+        if source == "crossref":
+            return search_crossref(query=topic, rows=min(remaining, papers_per_source)).get("items", [])
+        if source == "openalex":
+            return search_openalex(query=topic, per_page=min(remaining, papers_per_source)).get("items", [])
+        return []
     
-    # Try Semantic Scholar
-    if "semantic_scholar" in sources:
+    # Same source order as before: Semantic Scholar first, then the rest
+    for source in ["semantic_scholar", "arxiv", "crossref", "openalex"]:
+        if source not in sources:
+            continue
+        remaining = max_papers - fetched
+        if remaining <= 0:
+            continue
+        
         try:
-            semantic_papers = search_semantic_scholar(topic, limit=papers_per_source)
-            if semantic_papers:
-                all_papers.extend(semantic_papers)
-                logger.info(f"Got {len(semantic_papers)} papers from Semantic Scholar")
+            source_papers = search(source, remaining)
         except Exception as e:
-            logger.warning(f"Semantic Scholar search failed: {e}")
-    
-    # Try ArXiv
-    if "arxiv" in sources:
-        remaining = max_papers - len(all_papers)
-        if remaining > 0:
-            try:
-                arxiv_papers = search_arxiv(topic, max_results=min(remaining, papers_per_source))
-                if arxiv_papers:
-                    all_papers.extend(arxiv_papers)
-                    logger.info(f"Got {len(arxiv_papers)} papers from ArXiv")
-            except Exception as e:
-                logger.warning(f"ArXiv search failed: {e}")
-    
-    # Try Crossref
-    if "crossref" in sources:
-        remaining = max_papers - len(all_papers)
-        if remaining > 0:
-            try:
-                crossref_result = search_crossref(query=topic, rows=min(remaining, papers_per_source))
-                crossref_papers = crossref_result.get("items", [])
-                if crossref_papers:
-                    all_papers.extend(crossref_papers)
-                    logger.info(f"Got {len(crossref_papers)} papers from Crossref")
-            except Exception as e:
-                logger.warning(f"Crossref search failed: {e}")
-    
-    # Try OpenAlex
-    if "openalex" in sources:
-        remaining = max_papers - len(all_papers)
-        if remaining > 0:
-            try:
-                openalex_result = search_openalex(query=topic, per_page=min(remaining, papers_per_source))
-                openalex_papers = openalex_result.get("items", [])
-                if openalex_papers:
-                    all_papers.extend(openalex_papers)
-                    logger.info(f"Got {len(openalex_papers)} papers from OpenAlex")
-            except Exception as e:
-                logger.warning(f"OpenAlex search failed: {e}")
-    
-    # Remove duplicates (by title similarity)
-    unique_papers = []
-    seen_titles = set()
-    for paper in all_papers:
-        title_lower = paper["title"].lower()
-        if title_lower not in seen_titles:
+            logger.warning(f"{source} search failed: {e}")
+            continue
+        
+        if not source_papers:
+            continue
+        fetched += len(source_papers)
+        logger.info(f"Got {len(source_papers)} papers from {source}")
+        
+        # Remove duplicates (by title) as papers arrive
+        for paper in source_papers:
+            title_lower = paper["title"].lower()
+            if title_lower in seen_titles:
+                continue
             seen_titles.add(title_lower)
-            unique_papers.append(paper)
+            yield paper
+            yielded += 1
+            if yielded >= max_papers:
+                logger.info(f"Fetched {yielded} unique papers for topic: {topic}")
+                return
     
-    logger.info(f"Fetched {len(unique_papers)} unique papers for topic: {topic}")
-    return unique_papers[:max_papers]
+    logger.info(f"Fetched {yielded} unique papers for topic: {topic}")
 
+
+def fetch_papers_by_topic(
+    topic: str, 
+    max_papers: int = None,
+    sources: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Fetch papers from multiple sources based on a topic.
+    
+    Args:
+        topic: Topic or query string
+        max_papers: Maximum total papers to fetch
+        sources: List of sources to use (default: all available)
+        
+    Returns:
+        List of paper dictionaries with PDF URLs
+    """
+    return list(iter_papers_by_topic(topic, max_papers=max_papers, sources=sources))
@@ -8,6 +8,8 @@ from ingestion.semantic_scholar import fetch_paper_metadata
 from ingestion.paper_fetcher import fetch_papers_by_topic
 from ingestion.ingest_pipeline import ingest_pdf_from_url
 from rag.pipeline import run_rag_pipeline
+from api.semantic_cache import semantic_cached_rag
+from utils.llm_cache import cached_rag
 from utils.logger import get_logger
 from utils.timers import timer
 
@@ -62,6 +64,12 @@ def query_rag(
     """
     Query the RAG pipeline with enhanced features.
     
+    Without fetch_papers, answers are cached: an exact repeat of the call, or
+    a query whose embedding is at least settings.semantic_cache_threshold
+    similar to an earlier one with the same other arguments, skips retrieval
+    and generation until the collection changes. With fetch_papers the
+    pipeline always runs, so a sparse collection is still filled on demand.
+    
     Args:
         query: User query
         top_k: Number of context chunks to retrieve
@@ -71,6 +79,20 @@ def query_rag(
     Returns:
         RAG response as dictionary
     """
+    if fetch_papers:
+        return _run_query_rag(query, top_k, fetch_papers=True, use_enhanced=use_enhanced)
+    return _cached_query_rag(query, top_k=top_k, use_enhanced=use_enhanced)
+
+
+@cached_rag("query_rag")
+@semantic_cached_rag("query_rag")
+def _cached_query_rag(query: str, top_k: int = 5, use_enhanced: bool = True) -> dict:
+    """query_rag over the current collection only (no on-demand fetching), cached."""
+    return _run_query_rag(query, top_k, fetch_papers=False, use_enhanced=use_enhanced)
+
+
+def _run_query_rag(query: str, top_k: int, fetch_papers: bool, use_enhanced: bool) -> dict:
+    """Run the RAG pipeline for query_rag and convert the response to a dictionary."""
     logger.info(f"Processing RAG query: {query}")
     
     with timer("RAG Query"):
@@ -9,6 +9,9 @@ from ingestion.paper_fetcher import fetch_papers_by_topic, search_semantic_schol
 from ingestion.ingest_pipeline import ingest_pdf_from_url
 from config.settings import settings
 from config.chroma_client import get_collection
+from utils.chroma_cache import invalidate_metadata, invalidate_paper
+from vectorstore.centroids import invalidate_centroids
+from utils.llm_cache import bump_corpus_version
 from utils.logger import get_logger
 from utils.timers import timer
 
@@ -140,8 +143,8 @@ def list_papers():
         print("No papers found.")
         return
     
-    # Get all papers
-    all_data = collection.get(limit=count)
+    # Get all papers (metadata only)
+    all_data = collection.get(limit=count, include=["metadatas"])
     
     # Group by paper_id
     papers = {}
@@ -177,7 +180,8 @@ def delete_paper(paper_id: str):
     # Get all chunks for this paper
     try:
         chunks = collection.get(
-            where={"paper_id": paper_id}
+            where={"paper_id": paper_id},
+            include=[]  # Only the ids are needed
         )
         
         if not chunks.get("ids"):
@@ -190,6 +194,10 @@ def delete_paper(paper_id: str):
         confirm = input("Delete all chunks? (yes/no): ").strip().lower()
         if confirm == "yes":
             collection.delete(ids=chunk_ids)
+            invalidate_paper(paper_id)
+            invalidate_centroids([paper_id])
+            invalidate_metadata(collection.name)
+            bump_corpus_version()
             print(f"✅ Deleted {len(chunk_ids)} chunks")
         else:
             print("Cancelled")
@@ -207,7 +215,7 @@ def export_papers_list(filename: str = "papers_export.json"):
         print("No papers to export")
         return
     
-    all_data = collection.get(limit=count)
+    all_data = collection.get(limit=count, include=["metadatas"])
     
     # Group by paper_id
     papers = {}
@@ -310,9 +318,10 @@ def main():
     print("4. Delete a paper")
     print("5. Export papers list")
     print("6. View statistics")
-    print("7. Exit")
+    print("7. Precompute citation counts")
+    print("8. Exit")
     
-    choice = input("\nEnter choice (1-7): ").strip()
+    choice = input("\nEnter choice (1-8): ").strip()
     
     if choice == "1":
         topics_input = input("Enter topics (comma-separated): ").strip()
@@ -353,6 +362,12 @@ def main():
         get_statistics()
     
     elif choice == "7":
+        from api.precomputed_citations import precompute_citation_counts
+        with timer("Citation Precomputation"):
+            counts = precompute_citation_counts()
+        print(f"✅ Precomputed citation counts for {len(counts)} papers")
+    
+    elif choice == "8":
         print("Goodbye!")
     
     else:
@@ -0,0 +1,117 @@
+"""Persistent int8-quantized cache for paper title/abstract embeddings."""
+from typing import List, Tuple
+import sqlite3
+import threading
+import numpy as np
+from processing.embeddings import generate_embeddings_batch, _embedding_cache_key
+from utils.cache import CACHE_DIR
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PAPER_EMBEDDING_DB = CACHE_DIR / "paper_embeddings.sqlite3"
+
+# Keys per SELECT ... IN (...) (stays under SQLite's bound-parameter limit)
+LOOKUP_CHUNK_SIZE = 500
+
+# One connection per thread; sqlite3 connections must not be shared across threads
+_local = threading.local()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Get this thread's connection, creating the table on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(PAPER_EMBEDDING_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, scale REAL NOT NULL, vector BLOB NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+def quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Symmetric int8 scalar quantization: vector ~= q * scale."""
+    max_abs = float(np.max(np.abs(vector))) if vector.size else 0.0
+    if max_abs == 0.0:
+        return np.zeros(vector.shape, dtype=np.int8), 1.0
+    scale = max_abs / 127
+    return np.round(vector / scale).astype(np.int8), scale
+
+
+def dequantize(q: np.ndarray, scale: float) -> np.ndarray:
+    """Inverse of quantize, as float32."""
+    return q.astype(np.float32) * np.float32(scale)
+
+
+def _load_vectors(keys: List[str]) -> dict:
+    """Fetch stored vectors for keys, dequantized to float32 arrays."""
+    conn = _get_connection()
+    found = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT key, scale, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+        ).fetchall()
+        for key, scale, blob in rows:
+            found[key] = dequantize(np.frombuffer(blob, dtype=np.int8), scale)
+    return found
+
+
+def embed_papers(texts: List[str]) -> np.ndarray:
+    """
+    Embed paper texts, reusing vectors stored by earlier calls.
+    
+    Misses are embedded with one batch call and stored int8-quantized
+    (a quarter of the float32 size), keyed by the embedding model and text,
+    so later queries over the same papers skip the model entirely. Vectors
+    served from the store carry the quantization error (well under 1% in
+    cosine similarity).
+    
+    Args:
+        texts: Paper texts (typically "title abstract[:500]")
+    
+    Returns:
+        (len(texts), d) float32 matrix
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    
+    keys = [_embedding_cache_key(text) for text in texts]
+    try:
+        vectors = _load_vectors(list(dict.fromkeys(keys)))
+    except Exception as e:
+        logger.warning(f"Error reading paper embedding cache: {e}")
+        vectors = {}
+    
+    missing = list(dict.fromkeys(
+        (key, text) for key, text in zip(keys, texts) if key not in vectors
+    ))
+    if missing:
+        embeddings = generate_embeddings_batch([text for _, text in missing], use_cache=True)
+        new_rows = []
+        for (key, _), embedding in zip(missing, embeddings):
+            vector = np.asarray(embedding, dtype=np.float32)
+            vectors[key] = vector
+            q, scale = quantize(vector)
+            new_rows.append((key, scale, q.tobytes()))
+        try:
+            conn = _get_connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, scale, vector) VALUES (?, ?, ?)", new_rows
+                )
+        except Exception as e:
+            logger.warning(f"Error writing paper embedding cache: {e}")
+        logger.debug(f"Embedded {len(missing)} papers, {len(texts) - len(missing)} from cache")
+    
+    return np.stack([vectors[key] for key in keys])
+
+
+def embed_paper(text: str) -> np.ndarray:
+    """Embed a single paper text through the persistent cache."""
+    return embed_papers([text])[0]
@@ -1,6 +1,10 @@
 """Embedding generation using OpenAI or Sentence Transformers."""
-from typing import List
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from config.settings import settings
+from utils.cache import load_from_cache, save_to_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -9,6 +13,27 @@ logger = get_logger(__name__)
 _sentence_transformer_model = None
 _openai_client = None
 
+# In-process LRU of query embeddings (backed by the "embeddings" disk cache when ENABLE_CACHING=true)
+EMBEDDING_CACHE_SIZE = 10_000
+_embedding_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+_embedding_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _resolve_device() -> str:
+    """Pick the device for sentence transformers, preferring a GPU when available."""
+    if settings.embedding_device != "auto":
+        return settings.embedding_device
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+            return "mps"
+    except ImportError:
+        pass
+    return "cpu"
+
 
 def _get_sentence_transformer():
     """Lazy load sentence transformer model."""
@@ -16,8 +41,9 @@ def _get_sentence_transformer():
     if _sentence_transformer_model is None:
         try:
             from sentence_transformers import SentenceTransformer
-            logger.info(f"Loading sentence transformer model: {settings.sentence_transformer_model}")
-            _sentence_transformer_model = SentenceTransformer(settings.sentence_transformer_model)
+            device = _resolve_device()
+            logger.info(f"Loading sentence transformer model: {settings.sentence_transformer_model} on {device}")
+            _sentence_transformer_model = SentenceTransformer(settings.sentence_transformer_model, device=device)
             logger.info("Sentence transformer model loaded successfully")
         except ImportError:
             raise ImportError("sentence-transformers not installed. Run: pip install sentence-transformers")
@@ -33,18 +59,115 @@ def _get_openai_client():
     return _openai_client
 
 
+def _embedding_cache_key(text: str) -> str:
+    """Cache key for a text under the currently configured embedding model."""
+    return hashlib.sha256(f"{settings.embedding_model_id}\0{text}".encode("utf-8")).hexdigest()
+
+
+def get_cached_embedding(text: str) -> Optional[List[float]]:
+    """
+    Look up a previously generated embedding.
+    
+    Checks the in-process LRU first, then the disk cache if caching is enabled.
+    
+    Returns:
+        Embedding vector, or None on a miss (always None when EMBEDDING_CACHE=false)
+    """
+    if not settings.embedding_cache_enabled:
+        return None
+    
+    key = _embedding_cache_key(text)
+    with _embedding_cache_lock:
+        cached = _embedding_cache.get(key)
+        if cached is not None:
+            _embedding_cache.move_to_end(key)
+            _embedding_cache_stats["hits"] += 1
+            return list(cached)
+    
+    if settings.enable_caching:
+        cached = load_from_cache("embeddings", key)
+        if cached is not None:
+            _remember_embedding(key, cached, persist=False)
+            with _embedding_cache_lock:
+                _embedding_cache_stats["hits"] += 1
+            return list(cached)
+    
+    with _embedding_cache_lock:
+        _embedding_cache_stats["misses"] += 1
+    return None
+
+
+def cache_embedding(text: str, embedding: List[float]) -> None:
+    """Store an embedding in the LRU (and on disk if caching is enabled)."""
+    if not settings.embedding_cache_enabled:
+        return
+    _remember_embedding(_embedding_cache_key(text), embedding, persist=settings.enable_caching)
+
+
+def _remember_embedding(key: str, embedding: List[float], persist: bool) -> None:
+    """Insert into the LRU, evicting the least recently used entries if full."""
+    vector = tuple(embedding)
+    with _embedding_cache_lock:
+        _embedding_cache[key] = vector
+        _embedding_cache.move_to_end(key)
+        while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    if persist:
+        save_to_cache("embeddings", key, vector)
+
+
+def clear_embedding_cache() -> None:
+    """Drop all in-process cached embeddings and reset the hit/miss counters."""
+    with _embedding_cache_lock:
+        _embedding_cache.clear()
+        _embedding_cache_stats.update(hits=0, misses=0)
+
+
+def get_cache_stats() -> dict:
+    """
+    Embedding cache statistics.
+    
+    Returns:
+        Dictionary with hits, misses, hit_rate, size and max_size
+    """
+    with _embedding_cache_lock:
+        hits = _embedding_cache_stats["hits"]
+        misses = _embedding_cache_stats["misses"]
+        size = len(_embedding_cache)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "size": size,
+        "max_size": EMBEDDING_CACHE_SIZE
+    }
+
+
 def generate_embedding(text: str) -> List[float]:
     """
     Generate embedding for a single text.
     
-    Uses OpenAI or Sentence Transformers based on settings.
+    Uses OpenAI or Sentence Transformers based on settings. Results are
+    cached per model and text, so repeated queries skip the model/API call.
     
     Args:
         text: Input text to embed
-        
+    
     Returns:
         Embedding vector as list of floats
     """
+    cached = get_cached_embedding(text)
+    if cached is not None:
+        return cached
+    
+    embedding = _generate_embedding_uncached(text)
+    cache_embedding(text, embedding)
+    return embedding
+
+
+def _generate_embedding_uncached(text: str) -> List[float]:
+    """Embed a single text with the configured provider."""
     if settings.embedding_provider == "sentence-transformers":
         # Use free sentence transformers
         model = _get_sentence_transformer()
@@ -71,30 +194,59 @@ def generate_embedding(text: str) -> List[float]:
         raise ValueError(f"Unknown embedding provider: {settings.embedding_provider}")
 
 
-def generate_embeddings_batch(texts: List[str], batch_size: int = 100) -> List[List[float]]:
+def generate_embeddings_batch(
+    texts: List[str],
+    batch_size: int = 100,
+    use_cache: bool = False
+) -> List[List[float]]:
     """
     Generate embeddings for multiple texts in batches.
     
     Args:
         texts: List of texts to embed
         batch_size: Number of texts to process per batch
-        
+        use_cache: Serve and store results through the embedding cache
+            (for query-like texts; leave off for bulk chunk ingestion)
+    
     Returns:
         List of embedding vectors
     """
+    if not use_cache:
+        return _generate_embeddings_batch_uncached(texts, batch_size)
+    
+    embeddings = [get_cached_embedding(text) for text in texts]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        # Embed each distinct missing text once
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        generated = dict(zip(unique_texts, _generate_embeddings_batch_uncached(unique_texts, batch_size)))
+        for text, embedding in generated.items():
+            cache_embedding(text, embedding)
+        for i in missing:
+            embeddings[i] = list(generated[texts[i]])
+    return embeddings
+
+
+def _generate_embeddings_batch_uncached(texts: List[str], batch_size: int) -> List[List[float]]:
+    """Embed texts with the configured provider, batch_size at a time."""
     if settings.embedding_provider == "sentence-transformers":
         # Sentence transformers handles batching efficiently
         model = _get_sentence_transformer()
         logger.info(f"Generating embeddings for {len(texts)} texts using sentence-transformers")
-        embeddings = model.encode(texts, convert_to_numpy=True, batch_size=batch_size)
-        # Convert numpy array to list of lists
-        import numpy as np
-        if isinstance(embeddings, np.ndarray):
-            embeddings = embeddings.tolist()
-        # Ensure it's a list of lists
-        if isinstance(embeddings, list) and len(embeddings) > 0:
-            if not isinstance(embeddings[0], list):
-                embeddings = [embeddings]  # Single embedding case
+        if not texts:
+            return []
+        
+        # Encode longest texts first so each batch pads to similar lengths,
+        # then restore the caller's order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        encoded = model.encode(
+            [texts[i] for i in order],
+            convert_to_numpy=True,
+            batch_size=batch_size
+        )
+        embeddings = [None] * len(texts)
+        for position, i in enumerate(order):
+            embeddings[i] = encoded[position].tolist()
         logger.info(f"Generated {len(embeddings)} embeddings, each of dimension {len(embeddings[0]) if embeddings else 0}")
         return embeddings
     
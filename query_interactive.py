@@ -70,7 +70,7 @@ def show_stats():
     
     if count > 0:
         # Get sample to see paper IDs
-        sample = collection.get(limit=min(100, count))
+        sample = collection.get(limit=min(100, count), include=["metadatas"])
         if sample.get("metadatas"):
             paper_ids = set()
             for meta in sample["metadatas"]:
@@ -1,5 +1,7 @@
 """Complete RAG pipeline orchestration with enhanced features."""
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
+from vectorstore.query import QueryResult
 from rag.retriever import retrieve_context
 from rag.generator import generate_answer, RAGResponse
 from rag.query_expander import expand_query_with_llm, normalize_query
@@ -14,6 +16,44 @@ from utils.timers import timer
 
 logger = get_logger(__name__)
 
+# Reciprocal rank fusion constant: a chunk at rank r in one ranking scores 1 / (RRF_K + r)
+RRF_K = 60
+# Concurrent sub-query retrievals
+RETRIEVAL_WORKERS = 5
+
+
+def _fused_retrieval(queries: List[str], top_k: int, use_hybrid_search: bool = True) -> List[QueryResult]:
+    """
+    Retrieve for several queries concurrently and fuse the rankings.
+    
+    Each query is searched independently (to full depth, so overlap between
+    queries cannot leave fewer than top_k chunks) and the rankings are merged
+    with reciprocal rank fusion. Chunks keep their original search score.
+    
+    Args:
+        queries: Retrieval queries
+        top_k: Number of fused chunks to return
+        use_hybrid_search: Whether to use hybrid search for each query
+    
+    Returns:
+        List of QueryResult objects ordered by fused rank
+    """
+    search = hybrid_search if use_hybrid_search else retrieve_context
+    
+    with ThreadPoolExecutor(max_workers=min(RETRIEVAL_WORKERS, len(queries))) as executor:
+        rankings = list(executor.map(lambda q: search(q, top_k=top_k), queries))
+    
+    fused_scores = {}
+    chunks_by_id = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, 1):
+            fused_scores[chunk.chunk_id] = fused_scores.get(chunk.chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+            chunks_by_id.setdefault(chunk.chunk_id, chunk)
+    
+    fused_ids = sorted(fused_scores, key=fused_scores.get, reverse=True)[:top_k]
+    logger.info(f"Fused {len(queries)} retrievals into {len(fused_ids)} chunks")
+    return [chunks_by_id[chunk_id] for chunk_id in fused_ids]
+
 
 def run_rag_pipeline(
     query: str,
@@ -21,7 +61,8 @@ def run_rag_pipeline(
     system_prompt: Optional[str] = None,
     fetch_papers: bool = True,
     use_hybrid_search: bool = True,
-    use_reranking: bool = True
+    use_reranking: bool = True,
+    sub_queries: Optional[List[str]] = None
 ) -> RAGResponse:
     """
     Run the complete enhanced RAG pipeline.
@@ -33,7 +74,9 @@ def run_rag_pipeline(
         fetch_papers: Whether to fetch papers on-demand if needed
         use_hybrid_search: Whether to use hybrid search
         use_reranking: Whether to re-rank results
-        
+        sub_queries: Extra retrieval queries, searched concurrently with the
+            query and merged by reciprocal rank fusion
+    
     Returns:
         RAGResponse with answer, citations, and context
     """
@@ -81,7 +124,9 @@ def run_rag_pipeline(
                 logger.warning("No papers found from APIs for this query")
     
     # Step 3: Retrieve context from ingested papers
-    if use_hybrid_search:
+    if sub_queries:
+        context_chunks = _fused_retrieval([normalized_query, *sub_queries], top_k * 2, use_hybrid_search)
+    elif use_hybrid_search:
         context_chunks = hybrid_search(normalized_query, top_k=top_k * 2)
     else:
         from rag.retriever import retrieve_context
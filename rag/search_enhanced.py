@@ -4,6 +4,7 @@ from vectorstore.query import QueryResult, query_vectors
 from config.chroma_client import get_collection
 from processing.embeddings import generate_embedding
 from config.settings import settings
+from utils.chroma_cache import iter_metadata
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,13 +16,12 @@ def search_by_author(author_name: str, limit: int = 10) -> List[Dict]:
     
     try:
         # ChromaDB doesn't support full-text search in metadata well,
-        # so we'll get all and filter
-        all_data = collection.get(limit=10000)  # Get up to 10k
-        
+        # so we page through the metadata and filter, stopping once enough papers match
+        author_lower = author_name.lower()
         papers = {}
-        for i, metadata in enumerate(all_data.get("metadatas", [])):
+        for metadata in iter_metadata(collection):
             authors = metadata.get("authors", "").lower()
-            if author_name.lower() in authors:
+            if author_lower in authors:
                 paper_id = metadata.get("paper_id", "unknown")
                 if paper_id not in papers:
                     papers[paper_id] = {
@@ -31,6 +31,8 @@ def search_by_author(author_name: str, limit: int = 10) -> List[Dict]:
                         "year": metadata.get("year"),
                         "source": metadata.get("source"),
                     }
+                    if len(papers) >= limit:
+                        break
         
         results = list(papers.values())[:limit]
         logger.info(f"Found {len(results)} papers by author '{author_name}'")
@@ -48,7 +50,8 @@ def search_by_year(year: int, limit: int = 10) -> List[Dict]:
     try:
         all_data = collection.get(
             where={"year": year},
-            limit=limit * 10  # Get more to find unique papers
+            limit=limit * 10,  # Get more to find unique papers
+            include=["metadatas"]
         )
         
         papers = {}
@@ -5,6 +5,8 @@ import json
 import time
 from pathlib import Path
 from datetime import datetime
+from collections import defaultdict
+from statistics import fmean
 from typing import List, Dict, Optional
 import pandas as pd
 import io
@@ -98,11 +100,20 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_data(ttl=60)
+def get_statistics_text() -> str:
+    """Captured get_statistics() output, cached so reruns don't rescan the collection."""
+    f = io.StringIO()
+    with redirect_stdout(f):
+        get_statistics()
+    return f.getvalue()
+
+
 def get_library_papers():
     """Get all papers in the library."""
     try:
         collection = get_collection()
-        all_data = collection.get(limit=10000)
+        all_data = collection.get(limit=10000, include=["metadatas"])
         
         papers = {}
         for metadata in all_data.get("metadatas", []):
@@ -122,7 +133,7 @@ def get_library_papers():
         
         # Count chunks per paper
         for paper_id in papers:
-            chunks = collection.get(where={"paper_id": paper_id}, limit=1)
+            chunks = collection.get(where={"paper_id": paper_id}, limit=1, include=[])
             if chunks.get("ids"):
                 papers[paper_id]["chunk_count"] = len(chunks["ids"])
         
@@ -349,15 +360,11 @@ with st.sidebar:
     
     st.subheader("📊 Collection Stats")
     if st.button("🔄 Refresh Stats"):
+        get_statistics_text.clear()
         st.rerun()
     
     try:
-        stats_output = []
-        f = io.StringIO()
-        with redirect_stdout(f):
-            get_statistics()
-        stats_text = f.getvalue()
-        st.text(stats_text[:500])
+        st.text(get_statistics_text()[:500])
     except:
         st.info("No statistics available")
     
@@ -811,20 +818,14 @@ with tab4:
                     # Display citations
                     if result.get("citations"):
                         with st.expander("📚 Citations & Sources"):
-                            unique_papers = {}
+                            unique_papers = defaultdict(lambda: {"chunks": [], "scores": []})
                             for citation in result["citations"]:
-                                pid = citation["paper_id"]
-                                if pid not in unique_papers:
-                                    unique_papers[pid] = {
-                                        "paper_id": pid,
-                                        "chunks": [],
-                                        "scores": []
-                                    }
-                                unique_papers[pid]["chunks"].append(citation.get("chunk_index"))
-                                unique_papers[pid]["scores"].append(citation.get("score", 0))
+                                info = unique_papers[citation["paper_id"]]
+                                info["chunks"].append(citation.get("chunk_index"))
+                                info["scores"].append(citation.get("score", 0))
                             
                             for pid, info in unique_papers.items():
-                                avg_score = sum(info["scores"]) / len(info["scores"]) if info["scores"] else 0
+                                avg_score = fmean(info["scores"])  # Every group has at least one citation
                                 st.markdown(f"""
                                 <div class="citation">
                                     <strong>Paper ID:</strong> {pid}<br>
@@ -0,0 +1,153 @@
+"""In-process caches for ChromaDB reads (metadata scans and paper lookups)."""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Snapshot TTL in seconds (the chunk count check catches most changes sooner)
+METADATA_CACHE_TTL = 300
+
+# (collection name, chunk count) -> (timestamp, {"ids": [...], "metadatas": [...]})
+_metadata_cache: Dict[Tuple[str, int], Tuple[float, Dict]] = {}
+
+# Chunks fetched per page by iter_metadata
+METADATA_PAGE_SIZE = 1000
+
+# Paper lookup cache: bounded LRU with a TTL per entry
+PAPER_CACHE_SIZE = 2048
+PAPER_CACHE_TTL = 600
+
+# paper_id -> (timestamp, paper dict), least recently used first
+_paper_cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+_paper_cache_lock = threading.Lock()
+
+
+def get_all_metadata(collection) -> Dict:
+    """
+    Get ids and metadatas for every chunk in a collection.
+
+    The snapshot is shared across callers and refreshed when the collection's
+    chunk count changes or the TTL expires. Treat the result as read-only.
+
+    Args:
+        collection: ChromaDB collection
+
+    Returns:
+        Dictionary with "ids" and "metadatas" lists
+    """
+    count = collection.count()
+    if count == 0:
+        return {"ids": [], "metadatas": []}
+
+    key = (collection.name, count)
+    cached = _metadata_cache.get(key)
+    if cached is not None and time.time() - cached[0] < METADATA_CACHE_TTL:
+        logger.debug(f"Metadata cache hit: {collection.name} ({count} chunks)")
+        return cached[1]
+
+    # Only metadatas are needed; skip the documents payload
+    all_data = collection.get(limit=count, include=["metadatas"])
+    snapshot = {
+        "ids": all_data.get("ids") or [],
+        "metadatas": all_data.get("metadatas") or [],
+    }
+
+    # Only one snapshot per collection is ever useful
+    invalidate_metadata(collection.name)
+    _metadata_cache[key] = (time.time(), snapshot)
+
+    logger.debug(f"Metadata cache refreshed: {collection.name} ({count} chunks)")
+    return snapshot
+
+
+def iter_metadata(collection, page_size: int = METADATA_PAGE_SIZE) -> Iterator[Dict]:
+    """
+    Yield every chunk's metadata, fetched from ChromaDB one page at a time.
+
+    For scans that only fold metadata into counters or stop early: at most
+    one page is held in memory, unlike the shared get_all_metadata snapshot.
+
+    Args:
+        collection: ChromaDB collection
+        page_size: Chunks fetched per request
+
+    Yields:
+        Chunk metadata dicts, in collection order
+    """
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["metadatas"]).get("metadatas") or []
+        yield from page
+        if len(page) < page_size:
+            return
+        offset += len(page)
+
+
+def clear_metadata_cache() -> None:
+    """Drop all cached metadata snapshots."""
+    _metadata_cache.clear()
+
+
+def invalidate_metadata(collection_name: str) -> None:
+    """
+    Drop a collection's metadata snapshot after its chunks change.
+    
+    The chunk count key misses updates that keep the count (an upsert of
+    existing ids), so writers call this explicitly.
+    
+    Args:
+        collection_name: Name of the changed collection
+    """
+    for stale_key in [k for k in list(_metadata_cache) if k[0] == collection_name]:
+        _metadata_cache.pop(stale_key, None)
+
+
+def get_cached_paper(paper_id: str) -> Optional[Dict]:
+    """
+    Get a cached paper lookup result.
+    
+    Args:
+        paper_id: Paper identifier
+        
+    Returns:
+        A copy of the cached paper dict, or None on a miss or expired entry
+    """
+    with _paper_cache_lock:
+        cached = _paper_cache.get(paper_id)
+        if cached is None:
+            return None
+        if time.time() - cached[0] >= PAPER_CACHE_TTL:
+            del _paper_cache[paper_id]
+            return None
+        _paper_cache.move_to_end(paper_id)
+        paper = cached[1]
+    # Callers may mutate the result; keep the cached copy pristine
+    return copy.deepcopy(paper)
+
+
+def cache_paper(paper_id: str, paper: Dict) -> None:
+    """Store a paper lookup result, evicting the least recently used entry if full."""
+    paper = copy.deepcopy(paper)
+    with _paper_cache_lock:
+        _paper_cache[paper_id] = (time.time(), paper)
+        _paper_cache.move_to_end(paper_id)
+        while len(_paper_cache) > PAPER_CACHE_SIZE:
+            _paper_cache.popitem(last=False)
+
+
+def invalidate_paper(paper_id: Optional[str] = None) -> None:
+    """
+    Drop cached lookups after a paper's chunks change.
+    
+    Args:
+        paper_id: Paper to drop (if None, clears every cached paper)
+    """
+    with _paper_cache_lock:
+        if paper_id is None:
+            _paper_cache.clear()
+        else:
+            _paper_cache.pop(paper_id, None)
@@ -0,0 +1,220 @@
+"""Exact-match cache for RAG answers, stored in SQLite."""
+from typing import Any, Callable, Dict, Optional
+from functools import wraps
+import hashlib
+import inspect
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from config.settings import settings
+from utils.cache import CACHE_DIR
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LLM_CACHE_DB = CACHE_DIR / "llm_responses.sqlite3"
+
+# Prompt, retrieval and generation code behind every cached answer
+RAG_SOURCE_FILES = sorted((Path(__file__).parent.parent / "rag").glob("*.py"))
+
+# One connection per thread; sqlite3 connections must not be shared across threads
+_local = threading.local()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Get this thread's connection, creating the table on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(LLM_CACHE_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key BLOB PRIMARY KEY, value BLOB NOT NULL, ts INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS corpus_version ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+def _rag_source_hash() -> str:
+    """Hash the rag package's sources, so edits to shared prompts or retrieval miss the cache."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in RAG_SOURCE_FILES:
+        try:
+            digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes())
+        except OSError as e:
+            logger.warning(f"Could not read {path.name} for the RAG cache fingerprint: {e}")
+    return digest.hexdigest()
+
+
+_RAG_SOURCE_HASH = _rag_source_hash()
+
+
+def function_fingerprint(func: Callable) -> str:
+    """Hash a function's string constants (its system prompt, etc.) and the rag sources, so edits miss the cache."""
+    consts = [c for c in inspect.unwrap(func).__code__.co_consts if isinstance(c, str)]
+    consts.append(_RAG_SOURCE_HASH)
+    return hashlib.blake2b("\0".join(consts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def get_corpus_version() -> int:
+    """Current corpus version (0 until the first change), or -1 if the store cannot be read."""
+    try:
+        row = _get_connection().execute("SELECT version FROM corpus_version WHERE id = 0").fetchone()
+        return row[0] if row else 0
+    except Exception as e:
+        logger.warning(f"Error reading corpus version: {e}")
+        return -1
+
+
+def bump_corpus_version() -> None:
+    """Mark the paper collection as changed, so answers cached against the old corpus miss."""
+    try:
+        conn = _get_connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO corpus_version (id, version) VALUES (0, 1) "
+                "ON CONFLICT(id) DO UPDATE SET version = version + 1"
+            )
+    except Exception as e:
+        logger.warning(f"Error bumping corpus version: {e}")
+
+
+def make_cache_key(mode: str, fingerprint: str, arguments: dict) -> bytes:
+    """Build the cache key for one call of a RAG mode (against the current corpus version)."""
+    key_data = {
+        "mode": mode,
+        "fingerprint": fingerprint,
+        "corpus_version": get_corpus_version(),
+        "llm_provider": settings.llm_provider,
+        # The model actually generating answers (Ollama has its own setting)
+        "llm_model": settings.ollama_model if settings.llm_provider == "ollama" else settings.llm_model,
+        "arguments": arguments
+    }
+    key_string = json.dumps(key_data, sort_keys=True, default=str)
+    return hashlib.blake2b(key_string.encode("utf-8"), digest_size=16).digest()
+
+
+# Result fields holding the retrieved evidence, across the RAG modes
+EVIDENCE_FIELDS = ("citations", "all_citations", "cited_papers", "context_chunks")
+
+
+def has_evidence(result: Any) -> bool:
+    """Whether a RAG result was answered from retrieved chunks (empty "nothing found" results are not cached)."""
+    return isinstance(result, dict) and any(result.get(field) for field in EVIDENCE_FIELDS)
+
+
+def log_cache_hit(mode: str, result: Dict) -> None:
+    """Record a cached answer in the query log, as generate_answer does for fresh ones."""
+    try:
+        from api.query_logger import log_query
+        citations = next((result[field] for field in EVIDENCE_FIELDS if result.get(field)), [])
+        log_query(
+            query=result.get("query") or result.get("topic", ""),
+            answer=result.get("answer") or result.get("survey", ""),
+            papers_used=list({c.get("paper_id") for c in citations}),
+            chunks_retrieved=len(citations),
+            model_used=settings.llm_provider,
+            mode=mode
+        )
+    except Exception as e:
+        logger.debug(f"Query logging failed: {e}")
+
+
+def get_cached_response(key: bytes, ttl: Optional[int] = None) -> Optional[Any]:
+    """Return the cached response for key, or None if missing or older than ttl."""
+    if ttl is None:
+        ttl = settings.rag_cache_ttl
+    
+    try:
+        row = _get_connection().execute(
+            "SELECT value, ts FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > ttl:
+            return None
+        return pickle.loads(row[0])
+    except Exception as e:
+        logger.warning(f"Error reading LLM cache: {e}")
+        return None
+
+
+def save_cached_response(key: bytes, value: Any) -> None:
+    """Store a response under key (replacing any older entry)."""
+    try:
+        conn = _get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, ts) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), int(time.time()))
+            )
+    except Exception as e:
+        logger.warning(f"Error writing LLM cache: {e}")
+
+
+def clear_llm_cache(older_than: Optional[int] = None) -> int:
+    """
+    Delete cached responses.
+    
+    Args:
+        older_than: Only delete entries older than this many seconds (if None, deletes all)
+    
+    Returns:
+        Number of entries deleted
+    """
+    conn = _get_connection()
+    with conn:
+        if older_than is None:
+            cursor = conn.execute("DELETE FROM cache")
+        else:
+            cursor = conn.execute("DELETE FROM cache WHERE ts < ?", (int(time.time()) - older_than,))
+    logger.info(f"Cleared {cursor.rowcount} cached RAG responses")
+    return cursor.rowcount
+
+
+def cached_rag(mode: str):
+    """
+    Decorator caching a RAG mode's result on its exact arguments.
+    
+    The key covers the mode, the function's prompt text, the rag package's
+    sources, the corpus version (bumped whenever chunks are upserted or
+    deleted), the configured LLM provider/model and the call arguments (with
+    defaults applied). Results without citations or context are not stored,
+    so a query asked before its papers were ingested is answered afresh.
+    Disabled when settings.rag_cache_enabled is False (RAG_CACHE=0).
+    
+    Args:
+        mode: RAG mode name, stored in the key
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        fingerprint = function_fingerprint(func)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.rag_cache_enabled:
+                return func(*args, **kwargs)
+            
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = make_cache_key(mode, fingerprint, dict(bound.arguments))
+            
+            cached_result = get_cached_response(key)
+            if cached_result is not None:
+                logger.debug(f"RAG cache hit for {mode} mode")
+                log_cache_hit(mode, cached_result)
+                return cached_result
+            
+            result = func(*args, **kwargs)
+            if has_evidence(result):
+                save_cached_response(key, result)
+            return result
+        
+        return wrapper
+    return decorator
@@ -0,0 +1,86 @@
+"""In-process near-duplicate cache keyed by random-projection LSH of embeddings."""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LSHCache:
+    """
+    Cache values under embeddings and return them for near-identical embeddings.
+    
+    Each embedding is hashed to a num_bits key by the signs of its projections
+    onto fixed random hyperplanes. A lookup probes the key and every key at
+    Hamming distance 1, then compares cosine similarity only against the few
+    entries in those buckets; the best match at or above threshold is a hit.
+    """
+    
+    def __init__(self, threshold: float, num_bits: int = 16, max_entries: int = 1024, seed: int = 0):
+        self._threshold = threshold
+        self._num_bits = num_bits
+        self._max_entries = max_entries
+        self._rng = np.random.default_rng(seed)
+        self._planes: Optional[np.ndarray] = None  # (num_bits, d), drawn on first use
+        self._buckets: Dict[int, List[int]] = {}
+        # entry id -> (bucket key, unit embedding, value), least recently used first
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    def _unit(self, embedding) -> np.ndarray:
+        """Embedding as a float32 unit vector."""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _key(self, unit: np.ndarray) -> int:
+        """Bucket key: one bit per hyperplane, set when the embedding lies on its positive side."""
+        if self._planes is None or self._planes.shape[1] != unit.shape[0]:
+            # First use, or the embedding model changed: start over with new hyperplanes
+            self._planes = self._rng.standard_normal((self._num_bits, unit.shape[0])).astype(np.float32)
+            self._buckets.clear()
+            self._entries.clear()
+        bits = (self._planes @ unit) > 0
+        return int(bits @ (1 << np.arange(self._num_bits, dtype=np.int64)))
+    
+    def get(self, embedding) -> Optional[Any]:
+        """Value stored under the most similar cached embedding, or None if none is similar enough."""
+        unit = self._unit(embedding)
+        with self._lock:
+            key = self._key(unit)
+            probe_keys = [key] + [key ^ (1 << bit) for bit in range(self._num_bits)]
+            best_id, best_similarity = None, self._threshold
+            for probe_key in probe_keys:
+                for entry_id in self._buckets.get(probe_key, ()):
+                    similarity = float(np.dot(self._entries[entry_id][1], unit))
+                    if similarity >= best_similarity:
+                        best_id, best_similarity = entry_id, similarity
+            if best_id is None:
+                return None
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][2]
+    
+    def put(self, embedding, value: Any) -> None:
+        """Store a value under an embedding, evicting the least recently used entry if full."""
+        unit = self._unit(embedding)
+        with self._lock:
+            key = self._key(unit)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (key, unit, value)
+            self._buckets.setdefault(key, []).append(entry_id)
+            while len(self._entries) > self._max_entries:
+                old_id, (old_key, _, _) = self._entries.popitem(last=False)
+                bucket = self._buckets[old_key]
+                bucket.remove(old_id)
+                if not bucket:
+                    del self._buckets[old_key]
+    
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._buckets.clear()
+            self._entries.clear()
@@ -0,0 +1,237 @@
+"""Per-paper centroid embeddings (mean of stored chunk embeddings), persisted int8-quantized in SQLite."""
+from typing import Dict, List, Optional, Tuple
+import sqlite3
+import threading
+import time
+import numpy as np
+from config.chroma_client import get_collection
+from processing.embedding_cache import quantize, dequantize
+from utils.cache import CACHE_DIR
+from utils.logger import get_logger
+
+try:
+    import faiss
+except ImportError:  # Optional in-process centroid index; callers fall back to ChromaDB
+    faiss = None
+
+logger = get_logger(__name__)
+
+PAPER_CENTROID_DB = CACHE_DIR / "paper_centroids.sqlite3"
+
+# Keys per SELECT ... IN (...) (stays under SQLite's bound-parameter limit)
+LOOKUP_CHUNK_SIZE = 500
+
+# Centroid index snapshots are rebuilt when the chunk count changes, or after this many seconds
+CENTROID_INDEX_TTL = 300
+
+# {"ts", "count", "paper_ids", "index"} for the current collection, or None
+_centroid_index: Optional[Dict] = None
+_index_lock = threading.Lock()
+
+# One connection per thread; sqlite3 connections must not be shared across threads
+_local = threading.local()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Get this thread's connection, creating the table on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(PAPER_CENTROID_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS centroids ("
+            "paper_id TEXT PRIMARY KEY, scale REAL NOT NULL, vector BLOB NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+def compute_centroids(paper_ids: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Mean stored chunk embedding of each paper, fetched with one ChromaDB call.
+    
+    Args:
+        paper_ids: Paper IDs to look up
+    
+    Returns:
+        Dictionary mapping paper_id to its float32 centroid (papers with no chunks are omitted)
+    """
+    unique_ids = list(dict.fromkeys(paper_ids))
+    if not unique_ids:
+        return {}
+    
+    collection = get_collection()
+    chunks = collection.get(
+        where={"paper_id": {"$in": unique_ids}} if len(unique_ids) > 1 else {"paper_id": unique_ids[0]},
+        include=["embeddings", "metadatas"]
+    )
+    embeddings = chunks.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return {}
+    
+    rows_by_paper = {}
+    for row, metadata in enumerate(chunks.get("metadatas") or []):
+        rows_by_paper.setdefault(metadata.get("paper_id"), []).append(row)
+    
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return {
+        pid: embeddings[rows].mean(axis=0)
+        for pid, rows in rows_by_paper.items()
+    }
+
+
+def _load_centroids(paper_ids: List[str]) -> Dict[str, np.ndarray]:
+    """Fetch stored centroids for paper_ids, dequantized to float32 arrays."""
+    conn = _get_connection()
+    found = {}
+    for start in range(0, len(paper_ids), LOOKUP_CHUNK_SIZE):
+        chunk = paper_ids[start:start + LOOKUP_CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT paper_id, scale, vector FROM centroids WHERE paper_id IN ({placeholders})", chunk
+        ).fetchall()
+        for paper_id, scale, blob in rows:
+            found[paper_id] = dequantize(np.frombuffer(blob, dtype=np.int8), scale)
+    return found
+
+
+def get_centroids(paper_ids: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Get per-paper centroid embeddings, computing and storing any not yet stored.
+    
+    Centroids are stored int8-quantized (a quarter of the float32 size);
+    cosine similarity is scale-invariant per vector, so comparisons only
+    see the rounding error (well under 1%). Stored centroids are dropped
+    whenever a paper's chunks are upserted or deleted, so a lookup is either
+    current or recomputed from ChromaDB.
+    
+    Args:
+        paper_ids: Paper IDs to look up
+    
+    Returns:
+        Dictionary mapping paper_id to its float32 centroid (papers with no chunks are omitted)
+    """
+    unique_ids = list(dict.fromkeys(paper_ids))
+    if not unique_ids:
+        return {}
+    
+    try:
+        centroids = _load_centroids(unique_ids)
+    except Exception as e:
+        logger.warning(f"Error reading paper centroid store: {e}")
+        centroids = {}
+    
+    missing = [pid for pid in unique_ids if pid not in centroids]
+    if missing:
+        computed = compute_centroids(missing)
+        centroids.update(computed)
+        if computed:
+            new_rows = []
+            for pid, vector in computed.items():
+                q, scale = quantize(vector)
+                new_rows.append((pid, scale, q.tobytes()))
+            try:
+                conn = _get_connection()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO centroids (paper_id, scale, vector) VALUES (?, ?, ?)", new_rows
+                    )
+            except Exception as e:
+                logger.warning(f"Error writing paper centroid store: {e}")
+        logger.debug(f"Computed {len(computed)} paper centroids, {len(unique_ids) - len(missing)} stored")
+    
+    return centroids
+
+
+def invalidate_centroids(paper_ids: List[str]) -> None:
+    """Drop stored centroids after the papers' chunks change."""
+    try:
+        conn = _get_connection()
+        with conn:
+            conn.executemany("DELETE FROM centroids WHERE paper_id = ?", [(pid,) for pid in paper_ids])
+    except Exception as e:
+        logger.warning(f"Error invalidating paper centroids: {e}")
+
+
+def _build_centroid_index(count: int) -> Dict:
+    """Build a FAISS inner-product index over every paper's normalized centroid."""
+    collection = get_collection()
+    all_data = collection.get(limit=count, include=["embeddings", "metadatas"]) if count else {}
+    chunk_embeddings = all_data.get("embeddings")
+    
+    group_of = {}
+    chunk_groups = [
+        group_of.setdefault(metadata.get("paper_id", "unknown"), len(group_of))
+        for metadata in all_data.get("metadatas") or []
+    ]
+    
+    index = None
+    if chunk_embeddings is not None and len(chunk_embeddings) > 0:
+        chunk_embeddings = np.asarray(chunk_embeddings, dtype=np.float32)
+        chunk_groups = np.asarray(chunk_groups)
+        centroids = np.zeros((len(group_of), chunk_embeddings.shape[1]), dtype=np.float32)
+        np.add.at(centroids, chunk_groups, chunk_embeddings)
+        centroids /= np.bincount(chunk_groups)[:, None]
+        faiss.normalize_L2(centroids)  # Inner product of unit vectors is cosine similarity
+        # Brute-force scan over 8-bit codes: a quarter of the float32 index's memory traffic
+        index = faiss.IndexScalarQuantizer(
+            centroids.shape[1], faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(centroids)
+        index.add(centroids)
+    
+    logger.debug(f"Built centroid index over {len(group_of)} papers ({count} chunks)")
+    return {"ts": time.time(), "count": count, "paper_ids": list(group_of), "index": index}
+
+
+def _is_fresh(snapshot: Optional[Dict], count: int) -> bool:
+    """Whether a centroid index snapshot still matches the collection size and TTL."""
+    return (
+        snapshot is not None
+        and snapshot["count"] == count
+        and time.time() - snapshot["ts"] < CENTROID_INDEX_TTL
+    )
+
+
+def search_centroids(query_embedding: List[float], top_k: int = 20) -> Optional[List[Tuple[str, float]]]:
+    """
+    Find the papers whose centroid is most similar to a query embedding.
+    
+    Brute-force search over an in-process, 8-bit scalar-quantized FAISS
+    index of paper centroids, rebuilt when the collection's chunk count
+    changes.
+    
+    Args:
+        query_embedding: Query embedding vector
+        top_k: Number of papers to return
+    
+    Returns:
+        (paper_id, cosine similarity) pairs, most similar first, or None if
+        FAISS is not installed
+    """
+    global _centroid_index
+    if faiss is None:
+        return None
+    
+    count = get_collection().count()
+    snapshot = _centroid_index
+    if not _is_fresh(snapshot, count):
+        with _index_lock:
+            # Another thread may have rebuilt the index while we waited
+            snapshot = _centroid_index
+            if not _is_fresh(snapshot, count):
+                snapshot = _centroid_index = _build_centroid_index(count)
+    
+    index = snapshot["index"]
+    if index is None:
+        return []
+    
+    query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1).copy()
+    faiss.normalize_L2(query)
+    scores, rows = index.search(query, min(top_k, index.ntotal))
+    return [
+        (snapshot["paper_ids"][row], float(score))
+        for row, score in zip(rows[0], scores[0])
+        if row >= 0
+    ]
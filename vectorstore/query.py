@@ -131,3 +131,40 @@ def query_by_paper_id(
     except Exception as e:
         logger.error(f"Failed to query by paper_id: {e}")
         raise ValueError(f"Failed to query by paper_id: {e}")
+
+
+def get_paper_metadata_batch(paper_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch paper-level metadata for several papers in one ChromaDB call.
+    
+    Args:
+        paper_ids: Paper IDs to look up
+        
+    Returns:
+        Dictionary mapping paper_id to the metadata of its first returned chunk
+        (papers with no chunks are omitted)
+    """
+    unique_ids = list(dict.fromkeys(str(pid) for pid in paper_ids if pid))
+    if not unique_ids:
+        return {}
+    
+    collection = get_collection()
+    
+    try:
+        results = collection.get(
+            where={"paper_id": {"$in": unique_ids}},
+            include=["metadatas"]
+        )
+        
+        metadata_by_paper = {}
+        for metadata in results.get("metadatas") or []:
+            pid = metadata.get("paper_id")
+            if pid and pid not in metadata_by_paper:
+                metadata_by_paper[pid] = metadata
+        
+        logger.info(f"Retrieved metadata for {len(metadata_by_paper)}/{len(unique_ids)} papers")
+        return metadata_by_paper
+        
+    except Exception as e:
+        logger.error(f"Failed to get paper metadata batch: {e}")
+        raise ValueError(f"Failed to get paper metadata batch: {e}")
@@ -2,6 +2,9 @@
 from typing import List, Dict, Any
 from config.chroma_client import get_collection
 from processing.chunker import Chunk
+from utils.chroma_cache import invalidate_metadata, invalidate_paper
+from vectorstore.centroids import invalidate_centroids
+from utils.llm_cache import bump_corpus_version
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -73,6 +76,12 @@ def upsert_chunks(
             documents=documents,
             metadatas=metadatas
         )
+        paper_ids = {m["paper_id"] for m in metadatas}
+        for paper_id in paper_ids:
+            invalidate_paper(paper_id)
+        invalidate_centroids(list(paper_ids))
+        invalidate_metadata(collection.name)
+        bump_corpus_version()
         logger.info(f"Successfully upserted {len(ids)} chunks to ChromaDB")
     except Exception as e:
         logger.error(f"Failed to upsert chunks to ChromaDB: {e}")